@@ -1,661 +1,82 @@
 import streamlit as st
-import pandas as pd
-from fpdf import FPDF
-import numpy as np
-import matplotlib.pyplot as plt
-from io import BytesIO
-import tempfile
 import os
-import time
 
-st.set_page_config(page_title="Career Guidance Test", layout="centered")
-
-# Define 60 psychometric questions (10 per dimension)
-questions = {
-# Personality Types
-    1: {"question": "How do you behave in new social situations?", "options": {
-        "I observe quietly": ["Introvert"],
-        "I talk to a few people": ["Ambivert"],
-        "I mingle with everyone": ["Extrovert"],
-        "I wait for someone to talk to me": ["Reserved"]}},
-    2: {"question": "What describes you best at school?", "options": {
-        "Organised and timely": ["Structured"],
-        "Casual but meet deadlines": ["Balanced"],
-        "I work last minute": ["Spontaneous"],
-        "I need help to manage work": ["Dependent"]}},
-    3: {"question": "Your desk at home is usually:", "options": {
-        "Neat and organised": ["Structured"],
-        "A little messy but I know where things are": ["Balanced"],
-        "Super messy": ["Spontaneous"],
-        "Varies depending on mood": ["Dependent"]}},
-    4: {"question": "How do you deal with unexpected tasks?", "options": {
-        "Make a plan first": ["Structured"],
-        "Jump into it": ["Spontaneous"],
-        "Ask for help": ["Dependent"],
-        "Balance between planning and action": ["Balanced"]}},
-    5: {"question": "Your friends describe you as:", "options": {
-        "Quiet and thoughtful": ["Introvert"],
-        "Friendly and outgoing": ["Extrovert"],
-        "Balanced": ["Ambivert"],
-        "Only open with close friends": ["Reserved"]}},
-    6: {"question": "When given choices, you:", "options": {
-        "Weigh all pros and cons": ["Structured"],
-        "Go with what feels right": ["Spontaneous"],
-        "Get overwhelmed sometimes": ["Dependent"],
-        "Mix logic with instinct": ["Balanced"]}},
-    7: {"question": "How do you plan your day?", "options": {
-        "Create a checklist": ["Structured"],
-        "Have a rough idea only": ["Spontaneous"],
-        "Don’t plan – go with the flow": ["Dependent"],
-        "Some parts planned, some flexible": ["Balanced"]}},
-    8: {"question": "You feel most productive when:", "options": {
-        "You have a fixed routine": ["Structured"],
-        "You’re doing something exciting": ["Spontaneous"],
-        "You have someone guiding you": ["Dependent"],
-        "You have space to adapt": ["Balanced"]}},
-    9: {"question": "You prefer to work:", "options": {
-        "Alone and focused": ["Introvert"],
-        "In groups and discussions": ["Extrovert"],
-        "Based on the task": ["Ambivert"],
-        "Quietly with close peers": ["Reserved"]}},
-    10: {"question": "When making choices, you rely on:", "options": {
-        "Facts and logic": ["Structured"],
-        "Gut feeling": ["Spontaneous"],
-        "Guidance from others": ["Dependent"],
-        "A mix of both": ["Balanced"]}},
-
-    # Learning Style Types
-    11: {"question": "How do you best learn something new?", "options": {
-        "By watching or seeing": ["Visual Learner"],
-        "By doing or experiencing": ["Kinesthetic Learner"],
-        "By listening": ["Auditory Learner"],
-        "By reading": ["Reading/Writing Learner"]}},
-    12: {"question": "How do you remember a concept best?", "options": {
-        "By making mind maps": ["Visual Learner"],
-        "By teaching someone else": ["Kinesthetic Learner"],
-        "By repeating it aloud": ["Auditory Learner"],
-        "By taking notes": ["Reading/Writing Learner"]}},
-    13: {"question": "You understand better when:", "options": {
-        "You draw it out": ["Visual Learner"],
-        "You try it yourself": ["Kinesthetic Learner"],
-        "You hear it explained": ["Auditory Learner"],
-        "You read examples": ["Reading/Writing Learner"]}},
-    14: {"question": "You revise best by:", "options": {
-        "Making diagrams": ["Visual Learner"],
-        "Practicing tasks": ["Kinesthetic Learner"],
-        "Listening to recordings": ["Auditory Learner"],
-        "Writing summaries": ["Reading/Writing Learner"]}},
-    15: {"question": "You enjoy teachers who:", "options": {
-        "Use visuals": ["Visual Learner"],
-        "Make you do activities": ["Kinesthetic Learner"],
-        "Explain out loud": ["Auditory Learner"],
-        "Give notes and readings": ["Reading/Writing Learner"]}},
-    16: {"question": "To recall something, you usually:", "options": {
-        "Picture it in your mind": ["Visual Learner"],
-        "Act it out or simulate": ["Kinesthetic Learner"],
-        "Say it aloud": ["Auditory Learner"],
-        "Write it down repeatedly": ["Reading/Writing Learner"]}},
-    17: {"question": "What type of homework feels easiest?", "options": {
-        "Drawing or mapping concepts": ["Visual Learner"],
-        "Building or hands-on work": ["Kinesthetic Learner"],
-        "Oral presentation": ["Auditory Learner"],
-        "Essays or reports": ["Reading/Writing Learner"]}},
-    18: {"question": "You enjoy content in the form of:", "options": {
-        "Videos and diagrams": ["Visual Learner"],
-        "Interactive games": ["Kinesthetic Learner"],
-        "Podcasts or lectures": ["Auditory Learner"],
-        "Articles and books": ["Reading/Writing Learner"]}},
-    19: {"question": "You prefer revision that involves:", "options": {
-        "Charts or mind maps": ["Visual Learner"],
-        "Model making or practice": ["Kinesthetic Learner"],
-        "Audio summaries": ["Auditory Learner"],
-        "Written notes": ["Reading/Writing Learner"]}},
-    20: {"question": "Which best describes how you study?", "options": {
-        "I use color-coded notes": ["Visual Learner"],
-        "I do sample exercises": ["Kinesthetic Learner"],
-        "I listen to myself/others": ["Auditory Learner"],
-        "I reread material often": ["Reading/Writing Learner"]}},
-
-        # Behaviour Types (Q21–30)
-    21: {"question": "In group projects, you usually:", "options": {
-        "Take charge and lead": ["Leader"],
-        "Do what you are assigned": ["Executor"],
-        "Give ideas and feedback": ["Thinker"],
-        "Help where needed": ["Supporter"]}},
-    22: {"question": "You prefer instructions that are:", "options": {
-        "Clear and step-by-step": ["Executor"],
-        "Flexible with creativity": ["Thinker"],
-        "Simple and quick": ["Supporter"],
-        "Complete with big picture": ["Leader"]}},
-    23: {"question": "In school events, you mostly:", "options": {
-        "Manage or coordinate": ["Leader"],
-        "Host or perform": ["Thinker"],
-        "Do behind-the-scenes work": ["Executor"],
-        "Assist friends or groups": ["Supporter"]}},
-    24: {"question": "Your decision-making style is:", "options": {
-        "Quick and confident": ["Leader"],
-        "Balanced and open": ["Thinker"],
-        "Based on given rules": ["Executor"],
-        "With input from others": ["Supporter"]}},
-    25: {"question": "Your classmates rely on you for:", "options": {
-        "Leadership": ["Leader"],
-        "Creative ideas": ["Thinker"],
-        "Execution and details": ["Executor"],
-        "Team spirit": ["Supporter"]}},
-    26: {"question": "During competitions, you are:", "options": {
-        "Focused and goal-oriented": ["Executor"],
-        "Cheerful and motivating": ["Supporter"],
-        "Strategic and planning": ["Leader"],
-        "Innovative and fun": ["Thinker"]}},
-    27: {"question": "When there's a problem, you:", "options": {
-        "Try new ways to solve": ["Thinker"],
-        "Get help from a group": ["Supporter"],
-        "Take control to fix it": ["Leader"],
-        "Follow a known process": ["Executor"]}},
-    28: {"question": "You feel most valued when:", "options": {
-        "You lead a task": ["Leader"],
-        "You give good suggestions": ["Thinker"],
-        "You do something well": ["Executor"],
-        "You help someone succeed": ["Supporter"]}},
-    29: {"question": "At school you often:", "options": {
-        "Organise peers": ["Leader"],
-        "Give ideas in class": ["Thinker"],
-        "Do assignments carefully": ["Executor"],
-        "Assist friends often": ["Supporter"]}},
-    30: {"question": "If your friend needs help in a project:", "options": {
-        "You take charge for them": ["Leader"],
-        "You brainstorm ideas": ["Thinker"],
-        "You complete parts for them": ["Executor"],
-        "You guide and cheer them": ["Supporter"]}},
-
-        # Emotional Types (Q31–40)
-    31: {"question": "When you feel anxious, you:", "options": {
-        "Talk it out": ["Expressive"],
-        "Keep it to yourself": ["Internaliser"],
-        "Get irritated": ["Reactive"],
-        "Distract yourself": ["Avoidant"]}},
-    32: {"question": "When you get bad marks:", "options": {
-        "You feel down for a while": ["Internaliser"],
-        "You talk to someone": ["Expressive"],
-        "You blame the paper/system": ["Reactive"],
-        "You ignore and move on": ["Avoidant"]}},
-    33: {"question": "How do you react to criticism?", "options": {
-        "Think quietly and change": ["Internaliser"],
-        "Defend immediately": ["Reactive"],
-        "Laugh or joke about it": ["Avoidant"],
-        "Talk about it later": ["Expressive"]}},
-    34: {"question": "When you’re angry:", "options": {
-        "You raise your voice": ["Reactive"],
-        "You cry or become silent": ["Internaliser"],
-        "You walk away": ["Avoidant"],
-        "You tell someone why": ["Expressive"]}},
-    35: {"question": "When something great happens:", "options": {
-        "You share it with everyone": ["Expressive"],
-        "You smile to yourself": ["Internaliser"],
-        "You act like it's no big deal": ["Avoidant"],
-        "You celebrate loudly": ["Reactive"]}},
-    36: {"question": "How do you handle pressure?", "options": {
-        "Vent or share emotions": ["Expressive"],
-        "Overthink silently": ["Internaliser"],
-        "Get angry or short-tempered": ["Reactive"],
-        "Escape into games/music": ["Avoidant"]}},
-    37: {"question": "When people are upset with you:", "options": {
-        "You cry or worry": ["Internaliser"],
-        "You fight back": ["Reactive"],
-        "You laugh it off": ["Avoidant"],
-        "You try to talk it through": ["Expressive"]}},
-    38: {"question": "What do you do when you're sad?", "options": {
-        "Write or talk": ["Expressive"],
-        "Stay quiet and hide it": ["Internaliser"],
-        "Complain or shout": ["Reactive"],
-        "Watch movies/play games": ["Avoidant"]}},
-    39: {"question": "When nervous before exams:", "options": {
-        "You talk to a parent or friend": ["Expressive"],
-        "You worry silently": ["Internaliser"],
-        "You get annoyed or restless": ["Reactive"],
-        "You distract yourself": ["Avoidant"]}},
-    40: {"question": "How do you deal with failure?", "options": {
-        "Open up to someone": ["Expressive"],
-        "Keep emotions to yourself": ["Internaliser"],
-        "Blame others or get angry": ["Reactive"],
-        "Avoid thinking about it": ["Avoidant"]}},
-
-        # Interest Types (Q41–50)
-    41: {"question": "In your free time, you prefer:", "options": {
-        "Building something or solving problems": ["STEM"],
-        "Writing, drawing, or performing": ["Creative"],
-        "Learning about people or society": ["Humanities"],
-        "Trading or money-related tasks": ["Business"]}},
-    42: {"question": "You are most excited by:", "options": {
-        "New technology and inventions": ["STEM"],
-        "Beautiful designs and stories": ["Creative"],
-        "Ideas that change society": ["Humanities"],
-        "Business plans and brands": ["Business"]}},
-    43: {"question": "Your ideal class activity would be:", "options": {
-        "Science experiment or coding challenge": ["STEM"],
-        "Drama or visual art": ["Creative"],
-        "Debate or survey": ["Humanities"],
-        "Case study or role play business": ["Business"]}},
-    44: {"question": "When choosing a documentary, you’d pick:", "options": {
-        "About space, physics or AI": ["STEM"],
-        "About filmmakers, artists or musicians": ["Creative"],
-        "About history or society": ["Humanities"],
-        "About companies or finance": ["Business"]}},
-    45: {"question": "You enjoy magazines or videos about:", "options": {
-        "Science and discovery": ["STEM"],
-        "Movies and storytelling": ["Creative"],
-        "World events and change-makers": ["Humanities"],
-        "Startups and money": ["Business"]}},
-    46: {"question": "Your favourite school event is:", "options": {
-        "Tech fair or quiz": ["STEM"],
-        "Art or music fest": ["Creative"],
-        "MUN or elocution": ["Humanities"],
-        "Business bazaar": ["Business"]}},
-    47: {"question": "What kind of club would you join?", "options": {
-        "Coding or Robotics": ["STEM"],
-        "Theatre or Design": ["Creative"],
-        "Debating or Social Work": ["Humanities"],
-        "Entrepreneurship or Commerce": ["Business"]}},
-    48: {"question": "What excites you about the future?", "options": {
-        "Tech innovation": ["STEM"],
-        "Creative freedom": ["Creative"],
-        "Changing the world": ["Humanities"],
-        "Owning a company": ["Business"]}},
-    49: {"question": "Which subject feels most natural to you?", "options": {
-        "Math or Science": ["STEM"],
-        "English or Art": ["Creative"],
-        "Social Science": ["Humanities"],
-        "Economics or Accounts": ["Business"]}},
-    50: {"question": "Which of these do you admire most?", "options": {
-        "Engineers or Scientists": ["STEM"],
-        "Authors or Designers": ["Creative"],
-        "Activists or Leaders": ["Humanities"],
-        "CEOs or Investors": ["Business"]}},
-
-    # Aptitude Types (Q51–60)
-    51: {"question": "You are best at solving:", "options": {
-        "Logic puzzles": ["Logical"],
-        "Creative challenges": ["Creative"],
-        "Word games": ["Verbal"],
-        "Number patterns": ["Numerical"]}},
-    52: {"question": "Your strongest subject area is:", "options": {
-        "Physics, Math": ["Logical"],
-        "Drawing, Art": ["Creative"],
-        "English, Literature": ["Verbal"],
-        "Accounts, Data": ["Numerical"]}},
-    53: {"question": "You enjoy assignments that involve:", "options": {
-        "Formulas and reasoning": ["Logical"],
-        "Visuals and imagination": ["Creative"],
-        "Writing and vocabulary": ["Verbal"],
-        "Graphs and calculation": ["Numerical"]}},
-    54: {"question": "In puzzles or games, you prefer:", "options": {
-        "Sudoku or logic grid": ["Logical"],
-        "Pictionary or design challenge": ["Creative"],
-        "Crosswords or anagrams": ["Verbal"],
-        "Math riddles": ["Numerical"]}},
-    55: {"question": "When thinking fast, your brain picks:", "options": {
-        "Facts and cause-effect": ["Logical"],
-        "Images and colours": ["Creative"],
-        "Words and sentences": ["Verbal"],
-        "Quantities and patterns": ["Numerical"]}},
-    56: {"question": "Your friends say you are good at:", "options": {
-        "Solving tough problems": ["Logical"],
-        "Making things beautiful": ["Creative"],
-        "Explaining things well": ["Verbal"],
-        "Handling budgets or scores": ["Numerical"]}},
-    57: {"question": "You find it easy to:", "options": {
-        "Understand scientific logic": ["Logical"],
-        "Create something original": ["Creative"],
-        "Learn new words": ["Verbal"],
-        "Work with percentages": ["Numerical"]}},
-    58: {"question": "You like tasks that involve:", "options": {
-        "Cause-effect analysis": ["Logical"],
-        "Drawing/sketching": ["Creative"],
-        "Reading or storytelling": ["Verbal"],
-        "Tabulation or computation": ["Numerical"]}},
-    59: {"question": "You struggle the least with:", "options": {
-        "Reasoning questions": ["Logical"],
-        "Art/design prompts": ["Creative"],
-        "Essay writing": ["Verbal"],
-        "Math or data tables": ["Numerical"]}},
-    60: {"question": "Which activity feels most rewarding?", "options": {
-        "Solving a complex problem": ["Logical"],
-        "Finishing a creative project": ["Creative"],
-        "Delivering a speech/story": ["Verbal"],
-        "Balancing or budgeting": ["Numerical"]}}
-}
-
-# Mapping dimensions to question IDs
-dim_labels = {
-    "Personality": list(range(1, 11)),
-    "Learning Style": list(range(11, 21)),
-    "Behaviour": list(range(21, 31)),
-    "Emotional": list(range(31, 41)),
-    "Interest": list(range(41, 51)),
-    "Aptitude": list(range(51, 61))
-}
-
-weights = {
-    "Personality": 1.0,
-    "Learning Style": 0.9,
-    "Behaviour": 0.8,
-    "Emotional": 0.8,
-    "Interest": 1.0,
-    "Aptitude": 1.2
-}
-
-career_domains = {
-    "STEM": ["Engineer", "Data Analyst", "AI Researcher", "Biotech Scientist"],
-    "Creative": ["UX Designer", "Animator", "Content Creator", "Filmmaker"],
-    "Social": ["Psychologist", "Policy Researcher", "Teacher", "NGO Worker"],
-    "Business": ["Entrepreneur", "Marketing Analyst", "Financial Consultant"]
-}
-
-university_domains = {
-    "STEM": ["MIT", "Stanford", "ETH Zurich", "IIT Bombay"],
-    "Creative": ["Parsons School of Design", "NID India", "SCAD", "RMIT"],
-    "Social": ["Sciences Po", "TISS", "LSE", "UCLA"],
-    "Business": ["Wharton", "INSEAD", "London Business School", "IIM Ahmedabad"]
-}
-
-
-# -- FUNCTIONS --
-def calculate_scores(responses):
-    scores_by_dim = {}
-    for dim, q_ids in dim_labels.items():
-        dim_scores = {}
-        for q_id in q_ids:
-            selected = responses.get(q_id)
-            if selected:
-                tags = questions[q_id]['options'].get(selected, [])
-                for tag in tags:
-                    dim_scores[tag] = dim_scores.get(tag, 0) + weights[dim]
-        scores_by_dim[dim] = dim_scores
-    return scores_by_dim
-
-def recommend_domain(scores_by_dim):
-    summary = {}
-    interests = scores_by_dim.get("Interest", {})
-    top_interest = max(interests, key=interests.get) if interests else "General"
-    interest_map = {
-        "STEM": "STEM",
-        "Creative": "Creative",
-        "Humanities": "Social",
-        "Business": "Business"
-    }
-    mapped_interest = interest_map.get(top_interest, "General")
-    if mapped_interest in career_domains:
-        summary["Careers"] = career_domains[mapped_interest]
-        summary["Universities"] = university_domains[mapped_interest]
-    return summary
-
-def get_subject_analysis(subject_scores):
-    strengths = [subj for subj, score in subject_scores.items() if score >= 85]
-    weaknesses = [subj for subj, score in subject_scores.items() if score <= 60]
-    return strengths, weaknesses
+from career_guidance.bank import default_bank, load_bank
+from career_guidance.cache import DISK_MAX_BYTES, ReportCache, report_fingerprint
+from career_guidance.jobs import QueueFull, ReportJobs
+from career_guidance.navigation import init_state, section_answered, go_back, go_next, reset
+from career_guidance.sessions import open_sessions, resume_session, save_session, start_session
+from career_guidance.store import ResultsStore
 
-def suggest_majors(strengths):
-    mapping = {
-        "Math": ["Engineering", "Computer Science", "Economics"],
-        "Physics": ["Engineering", "Astrophysics"],
-        "Chemistry": ["Pharmacy", "Chemical Engineering"],
-        "Biology": ["Medicine", "Biotech"],
-        "English": ["Journalism", "Literature"],
-        "History": ["Public Policy", "Law"],
-        "Geography": ["Environmental Studies", "Urban Planning"],
-        "Economics": ["Finance", "Data Science"]
-    }
-    suggested = []
-    for subj in strengths:
-        suggested.extend(mapping.get(subj, []))
-    return list(set(suggested))
-
-def generate_split_radar_charts(scores_by_dim):
-    charts = {}
-    for dimension, scores in scores_by_dim.items():
-        if not scores:
-            continue
-        labels = list(scores.keys())
-        values = list(scores.values())
-        angles = np.linspace(0, 2 * np.pi, len(labels), endpoint=False).tolist()
-        values += values[:1]
-        angles += angles[:1]
-
-        fig, ax = plt.subplots(figsize=(7.5, 7.5), subplot_kw=dict(polar=True))
-        ax.plot(angles, values, 'o-', linewidth=2)
-        ax.fill(angles, values, alpha=0.25)
-        ax.set_yticklabels([])
-        ax.set_xticks(angles[:-1])
-        ax.set_xticklabels(labels, fontsize=9, wrap=True)
-        ax.set_title(dimension, fontsize=14)
-        fig.subplots_adjust(top=0.85, bottom=0.1)
-
-        tmpfile = tempfile.NamedTemporaryFile(delete=False, suffix=".png")
-        plt.savefig(tmpfile.name, dpi=150)
-        charts[dimension] = tmpfile.name
-        plt.close(fig)
-    return charts
-
-def generate_summary(scores_by_dim):
-    summary = ""
-    for dim, score_map in scores_by_dim.items():
-        if score_map:
-            top_area = max(score_map, key=score_map.get)
-            summary += f"\n- {dim}: Dominant trait = {top_area}"
-    return summary
-
-def generate_detailed_scores_text(scores_by_dim):
-    details = ""
-    for dim, score_map in scores_by_dim.items():
-        if score_map:
-            details += f"\n{dim} Scores:\n"
-            for trait, score in sorted(score_map.items(), key=lambda x: -x[1]):
-                details += f"- {trait}: {score:.1f}\n"
-    return details
-
-def generate_pdf(student_name, scores_by_dim, chart_paths, recommendations):
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", size=12)
-    pdf.cell(200, 10, txt=f"Career Report: {student_name}", ln=True, align='C')
-    pdf.ln(5)
-    pdf.multi_cell(0, 10, txt=(
-        f"Dear {student_name},\n\n"
-        "Thank you for completing the career guidance assessment. Based on your responses and academic scores, this report provides an overview of your key traits and suggestions for future career paths.\n\n"
-        "This report includes insights into your personality, learning preferences, behavior, emotional tendencies, and interests. It also offers tailored recommendations for suitable majors, careers, and university options."
-    ))
-
-    pdf.ln(5)
-    pdf.set_font("Arial", size=12)
-    pdf.multi_cell(0, 10, txt="Your psychometric analysis across 6 core dimensions shows the following dominant traits:")
-    summary = generate_summary(scores_by_dim)
-    for line in summary.strip().split('\n'):
-        pdf.multi_cell(0, 8, txt=line)
-
-    pdf.add_page()
-    pdf.set_font("Arial", 'B', 14)
-    pdf.cell(0, 10, "Suggested Career Tracks & Universities", ln=True, align='C')
-    pdf.set_font("Arial", size=12)
-    for section, items in recommendations.items():
-        pdf.multi_cell(0, 8, f"\n{section} Suggestions:")
-        for item in items:
-            pdf.multi_cell(0, 8, f"- {item}")
-
-    pdf.add_page()
-    pdf.set_font("Arial", 'B', 14)
-    pdf.cell(0, 10, "Detailed Scores Breakdown", ln=True, align='C')
-    pdf.set_font("Arial", size=12)
-    detail_text = generate_detailed_scores_text(scores_by_dim)
-    pdf.multi_cell(0, 8, detail_text)
-
-    for dim in dim_labels.keys():
-        if dim in chart_paths:
-            pdf.add_page()
-            pdf.set_font("Arial", 'B', 14)
-            pdf.cell(0, 10, f"{dim} Profile", ln=True, align='C')
-            pdf.image(chart_paths[dim], x=30, y=30, w=150)
-
-    output_buffer = BytesIO()
-    pdf_output = pdf.output(dest='S').encode('latin1')
-    output_buffer.write(pdf_output)
-    output_buffer.seek(0)
-
-    for path in chart_paths.values():
-        os.remove(path)
-
-    return output_buffer
-
-# -- FUNCTIONS --
-def calculate_scores(responses):
-    scores_by_dim = {}
-    for dim, q_ids in dim_labels.items():
-        dim_scores = {}
-        for q_id in q_ids:
-            selected = responses.get(q_id)
-            if selected:
-                tags = questions[q_id]['options'].get(selected, [])
-                for tag in tags:
-                    dim_scores[tag] = dim_scores.get(tag, 0) + weights[dim]
-        scores_by_dim[dim] = dim_scores
-    return scores_by_dim
-
-def recommend_domain(scores_by_dim):
-    summary = {}
-    interests = scores_by_dim.get("Interest", {})
-    top_interest = max(interests, key=interests.get) if interests else "General"
-    interest_map = {
-        "STEM": "STEM",
-        "Creative": "Creative",
-        "Humanities": "Social",
-        "Business": "Business"
-    }
-    mapped_interest = interest_map.get(top_interest, "General")
-    if mapped_interest in career_domains:
-        summary["Careers"] = career_domains[mapped_interest]
-        summary["Universities"] = university_domains[mapped_interest]
-    return summary
-
-def get_subject_analysis(subject_scores):
-    strengths = [subj for subj, score in subject_scores.items() if score >= 85]
-    weaknesses = [subj for subj, score in subject_scores.items() if score <= 60]
-    return strengths, weaknesses
-
-def suggest_majors(strengths):
-    mapping = {
-        "Math": ["Engineering", "Computer Science", "Economics"],
-        "Physics": ["Engineering", "Astrophysics"],
-        "Chemistry": ["Pharmacy", "Chemical Engineering"],
-        "Biology": ["Medicine", "Biotech"],
-        "English": ["Journalism", "Literature"],
-        "History": ["Public Policy", "Law"],
-        "Geography": ["Environmental Studies", "Urban Planning"],
-        "Economics": ["Finance", "Data Science"]
-    }
-    suggested = []
-    for subj in strengths:
-        suggested.extend(mapping.get(subj, []))
-    return list(set(suggested))
-
-def generate_split_radar_charts(scores_by_dim):
-    charts = {}
-    for dimension, scores in scores_by_dim.items():
-        if not scores:
-            continue
-        labels = list(scores.keys())
-        values = list(scores.values())
-        angles = np.linspace(0, 2 * np.pi, len(labels), endpoint=False).tolist()
-        values += values[:1]
-        angles += angles[:1]
-
-        fig, ax = plt.subplots(figsize=(7.5, 7.5), subplot_kw=dict(polar=True))
-        ax.plot(angles, values, 'o-', linewidth=2)
-        ax.fill(angles, values, alpha=0.25)
-        ax.set_yticklabels([])
-        ax.set_xticks(angles[:-1])
-        ax.set_xticklabels(labels, fontsize=9, wrap=True)
-        ax.set_title(dimension, fontsize=14)
-        fig.subplots_adjust(top=0.85, bottom=0.1)
-
-        tmpfile = tempfile.NamedTemporaryFile(delete=False, suffix=".png")
-        plt.savefig(tmpfile.name, dpi=150)
-        charts[dimension] = tmpfile.name
-        plt.close(fig)
-    return charts
-
-def generate_summary(scores_by_dim):
-    summary = ""
-    for dim, score_map in scores_by_dim.items():
-        if score_map:
-            top_area = max(score_map, key=score_map.get)
-            summary += f"\n- {dim}: Dominant trait = {top_area}"
-    return summary
-
-def generate_detailed_scores_text(scores_by_dim):
-    details = ""
-    for dim, score_map in scores_by_dim.items():
-        if score_map:
-            details += f"\n{dim} Scores:\n"
-            for trait, score in sorted(score_map.items(), key=lambda x: -x[1]):
-                details += f"- {trait}: {score:.1f}\n"
-    return details
-
-def generate_pdf(student_name, scores_by_dim, chart_paths, recommendations):
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", size=12)
-    pdf.cell(200, 10, txt=f"Career Report: {student_name}", ln=True, align='C')
-    pdf.ln(5)
-    pdf.multi_cell(0, 10, txt=(
-        f"Dear {student_name},\n\n"
-        "Thank you for completing the career guidance assessment. Based on your responses and academic scores, this report provides an overview of your key traits and suggestions for future career paths.\n\n"
-        "This report includes insights into your personality, learning preferences, behavior, emotional tendencies, and interests. It also offers tailored recommendations for suitable majors, careers, and university options."
-    ))
-
-    pdf.ln(5)
-    pdf.set_font("Arial", size=12)
-    pdf.multi_cell(0, 10, txt="Your psychometric analysis across 6 core dimensions shows the following dominant traits:")
-    summary = generate_summary(scores_by_dim)
-    for line in summary.strip().split('\n'):
-        pdf.multi_cell(0, 8, txt=line)
-
-    pdf.add_page()
-    pdf.set_font("Arial", 'B', 14)
-    pdf.cell(0, 10, "Suggested Career Tracks & Universities", ln=True, align='C')
-    pdf.set_font("Arial", size=12)
-    for section, items in recommendations.items():
-        pdf.multi_cell(0, 8, f"\n{section} Suggestions:")
-        for item in items:
-            pdf.multi_cell(0, 8, f"- {item}")
-
-    pdf.add_page()
-    pdf.set_font("Arial", 'B', 14)
-    pdf.cell(0, 10, "Detailed Scores Breakdown", ln=True, align='C')
-    pdf.set_font("Arial", size=12)
-    detail_text = generate_detailed_scores_text(scores_by_dim)
-    pdf.multi_cell(0, 8, detail_text)
-
-    for dim in dim_labels.keys():
-        if dim in chart_paths:
-            pdf.add_page()
-            pdf.set_font("Arial", 'B', 14)
-            pdf.cell(0, 10, f"{dim} Profile", ln=True, align='C')
-            pdf.image(chart_paths[dim], x=30, y=30, w=150)
+st.set_page_config(page_title="Career Guidance Test", layout="centered")
 
-    output_buffer = BytesIO()
-    pdf_output = pdf.output(dest='S').encode('latin1')
-    output_buffer.write(pdf_output)
-    output_buffer.seek(0)
 
-    for path in chart_paths.values():
-        os.remove(path)
+@st.cache_resource
+def report_cache():
+    # Shared by every session in this server; set CAREER_GUIDANCE_CACHE_DIR to share across processes,
+    # and CAREER_GUIDANCE_CACHE_MAX_BYTES to bound that directory (512 MB by default)
+    return ReportCache(disk_dir=os.environ.get("CAREER_GUIDANCE_CACHE_DIR"), disk_max_bytes=DISK_MAX_BYTES)
+
+
+@st.cache_resource
+def report_jobs():
+    # Reports are built off the script thread; sessions poll their job by ID
+    return ReportJobs(
+        cache=report_cache(),
+        workers=int(os.environ.get("CAREER_GUIDANCE_REPORT_WORKERS", "2")),
+        max_pending=int(os.environ.get("CAREER_GUIDANCE_MAX_PENDING_REPORTS", "16")),
+    )
+
+
+@st.cache_resource
+def results_store():
+    # Completed assessments are kept only when CAREER_GUIDANCE_RESULTS_DB
+    # names an SQLite file; students are told before they generate a report
+    path = os.environ.get("CAREER_GUIDANCE_RESULTS_DB")
+    return ResultsStore(path) if path else None
+
+
+@st.cache_resource
+def session_store():
+    # Answers and page, saved as they change; CAREER_GUIDANCE_SESSIONS=sqlite:<path>
+    # lets every server process sharing the file resume any session
+    return open_sessions()
+
+
+def show_report_job(job_id, polling):
+    job = report_jobs().status(job_id)
+    pdf_bytes = job.pdf_bytes if job is not None and job.stage == "done" else None
+    if job is None or (job.stage == "done" and pdf_bytes is None):
+        st.session_state.report_job = None
+        st.info("ℹ️ Your earlier report has expired. Please generate it again.")
+    elif not job.done:
+        st.progress(job.progress, text=f"⏳ {job.message}...")
+    elif polling:
+        # Finished while polling: rerun the page once to stop the timer
+        st.rerun()
+    elif job.error:
+        st.error(f"❌ The report could not be generated ({job.error}).")
+    else:
+        st.success("✅ Report Generated Successfully!")
+        st.download_button("📄 Download Career Report", data=pdf_bytes, file_name="Career_Report.pdf", mime="application/pdf")
 
-    return output_buffer
 
 # -- STREAMLIT UI --
-if 'responses' not in st.session_state:
-    st.session_state.responses = {}
-if 'page' not in st.session_state:
-    st.session_state.page = 0
+sessions = session_store()
+# A new browser session picks up the saved session named in the link, if any
+if "session_token" not in st.session_state:
+    resume_session(st.session_state, sessions, st.query_params.get("session"))
+# A session keeps the bank it started with, even if the default is swapped
+bank = load_bank(st.session_state.setdefault("bank_version", default_bank().version))
+init_state(st.session_state, bank)
+if "session_token" not in st.session_state:
+    start_session(st.session_state, sessions, bank)
+else:
+    # Callbacks ran before this script: save the answers they changed
+    save_session(st.session_state, sessions)
+if st.query_params.get("session") != st.session_state.session_token:
+    st.query_params["session"] = st.session_state.session_token
+questions, dim_labels, subjects = bank.questions, bank.dim_labels, bank.subjects
 
 responses = st.session_state.responses
 pages = [(dim, dim_labels[dim]) for dim in dim_labels]
@@ -667,6 +88,7 @@ progress = min(int((current_page + 1) / total_sections * 100), 100)  # Ensure it
 st.markdown(f"## 🧭 Section {current_page + 1} of {total_sections}")
 st.progress(progress)
 st.markdown(f"**Progress:** {progress}% completed")
+st.caption("💾 Your answers are saved as you go. Bookmark this page to continue later.")
 
 # Section status summary with color-coded indicators
 st.markdown("### 📊 Section Completion Overview:")
@@ -686,68 +108,62 @@ if current_page < total_sections:
     st.markdown("---")
     st.header(f"🔍 {dim_name} Assessment")
 
-    all_answered = True
-    for q_id in q_ids:
-        q_data = questions.get(q_id)
-        if q_data:
-            options = list(q_data["options"].keys())
-            selected = st.radio(f"**Q{q_id}.** {q_data['question']}", options, index=None, key=f"q_{q_id}")
-            if selected:
-                responses[q_id] = selected
-            if not responses.get(q_id):
-                all_answered = False
-
-    if all_answered:
-        st.success("✅ All questions in this section answered.")
-    else:
-        st.info("ℹ️ Please answer all questions to proceed.")
-
-    st.markdown("---")
-    col1, col2, col3 = st.columns([1, 1, 1])
-    with col1:
-        if st.button("⬅️ Back") and st.session_state.page > 0:
-            st.session_state.page -= 1
-            time.sleep(0.3)
-            st.rerun()
-    with col2:
-        if st.button("Next ➡️"):
-            if not all_answered:
-                st.warning("⚠️ Please answer all questions before proceeding.")
-            else:
-                st.session_state.page += 1
-                time.sleep(0.3)
-                st.rerun()
-    with col3:
-        if st.button("🔄 Reset"):
-            st.session_state.responses = {}
-            st.session_state.page = 0
-            time.sleep(0.3)
-            st.rerun()
+    # The section is one form: answers reach the server together when a
+    # button is pressed, instead of one script run per radio click
+    with st.form(f"section_{current_page}", border=False):
+        for q_id in q_ids:
+            q_data = questions.get(q_id)
+            if q_data:
+                options = list(q_data["options"].keys())
+                answered = responses.get(q_id)
+                index = options.index(answered) if answered in options else None
+                st.radio(f"**Q{q_id}.** {q_data['question']}", options, index=index, key=f"q_{q_id}")
+
+        if section_answered(st.session_state, q_ids):
+            st.success("✅ All questions in this section answered.")
+        else:
+            st.info("ℹ️ Please answer all questions, then press Next.")
+
+        st.markdown("---")
+        col1, col2, col3 = st.columns([1, 1, 1])
+        with col1:
+            st.form_submit_button("⬅️ Back", on_click=go_back, args=(st.session_state, current_page, q_ids))
+        with col2:
+            st.form_submit_button("Next ➡️", on_click=go_next, args=(st.session_state, current_page, q_ids))
+            if st.session_state.nav_warning:
+                st.warning(st.session_state.nav_warning)
+        with col3:
+            st.form_submit_button("🔄 Reset", on_click=reset, args=(st.session_state,))
 
 else:
     st.header("🎯 Review Your Dominant Traits")
     name = st.text_input("Enter your name for the report:")
+    school = st.text_input("School (optional):").strip()
+    cohort = st.text_input("Class or cohort (optional):").strip()
     subject_scores = {}
     with st.expander("📘 Enter your Class 9 & 10 Subject Scores"):
-        for subj in ["Math", "Physics", "Chemistry", "Biology", "English", "History", "Geography", "Economics"]:
+        for subj in subjects:
             subject_scores[subj] = st.number_input(f"{subj} Marks (%)", min_value=0, max_value=100, value=75)
+    if results_store() is not None:
+        st.caption("🗂️ Your name, school, answers and marks are saved for your school's counsellors when you generate the report.")
 
     if st.button("📝 Generate Report") and name:
-        scores = calculate_scores(responses)
-        charts = generate_split_radar_charts(scores)
-        strengths, _ = get_subject_analysis(subject_scores)
-        majors = suggest_majors(strengths)
-        recommendations = recommend_domain(scores)
-        if majors:
-            recommendations["Suggested Majors"] = majors
-        else:
-            recommendations["Suggested Majors"] = ["Liberal Arts", "General Studies"]
-        pdf_bytes = generate_pdf(name, scores, charts, recommendations)
-        st.success("✅ Report Generated Successfully!")
-        st.download_button("📄 Download Career Report", data=pdf_bytes, file_name="Career_Report.pdf", mime="application/pdf")
-
-    if st.button("🔁 Start Over"):
-        st.session_state.page = 0
-        st.session_state.responses = {}
-        time.sleep(0.3)
-        st.rerun()
+        # Save each distinct completed assessment once per session
+        result_key = (report_fingerprint(name, responses, subject_scores, bank=bank), school, cohort)
+        store = results_store()
+        if store is not None and st.session_state.get("saved_result") != result_key:
+            store.add(responses, subject_scores, name, cohort=cohort or None, school=school or None, bank=bank)
+            st.session_state.saved_result = result_key
+        try:
+            st.session_state.report_job = report_jobs().submit(name, responses, subject_scores, bank=bank)
+        except QueueFull:
+            st.warning("⏳ Many reports are being generated right now. Please try again in a moment.")
+
+    job_id = st.session_state.get("report_job")
+    if job_id:
+        # Only this fragment reruns while the report is being built
+        job = report_jobs().status(job_id)
+        polling = job is not None and not job.done
+        st.fragment(show_report_job, run_every=0.5 if polling else None)(job_id, polling)
+
+    st.button("🔁 Start Over", on_click=reset, args=(st.session_state,))
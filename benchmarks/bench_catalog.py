@@ -0,0 +1,111 @@
+"""Measure catalog loading, inverted-index queries and ranking over a large catalog.
+
+    python benchmarks/bench_catalog.py --careers 5000 --majors 2000 --universities 3000
+
+A synthetic catalog is written to a temporary JSON file, with traits drawn
+from the default bank so every entry can be ranked.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from career_guidance import CareerModel, default_bank, load_catalog, scoring_engine
+
+REGIONS = ["North America", "South America", "Europe", "Africa", "Middle East", "South Asia", "East Asia", "Oceania"]
+DOMAINS = ["STEM", "Creative", "Social", "Business", "Health", "Trades"]
+
+
+def synthetic_catalog(careers, majors, universities, seed):
+    bank = default_bank()
+    rng = random.Random(seed)
+    traits = [(dim, trait) for dim, names in bank.dim_traits.items() for trait in names]
+    subjects = list(bank.subjects) + [f"Subject {i}" for i in range(24)]
+
+    def profile():
+        weights = {}
+        for dim, trait in rng.sample(traits, 6):
+            weights.setdefault(dim, {})[trait] = round(rng.uniform(0.1, 1.0), 2)
+        return weights
+
+    major_names = [f"Major {i}" for i in range(majors)]
+    return {
+        "version": f"synthetic-{seed}",
+        "careers": [
+            {"name": f"Career {i}", "domain": rng.choice(DOMAINS), "subjects": rng.sample(subjects, 3), "traits": profile()}
+            for i in range(careers)
+        ],
+        "majors": [{"name": name, "subjects": rng.sample(subjects, 2)} for name in major_names],
+        "universities": [
+            {"name": f"University {i}", "domain": rng.choice(DOMAINS), "region": rng.choice(REGIONS),
+             "majors": rng.sample(major_names, min(40, majors)), "traits": profile()}
+            for i in range(universities)
+        ],
+    }
+
+
+def timed(label, run, repeat=1000):
+    run()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = run()
+    print(f"  {label:<60}: {(time.perf_counter() - start) / repeat * 1e6:9.1f} us  ({len(result)} matches)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--careers", type=int, default=5000)
+    parser.add_argument("--majors", type=int, default=2000)
+    parser.add_argument("--universities", type=int, default=3000)
+    parser.add_argument("--students", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(synthetic_catalog(args.careers, args.majors, args.universities, args.seed), f)
+        start = time.perf_counter()
+        catalog = load_catalog(path)
+        print(f"loaded {catalog!r} in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    print("queries:")
+    timed("careers with Interest STEM", lambda: catalog.careers_where(traits=("Interest", "STEM")))
+    timed("careers with Interest STEM, Aptitude Logical, subject Math", lambda: catalog.careers_where(
+        traits=[("Interest", "STEM"), ("Aptitude", "Logical")], subjects="Math"
+    ))
+    timed("majors for Math or Physics", lambda: catalog.majors_where(subjects=["Math", "Physics"]))
+    timed("universities in Europe offering Major 1 or Major 2", lambda: catalog.universities_where(
+        regions="Europe", majors=["Major 1", "Major 2"]
+    ))
+    timed("linear scan: universities in Europe offering Major 1 or 2", lambda: [
+        i for i, (region, majors) in enumerate(zip(catalog.university_regions, catalog.university_majors))
+        if region == "Europe" and ("Major 1" in majors or "Major 2" in majors)
+    ], repeat=100)
+
+    bank = default_bank()
+    engine = scoring_engine(bank)
+    model = CareerModel(bank, catalog)
+    rng = np.random.default_rng(args.seed)
+    sizes = np.array([len(opts) for opts in bank.options])
+    scores = engine.score_matrix((rng.random((args.students, len(sizes))) * sizes).astype(np.int8))
+    start = time.perf_counter()
+    model.rank_batch(scores, k=10)
+    elapsed = time.perf_counter() - start
+    print(f"ranked {args.students} students against {len(catalog.careers)} careers (top 10): "
+          f"{elapsed:.2f}s ({args.students / elapsed:.0f} students/sec)")
+    among = catalog.careers_where(traits=("Interest", "STEM"), subjects="Math")
+    start = time.perf_counter()
+    model.rank_batch(scores, k=10, among=among)
+    print(f"  within {len(among)} STEM careers related to Math: {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
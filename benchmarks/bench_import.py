@@ -0,0 +1,65 @@
+"""Measure cold-start import time of the core package.
+
+    python benchmarks/bench_import.py --repeat 10
+
+Every sample is a fresh interpreter, so nothing is cached in sys.modules.
+The last row imports what the single-script app loaded before any scoring
+could run, for comparison.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("streamlit", "pandas", "fpdf", "matplotlib", "PIL", "numpy")
+
+TARGETS = {
+    "import career_guidance": "import career_guidance",
+    "score one student": (
+        "from career_guidance import calculate_scores, build_recommendations, questions, subjects\n"
+        "scores = calculate_scores({q_id: next(iter(q['options'])) for q_id, q in questions.items()})\n"
+        "build_recommendations(scores, {subj: 75 for subj in subjects})"
+    ),
+    "build one report (vector)": (
+        "from career_guidance import build_report, questions, subjects\n"
+        "build_report('Student', {q_id: next(iter(q['options'])) for q_id, q in questions.items()},"
+        " {subj: 75 for subj in subjects}, chart_backend='vector')"
+    ),
+    "legacy script imports": "import streamlit, pandas, fpdf, numpy, matplotlib.pyplot",
+}
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+exec(compile({code!r}, "<bench>", "exec"))
+elapsed = time.perf_counter() - start
+print(__import__("json").dumps([elapsed, [m for m in {heavy!r} if m in sys.modules]]))
+"""
+
+
+def sample(code):
+    probe = PROBE.format(code=code, heavy=HEAVY_MODULES)
+    env = dict(os.environ, PYTHONPATH=ROOT, MPLBACKEND="Agg")
+    out = subprocess.run([sys.executable, "-c", probe], env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    for label, code in TARGETS.items():
+        sample(code)  # warm the OS file cache, not the interpreter
+        samples = [sample(code) for _ in range(args.repeat)]
+        median = statistics.median(elapsed for elapsed, _ in samples)
+        loaded = ", ".join(samples[-1][1]) or "-"
+        print(f"{label:<26}: {median * 1000:7.1f} ms   heavy modules loaded: {loaded}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Compare memory per session and per stored result, dicts vs packed arrays.
+
+    python benchmarks/bench_memory.py --students 10000
+"""
+import argparse
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from career_guidance import PackedResponses, calculate_scores, default_bank, pack_scores, score_packed
+
+
+def allocated(build):
+    # Bytes still held by whatever build() returns
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, kept
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    option_lists = {q_id: list(q["options"]) for q_id, q in default_bank().questions.items()}
+    answers = [[(q_id, rng.randrange(len(opts))) for q_id, opts in option_lists.items()] for _ in range(args.students)]
+    n = args.students
+
+    dict_sessions, dicts = allocated(lambda: [{q_id: option_lists[q_id][i] for q_id, i in row} for row in answers])
+    packed_sessions, packed = allocated(lambda: [PackedResponses(responses) for responses in dicts])
+    raw_bytes, buffers = allocated(lambda: [p.to_bytes() for p in packed])
+
+    dict_scores, scores = allocated(lambda: [calculate_scores(responses) for responses in dicts])
+    array_scores, _ = allocated(lambda: [pack_scores(s) for s in scores])
+    matrix_scores, matrix = allocated(lambda: score_packed(buffers))
+    assert np.array_equal(matrix[0], pack_scores(scores[0]))
+
+    print(f"{n} students, per student:")
+    for label, total in (
+        ("responses as dict", dict_sessions),
+        ("responses as PackedResponses", packed_sessions),
+        ("responses as bytes (stored)", raw_bytes),
+        ("scores as nested dicts", dict_scores),
+        ("scores as one float64 array each", array_scores),
+        ("scores as rows of an N x T matrix", matrix_scores),
+    ):
+        print(f"  {label:<34}: {total / n:8.0f} bytes")
+
+
+if __name__ == "__main__":
+    main()
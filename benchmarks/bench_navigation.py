@@ -0,0 +1,111 @@
+"""Measure server cost of navigating and completing the assessment.
+
+    python benchmarks/bench_navigation.py --rounds 20 --baseline 58f8184
+
+Each click is timed from the button press to the end of the script runs it
+triggers, which is the time the Streamlit script thread is busy. A completed
+assessment counts the script runs and CPU time for answering all sections;
+radios outside a form cost one run per click. With --baseline REV the app
+script at that git revision is measured too.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+from streamlit.testing.v1 import AppTest
+
+from career_guidance import default_bank
+
+APP = os.path.join(ROOT, "Career Guidance.py")
+
+
+def button(at, label):
+    return next(b for b in at.button if b.label == label)
+
+
+def answer_page(at):
+    for radio in at.radio:
+        q_id = int(radio.key[2:])
+        radio.set_value(next(iter(default_bank().questions[q_id]["options"])))
+    at.run()
+
+
+def timed_click(at, label):
+    start = time.perf_counter()
+    button(at, label).click().run(timeout=30)
+    return time.perf_counter() - start
+
+
+def measure(script, rounds):
+    at = AppTest.from_file(script, default_timeout=30)
+    at.run()
+    timings = {"Next ➡️": [], "⬅️ Back": [], "🔄 Reset": []}
+    for _ in range(rounds):
+        answer_page(at)
+        timings["Next ➡️"].append(timed_click(at, "Next ➡️"))
+        timings["⬅️ Back"].append(timed_click(at, "⬅️ Back"))
+        timings["🔄 Reset"].append(timed_click(at, "🔄 Reset"))
+        assert not at.exception and at.session_state.page == 0, "navigation ended on the wrong page"
+    return timings
+
+
+def complete_assessment(script):
+    at = AppTest.from_file(script, default_timeout=30)
+    at.run()
+    runs = 1
+    start = time.process_time()
+    while at.radio:
+        page = at.session_state.page
+        for i in range(len(at.radio)):
+            # Every run rebuilds the element tree, so look the radio up again
+            radio = at.radio[i]
+            q_id = int(radio.key[2:])
+            radio.set_value(next(iter(default_bank().questions[q_id]["options"])))
+            if not radio.proto.form_id:
+                at.run()
+                runs += 1
+        button(at, "Next ➡️").click().run(timeout=30)
+        runs += 1
+        assert at.session_state.page == page + 1, "Next did not advance"
+    assert not at.exception, "assessment did not complete"
+    return runs, time.process_time() - start
+
+
+def report(label, timings, assessment):
+    print(label)
+    for name, samples in timings.items():
+        samples = sorted(samples)
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        print(f"  {name:<10} median {statistics.median(samples) * 1000:7.1f} ms   p95 {p95 * 1000:7.1f} ms")
+    runs, cpu = assessment
+    print(f"  completed assessment: {runs} script runs, {cpu * 1000:.0f} ms CPU")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--baseline", help="git revision of the app script to compare against")
+    args = parser.parse_args(argv)
+
+    if args.baseline:
+        source = subprocess.run(
+            ["git", "show", f"{args.baseline}:Career Guidance.py"], cwd=ROOT, check=True, capture_output=True
+        ).stdout
+        with tempfile.TemporaryDirectory() as tmp:
+            script = os.path.join(tmp, "app.py")
+            with open(script, "wb") as f:
+                f.write(source)
+            report(f"baseline ({args.baseline})", measure(script, args.rounds), complete_assessment(script))
+    report("current", measure(APP, args.rounds), complete_assessment(APP))
+
+
+if __name__ == "__main__":
+    main()
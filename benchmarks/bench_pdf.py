@@ -0,0 +1,73 @@
+"""Measure generate_pdf throughput, single-threaded and across processes.
+
+    python benchmarks/bench_pdf.py --reports 500 --workers 4
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+from career_guidance import build_recommendations, calculate_scores, default_bank, generate_pdf, generate_split_radar_charts
+from career_guidance.pdf import ReportPDF
+
+
+def make_inputs(count, seed, backend):
+    rng = random.Random(seed)
+    bank = default_bank()
+    inputs = []
+    for i in range(count):
+        scores = calculate_scores({q_id: rng.choice(list(q["options"])) for q_id, q in bank.questions.items()})
+        recommendations = build_recommendations(scores, {subj: rng.randint(40, 100) for subj in bank.subjects})
+        charts = generate_split_radar_charts(scores, backend=backend)
+        inputs.append((f"Student {i}", scores, charts, recommendations))
+    return inputs
+
+
+def generate_all(inputs):
+    for name, scores, charts, recommendations in inputs:
+        generate_pdf(name, scores, charts, recommendations)
+    return len(inputs)
+
+
+def pdfs_per_sec(run, inputs):
+    start = time.perf_counter()
+    count = run(inputs)
+    return count / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reports", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chart-backend", default="vector")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    inputs = make_inputs(args.reports, args.seed, args.chart_backend)
+    generate_all(inputs[:1])
+
+    ReportPDF.reuse_static_blocks = False
+    uncached = pdfs_per_sec(generate_all, inputs)
+    ReportPDF.reuse_static_blocks = True
+    cached = pdfs_per_sec(generate_all, inputs)
+
+    chunks = [inputs[i::args.workers] for i in range(args.workers)]
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        list(pool.map(generate_all, [chunk[:1] for chunk in chunks]))
+        parallel = pdfs_per_sec(lambda _: sum(pool.map(generate_all, chunks)), inputs)
+
+    for label, rate in (
+        ("single process, no static blocks", uncached),
+        ("single process, static blocks", cached),
+        (f"{args.workers} processes, static blocks", parallel),
+    ):
+        print(f"{label:<34}: {rate:8.1f} PDFs/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""Time every stage of the report pipeline, alone and end to end, at several batch sizes.
+
+    python benchmarks/bench_pipeline.py --save-baseline
+    python benchmarks/bench_pipeline.py --compare          # exit 1 on a regression
+
+Synthetic students are drawn from the question bank with a fixed seed.
+Per-student stages (calculate_scores, recommend_domain, suggest_majors,
+charts, PDF, end to end) are timed call by call, batch stages
+(score_matrix, recommend_batch) per batch call. Each batch runs for up to
+--repeat rounds until --min-time is spent; throughput comes from the
+fastest round, latency percentiles from every call. The peak traced
+memory of one round is measured in a separate untimed pass. Chart and PDF
+stages are slow, so they stop at --max-render students.
+
+Baselines are JSON files (benchmarks/baselines/pipeline.json by default)
+holding the results and the machine they were measured on; --compare
+flags stage/batch pairs whose throughput fell more than --tolerance
+below the baseline. Compare against a baseline from the same machine.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+import numpy as np
+
+from career_guidance import (
+    calculate_scores, default_bank, generate_pdf, generate_split_radar_charts, get_subject_analysis,
+    recommend_domain, recommendation_index, render_report, scoring_engine, suggest_majors,
+)
+from career_guidance.charts import DEFAULT_CHART_BACKEND, chart_cache
+
+BASELINE = os.path.join(ROOT, "benchmarks", "baselines", "pipeline.json")
+BATCH_SIZES = (1, 10, 100, 1000, 10000, 100000)
+
+
+def synthetic_students(count, seed):
+    bank = default_bank()
+    rng = random.Random(seed)
+    students = []
+    for i in range(count):
+        responses = {q_id: rng.choice(bank.options[pos]) for pos, q_id in enumerate(bank.q_ids)}
+        subject_scores = {subj: rng.randint(40, 100) for subj in bank.subjects}
+        students.append((f"Student {i}", responses, subject_scores))
+    return students
+
+
+class Batch:
+    """One batch of students and the intermediate results later stages start from."""
+
+    def __init__(self, students, chart_backend):
+        self.bank = default_bank()
+        self.engine = scoring_engine(self.bank)
+        self.index = recommendation_index(self.bank)
+        self.chart_backend = chart_backend
+        self.students = students
+        self.scores = [calculate_scores(responses) for _, responses, _ in students]
+        self.strengths = [get_subject_analysis(subject_scores)[0] for _, _, subject_scores in students]
+        self.matrix = self.engine.encode_batch([responses for _, responses, _ in students])
+        self._rendered = None
+
+    def rendered(self):
+        # Charts and recommendations for the PDF stage, built on first use
+        if self._rendered is None:
+            self._rendered = [
+                (generate_split_radar_charts(scores, backend=self.chart_backend, cache=None),
+                 self.index.recommend(scores, subject_scores))
+                for scores, (_, _, subject_scores) in zip(self.scores, self.students)
+            ]
+        return self._rendered
+
+
+def _per_student(batch, name):
+    if name == "calculate_scores":
+        return [lambda responses=responses: calculate_scores(responses) for _, responses, _ in batch.students]
+    if name == "recommend_domain":
+        return [lambda scores=scores: recommend_domain(scores) for scores in batch.scores]
+    if name == "suggest_majors":
+        return [lambda strengths=strengths: suggest_majors(strengths) for strengths in batch.strengths]
+    if name == "charts":
+        return [
+            lambda scores=scores: generate_split_radar_charts(scores, backend=batch.chart_backend, cache=None)
+            for scores in batch.scores
+        ]
+    if name == "pdf":
+        return [
+            lambda student=student, scores=scores, rendered=rendered: generate_pdf(student[0], scores, *rendered)
+            for student, scores, rendered in zip(batch.students, batch.scores, batch.rendered())
+        ]
+    if name == "end_to_end":
+        return [
+            lambda student=student: render_report(*student, chart_backend=batch.chart_backend)
+            for student in batch.students
+        ]
+    raise KeyError(name)
+
+
+def _batch_call(batch, name):
+    if name == "score_matrix":
+        return lambda: batch.engine.score_matrix(batch.matrix)
+    if name == "recommend_batch":
+        return lambda: batch.index.recommend_batch(batch.matrix, [subject_scores for _, _, subject_scores in batch.students])
+    raise KeyError(name)
+
+
+PER_STUDENT = ("calculate_scores", "recommend_domain", "suggest_majors", "charts", "pdf", "end_to_end")
+BATCHED = ("score_matrix", "recommend_batch")
+RENDERING = ("charts", "pdf", "end_to_end")
+STAGES = PER_STUDENT[:3] + BATCHED + RENDERING
+
+
+def measure(batch, stage, repeat, min_time, memory, warmup):
+    # Rounds over the whole batch, up to ``repeat`` and stopping once
+    # ``min_time`` is spent; throughput comes from the fastest round
+    if stage in PER_STUDENT:
+        calls = _per_student(batch, stage)
+        # Load imports outside the timing, with a student outside the batch
+        _per_student(warmup, stage)[0]()
+    else:
+        call = _batch_call(batch, stage)
+        call()
+        calls = [call]
+    latencies = []
+    rounds = []
+    spent = 0.0
+    while len(rounds) < repeat and (not rounds or spent < min_time):
+        if stage == "end_to_end":
+            # Every round starts from a cold chart cache, whatever earlier
+            # rounds and batch sizes rendered
+            chart_cache.clear()
+        start = time.perf_counter()
+        for call in calls:
+            t = time.perf_counter()
+            call()
+            latencies.append(time.perf_counter() - t)
+        rounds.append(time.perf_counter() - start)
+        spent += rounds[-1]
+    seconds = min(rounds)
+    items = len(batch.students)
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    result = {
+        "items": items,
+        "rounds": len(rounds),
+        "seconds": round(seconds, 6),
+        "items_per_sec": round(items / seconds, 2) if seconds else None,
+        "p50_ms": round(p50, 4), "p95_ms": round(p95, 4), "p99_ms": round(p99, 4),
+    }
+    if memory:
+        if stage == "end_to_end":
+            chart_cache.clear()
+        tracemalloc.start()
+        # The peak includes every result, since the list holds them all at once
+        if stage in PER_STUDENT:
+            [call() for call in _per_student(batch, stage)]
+        else:
+            _batch_call(batch, stage)()
+        result["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 1e6, 3)
+        tracemalloc.stop()
+    return result
+
+
+def environment():
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        "revision": revision,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    print(f"\ncompared with baseline from {baseline['environment'].get('revision')} (tolerance {tolerance:.0%}):")
+    for stage, by_batch in results.items():
+        for size, result in by_batch.items():
+            before = baseline["results"].get(stage, {}).get(size)
+            if not before or not before.get("items_per_sec") or not result.get("items_per_sec"):
+                continue
+            ratio = result["items_per_sec"] / before["items_per_sec"]
+            flag = ""
+            if ratio < 1 - tolerance:
+                regressions.append((stage, size, ratio))
+                flag = "  REGRESSION"
+            print(f"  {stage:<17} batch {size:>6}: {ratio:6.2f}x baseline throughput{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=BATCH_SIZES)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--max-render", type=int, default=100, help="largest batch for the chart, PDF and end-to-end stages")
+    parser.add_argument("--repeat", type=int, default=5, help="most rounds over each batch")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds after which no further round starts")
+    parser.add_argument("--chart-backend", default=DEFAULT_CHART_BACKEND)
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak-memory pass")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save-baseline", nargs="?", const=BASELINE, help="write the results as a baseline file")
+    parser.add_argument("--compare", nargs="?", const=BASELINE, help="compare with a baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="throughput drop counted as a regression")
+    args = parser.parse_args(argv)
+
+    students = synthetic_students(max(args.batch_sizes), args.seed)
+    warmup = Batch(synthetic_students(1, args.seed + 1), args.chart_backend)
+    results = {stage: {} for stage in args.stages}
+    print(f"{'stage':<17} {'batch':>6} {'items/sec':>12} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak MB':>9}")
+    for size in sorted(args.batch_sizes):
+        batch = Batch(students[:size], args.chart_backend)
+        for stage in args.stages:
+            if stage in RENDERING and size > args.max_render:
+                continue
+            result = measure(batch, stage, args.repeat, args.min_time, not args.no_memory, warmup)
+            results[stage][str(size)] = result
+            print(
+                f"{stage:<17} {size:>6} {result['items_per_sec'] or 0:>12.1f} {result['p50_ms']:>9.3f} "
+                f"{result['p95_ms']:>9.3f} {result['p99_ms']:>9.3f} {result.get('peak_mb', float('nan')):>9.2f}"
+            )
+
+    report = {"environment": environment(), "args": {"seed": args.seed, "chart_backend": args.chart_backend}, "results": results}
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"\nbaseline written to {args.save_baseline}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regressions")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""Compare the cached radar-chart templates against fresh figures per chart.
+
+    python benchmarks/bench_radar_charts.py --students 50
+"""
+import argparse
+import os
+from io import BytesIO
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from career_guidance import calculate_scores, default_bank, generate_split_radar_charts
+
+
+def fresh_figure_charts(scores_by_dim):
+    # The previous implementation: a new pyplot figure for every chart
+    charts = {}
+    for dimension, scores in scores_by_dim.items():
+        if not scores:
+            continue
+        labels = list(scores.keys())
+        values = list(scores.values())
+        angles = np.linspace(0, 2 * np.pi, len(labels), endpoint=False).tolist()
+        values += values[:1]
+        angles += angles[:1]
+
+        fig, ax = plt.subplots(figsize=(7.5, 7.5), subplot_kw=dict(polar=True))
+        ax.plot(angles, values, 'o-', linewidth=2)
+        ax.fill(angles, values, alpha=0.25)
+        ax.set_yticklabels([])
+        ax.set_xticks(angles[:-1])
+        ax.set_xticklabels(labels, fontsize=9, wrap=True)
+        ax.set_title(dimension, fontsize=14)
+        fig.subplots_adjust(top=0.85, bottom=0.1)
+
+        png = BytesIO()
+        plt.savefig(png, format="png", dpi=150)
+        charts[dimension] = png.getvalue()
+        plt.close(fig)
+    return charts
+
+
+def random_responses(rng):
+    return {q_id: rng.choice(list(q["options"])) for q_id, q in default_bank().questions.items()}
+
+
+def timed(render, score_sets):
+    start = time.perf_counter()
+    for scores in score_sets:
+        render(scores)
+    return (time.perf_counter() - start) / len(score_sets)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    score_sets = [calculate_scores(random_responses(rng)) for _ in range(args.students)]
+    # Load fonts once so neither path pays for it on the first student
+    fresh_figure_charts(score_sets[0])
+
+    fresh = timed(fresh_figure_charts, score_sets)
+    # First pass builds the templates and backgrounds, second pass reuses them
+    cold = timed(generate_split_radar_charts, score_sets)
+    warm = timed(generate_split_radar_charts, score_sets)
+    print(f"fresh figures    : {fresh * 1000:8.1f} ms per report")
+    print(f"templates (cold) : {cold * 1000:8.1f} ms per report ({fresh / cold:.1f}x)")
+    print(f"templates (warm) : {warm * 1000:8.1f} ms per report ({fresh / warm:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Measure ResultsStore writes, indexed cohort queries and cohort analytics.
+
+    python benchmarks/bench_store.py --results 1000000 --db /tmp/results.sqlite3
+
+Synthetic students are spread over schools, cohorts and a year of dates.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from career_guidance import default_bank, scoring_engine
+from career_guidance.analytics import CohortAnalytics
+from career_guidance.store import ResultsStore
+
+
+def fill(store, count, seed, chunk=10000):
+    bank = default_bank()
+    engine = scoring_engine(bank)
+    rng = np.random.default_rng(seed)
+    sizes = np.array([len(opts) for opts in bank.options])
+    start = time.time() - 365 * 86400
+    for offset in range(0, count, chunk):
+        n = min(chunk, count - offset)
+        codes = (rng.random((n, len(sizes))) * sizes).astype(np.int8)
+        scores = engine.score_matrix(codes)
+        for i, (row, score_row) in enumerate(zip(codes.tolist(), scores)):
+            student = offset + i
+            store.add(
+                dict(zip(bank.q_ids, (bank.options[pos][code] for pos, code in enumerate(row)))),
+                {"Math": 90},
+                f"Student {student}",
+                cohort=f"Class {student % 40}",
+                school=f"School {student % 25}",
+                created_at=start + student * 365 * 86400 / count,
+                scores_by_dim=engine.to_dict(score_row, row),
+                bank=bank,
+            )
+    store.flush()
+
+
+def timed(label, run, repeat=5):
+    run()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = run()
+    print(f"  {label:<52}: {(time.perf_counter() - start) / repeat * 1000:8.2f} ms  ({result})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--results", type=int, default=200000)
+    parser.add_argument("--db", help="database file (default: a temporary file)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db or os.path.join(tmp, "results.sqlite3")
+        store = ResultsStore(path, batch_size=5000, flush_interval=0)
+        existing = store.count()
+        if existing < args.results:
+            start = time.perf_counter()
+            fill(store, args.results - existing, args.seed)
+            elapsed = time.perf_counter() - start
+            print(f"wrote {args.results - existing} results in {elapsed:.1f}s ({(args.results - existing) / elapsed:.0f}/sec)")
+
+        print(f"queries over {store.count()} results:")
+        recent = time.time() - 30 * 86400
+        timed("count, top Interest is STEM", lambda: store.count(dominant={"Interest": "STEM"}))
+        timed("count, one school, top Interest is STEM", lambda: store.count(school="School 3", dominant={"Interest": "STEM"}))
+        timed("count, one cohort in one school", lambda: store.count(school="School 3", cohort="Class 3"))
+        timed("count, last 30 days", lambda: store.count(since=recent))
+        timed("first 100 rows, STEM and top Aptitude Logical", lambda: sum(
+            1 for _ in store.query(limit=100, dominant={"Interest": "STEM", "Aptitude": "Logical"})
+        ))
+
+        analytics = CohortAnalytics(group_by="school")
+        start = time.perf_counter()
+        read = analytics.update(store)
+        print(f"analytics over {read} results: {time.perf_counter() - start:.2f}s")
+        fill(store, 1000, args.seed + 1)
+        start = time.perf_counter()
+        read = analytics.update(store)
+        print(f"incremental analytics update, {read} new results: {(time.perf_counter() - start) * 1000:.1f} ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
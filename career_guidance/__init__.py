@@ -0,0 +1,19 @@
+from .bank import BankError, QuestionBank, available_versions, default_bank, load_bank, set_default_version
+from .scoring import calculate_scores, ScoringEngine, scoring_engine
+from .recommend import recommend_domain, get_subject_analysis, suggest_majors, build_recommendations, RecommendationIndex, recommendation_index
+from .catalog import CatalogError, Catalog, default_catalog, load_catalog
+from .ranking import CareerModel, career_model
+from .charts import generate_split_radar_charts
+from .report import generate_summary, generate_detailed_scores_text, generate_pdf, render_report, build_report
+from .cache import ReportCache, report_fingerprint
+from .compact import PackedResponses, pack_responses, unpack_responses, pack_scores, unpack_scores, score_packed
+from .store import ResultsStore
+from .sessions import MemorySessions, SQLiteSessions, open_sessions
+
+
+def __getattr__(name):
+    # bank_version, questions, dim_labels, ... follow the current default bank
+    from . import bank
+    if name in bank._DEFAULT_BANK_FIELDS or name in bank._CATALOG_FIELDS:
+        return getattr(bank, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
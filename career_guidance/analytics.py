@@ -0,0 +1,123 @@
+"""Cohort analytics over the results store.
+
+    analytics = CohortAnalytics(group_by="school")
+    analytics.update(store)        # only reads results added since the last update
+    analytics.dominant_traits()    # students per group, dimension and dominant trait
+    analytics.domain_mix()         # recommend_domain outcome per group
+    analytics.subject_interest()   # Interest scores of students strong in each subject
+
+Results are streamed from the store in chunks and folded into running
+counts and sums, so memory depends on the number of groups and traits, not
+on the number of students.
+"""
+import numpy as np
+import pandas as pd
+
+from .bank import default_bank
+from .recommend import STRENGTH_MIN, recommendation_index
+from .scoring import scoring_engine
+
+GROUPINGS = (None, "school", "cohort")
+# Group label for all students, and for results stored without a school or cohort
+ALL = "All"
+UNKNOWN = "(not given)"
+
+
+def _add(total, counts):
+    if total is None or total.empty:
+        return counts
+    return total.add(counts, fill_value=0)
+
+
+class CohortAnalytics:
+    """Incremental aggregates of stored results for one question bank.
+
+    ``filters`` (cohort, school, since, until, dominant) restrict which
+    stored results are counted, as in ResultsStore.query.
+    """
+
+    def __init__(self, bank=None, group_by="school", chunk_size=10000, **filters):
+        if group_by not in GROUPINGS:
+            raise ValueError(f"group_by must be one of {GROUPINGS}, got {group_by!r}")
+        self.bank = bank or default_bank()
+        self.engine = scoring_engine(self.bank)
+        self.recommendations = recommendation_index(self.bank)
+        self.group_by = group_by
+        self.chunk_size = chunk_size
+        self.filters = filters
+        self.last_id = 0
+        self.students = pd.Series(dtype=np.int64)
+        self._dominant = None
+        self._domains = None
+        self._subjects = None
+
+    def update(self, store):
+        """Fold in results stored since the last update; returns how many were read."""
+        added = 0
+        for chunk in store.iter_chunks(self.bank.version, after_id=self.last_id, chunk_size=self.chunk_size, **self.filters):
+            self.add_chunk(chunk)
+            self.last_id = int(chunk["id"][-1])
+            added += len(chunk["id"])
+        return added
+
+    def add_chunk(self, chunk):
+        count = len(chunk["id"])
+        if self.group_by:
+            groups = pd.Series(chunk[self.group_by], dtype=object).fillna(UNKNOWN).to_numpy()
+        else:
+            groups = np.full(count, ALL, dtype=object)
+        self.students = _add(self.students, pd.Series(groups).value_counts())
+
+        dominant = self.engine.dominant_batch(chunk["answers"], chunk["scores"])
+        frames = []
+        for dim, best in dominant.items():
+            names = np.array(self.engine.traits[dim] + (None,), dtype=object)[best]
+            scored = best >= 0
+            frames.append(pd.DataFrame({"group": groups[scored], "dimension": dim, "trait": names[scored]}))
+        if frames:
+            counts = pd.concat(frames).groupby(["group", "dimension", "trait"]).size()
+            self._dominant = _add(self._dominant, counts)
+
+        if "Interest" not in self.engine.columns:
+            return
+        # recommend_domain: the top Interest trait picks the domain, "General" otherwise
+        domains = np.array(self.recommendations.domains, dtype=object)[dominant["Interest"]]
+        counts = pd.DataFrame({"group": groups, "domain": domains}).groupby(["group", "domain"]).size()
+        self._domains = _add(self._domains, counts)
+
+        # Interest scores of the students strong in each subject (get_subject_analysis)
+        marks = pd.DataFrame(chunk["subject_scores"], index=range(count)).apply(pd.to_numeric, errors="coerce")
+        strong = (marks >= STRENGTH_MIN).stack()
+        strong = strong[strong]
+        if strong.empty:
+            return
+        rows = strong.index.get_level_values(0).to_numpy()
+        interest = pd.DataFrame(chunk["scores"][rows][:, self.engine.columns["Interest"]], columns=list(self.engine.traits["Interest"]))
+        interest.insert(0, "students", 1)
+        interest["group"] = groups[rows]
+        interest["subject"] = strong.index.get_level_values(1).to_numpy()
+        self._subjects = _add(self._subjects, interest.groupby(["group", "subject"]).sum())
+
+    def dominant_traits(self):
+        """Students per group, dimension and dominant trait, with their share of the group."""
+        if self._dominant is None:
+            return pd.DataFrame(columns=["group", "dimension", "trait", "students", "share"])
+        table = self._dominant.astype(np.int64).rename("students").reset_index()
+        table["share"] = table["students"] / table["group"].map(self.students)
+        return table.sort_values(["group", "dimension", "students"], ascending=[True, True, False], ignore_index=True)
+
+    def domain_mix(self):
+        """Students per group (rows) and recommended domain (columns)."""
+        if self._domains is None:
+            return pd.DataFrame()
+        return self._domains.astype(np.int64).unstack(fill_value=0)
+
+    def subject_interest(self):
+        """Per group and strong subject: students, and their mean score per Interest trait."""
+        if self._subjects is None:
+            return pd.DataFrame()
+        table = self._subjects.copy()
+        traits = [column for column in table.columns if column != "students"]
+        table[traits] = table[traits].div(table["students"], axis=0)
+        table["students"] = table["students"].astype(np.int64)
+        return table
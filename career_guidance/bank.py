@@ -0,0 +1,254 @@
+import json
+import logging
+import os
+import threading
+import time
+from types import MappingProxyType
+
+# Banks are JSON files named <version>.json. A published version never
+# changes: edit questions, weights or mappings under a new version so cached
+# reports and in-progress sessions are not mixed with the new bank.
+BANK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "banks")
+DEFAULT_BANK_VERSION = os.environ.get("CAREER_GUIDANCE_BANK_VERSION", "1")
+# Holds the default version while the server runs: writing another version
+# into it swaps the default bank in every process within POINTER_INTERVAL
+# seconds. Without the file the default is CAREER_GUIDANCE_BANK_VERSION.
+BANK_POINTER = os.environ.get("CAREER_GUIDANCE_BANK_POINTER", os.path.join(BANK_DIR, "CURRENT"))
+POINTER_INTERVAL = 2.0
+
+logger = logging.getLogger(__name__)
+
+_banks = {}
+_banks_lock = threading.Lock()
+_default_version = DEFAULT_BANK_VERSION
+_pointer_lock = threading.Lock()
+_pointer_checked = float("-inf")
+_pointer_mtime = None
+
+
+class BankError(ValueError):
+    """A question bank file is missing or malformed."""
+
+
+def _frozen(mapping):
+    return MappingProxyType(dict(mapping))
+
+
+class QuestionBank:
+    """A validated question bank compiled into read-only lookup tables.
+
+    Besides the source mappings (``questions``, ``dim_labels``, ``weights``,
+    ``subjects``) it holds:
+
+    - ``q_ids``: question IDs in dimension order, ``q_pos`` their positions
+    - ``options[pos]``: option texts, ``option_index[pos]`` text -> index
+    - ``trait_names``: every trait once, indexed by interned trait ID
+    - ``dim_traits[dim]``: trait names in order of first appearance in the
+      bank, ``dim_trait_ids[dim]`` the matching trait IDs and
+      ``dim_trait_index[dim]`` trait name -> column
+    - ``option_traits[pos][option]``: trait columns within the question's
+      dimension
+    - ``dim_columns[dim]``: the dimension's slice of the fixed score layout,
+      all dimensions' traits side by side; ``column_trait_ids`` the trait ID
+      of every column
+    """
+
+    def __init__(self, data):
+        validate_bank(data)
+        self.version = data["version"]
+        self.questions = _frozen(
+            (int(q_id), _frozen({
+                "question": q["question"],
+                "options": _frozen((option, tuple(tags)) for option, tags in q["options"].items()),
+            }))
+            for q_id, q in data["questions"].items()
+        )
+        self.dim_labels = _frozen((dim, tuple(q_ids)) for dim, q_ids in data["dim_labels"].items())
+        self.weights = _frozen((dim, float(weight)) for dim, weight in data["weights"].items())
+        self.subjects = tuple(data["subjects"])
+
+        self.q_ids = tuple(q_id for q_ids in self.dim_labels.values() for q_id in q_ids)
+        self.q_pos = _frozen((q_id, pos) for pos, q_id in enumerate(self.q_ids))
+        self.options = tuple(tuple(self.questions[q_id]["options"]) for q_id in self.q_ids)
+        self.option_index = tuple(_frozen((opt, i) for i, opt in enumerate(opts)) for opts in self.options)
+
+        trait_ids = {}
+        dim_traits = {}
+        option_traits = []
+        for dim, q_ids in self.dim_labels.items():
+            columns = {}
+            for q_id in q_ids:
+                per_option = []
+                for tags in self.questions[q_id]["options"].values():
+                    for tag in tags:
+                        columns.setdefault(tag, len(columns))
+                        trait_ids.setdefault(tag, len(trait_ids))
+                    per_option.append(tuple(columns[tag] for tag in tags))
+                option_traits.append(tuple(per_option))
+            dim_traits[dim] = tuple(columns)
+        self.trait_ids = _frozen(trait_ids)
+        self.trait_names = tuple(trait_ids)
+        self.dim_traits = _frozen(dim_traits)
+        self.dim_trait_index = _frozen(
+            (dim, _frozen((trait, col) for col, trait in enumerate(traits))) for dim, traits in dim_traits.items()
+        )
+        self.dim_trait_ids = _frozen((dim, tuple(trait_ids[t] for t in traits)) for dim, traits in dim_traits.items())
+        self.option_traits = tuple(option_traits)
+
+        dim_columns = {}
+        start = 0
+        for dim, traits in dim_traits.items():
+            dim_columns[dim] = slice(start, start + len(traits))
+            start += len(traits)
+        self.dim_columns = _frozen(dim_columns)
+        self.column_trait_ids = tuple(trait_id for ids in self.dim_trait_ids.values() for trait_id in ids)
+
+    def __repr__(self):
+        return f"QuestionBank(version={self.version!r}, questions={len(self.questions)})"
+
+
+def validate_bank(data):
+    def fail(message):
+        raise BankError(f"Question bank {data.get('version', '?')!r}: {message}")
+
+    for field in ("version", "questions", "dim_labels", "weights", "subjects"):
+        if field not in data:
+            fail(f"missing {field!r}")
+    if not isinstance(data["version"], str) or not data["version"]:
+        fail("version must be a non-empty string")
+
+    for q_id, q in data["questions"].items():
+        if not str(q_id).isdigit():
+            fail(f"question ID {q_id!r} is not a number")
+        if not isinstance(q.get("question"), str) or not q["question"]:
+            fail(f"question {q_id} has no text")
+        options = q.get("options")
+        if not options or not isinstance(options, dict):
+            fail(f"question {q_id} has no options")
+        # Responses store option indices in a signed byte
+        if len(options) > 127:
+            fail(f"question {q_id} has more than 127 options")
+        for option, tags in options.items():
+            if not isinstance(tags, list) or not all(isinstance(tag, str) and tag for tag in tags):
+                fail(f"option {option!r} of question {q_id} must list trait names")
+
+    known = {int(q_id) for q_id in data["questions"]}
+    placed = [q_id for q_ids in data["dim_labels"].values() for q_id in q_ids]
+    if len(placed) != len(set(placed)):
+        fail("a question is listed under more than one dimension")
+    if set(placed) != known:
+        fail(f"questions without a dimension: {sorted(known - set(placed))}, unknown questions: {sorted(set(placed) - known)}")
+    if set(data["weights"]) != set(data["dim_labels"]):
+        fail("weights must cover exactly the dimensions in dim_labels")
+    if not all(isinstance(w, (int, float)) and not isinstance(w, bool) for w in data["weights"].values()):
+        fail("weights must be numbers")
+    if len(set(data["subjects"])) != len(data["subjects"]):
+        fail("subjects must be unique")
+
+
+def bank_path(version):
+    return os.path.join(BANK_DIR, f"{version}.json")
+
+
+def available_versions():
+    try:
+        names = os.listdir(BANK_DIR)
+    except OSError:
+        return []
+    return sorted(name[:-len(".json")] for name in names if name.endswith(".json"))
+
+
+def load_bank(version=None):
+    """Return the compiled bank for ``version``, loading it on first use.
+
+    Banks are compiled once per process; later calls are a dict lookup. A
+    version added to BANK_DIR while the server runs can be loaded right away.
+    """
+    version = str(version or _default_version)
+    bank = _banks.get(version)
+    if bank is not None:
+        return bank
+    with _banks_lock:
+        if version not in _banks:
+            path = bank_path(version)
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                raise BankError(f"No question bank {version!r} in {BANK_DIR}; available: {available_versions()}") from None
+            except json.JSONDecodeError as e:
+                raise BankError(f"Question bank {path} is not valid JSON: {e}") from None
+            bank = QuestionBank(data)
+            if bank.version != version:
+                raise BankError(f"{path} declares version {bank.version!r}")
+            _banks[version] = bank
+        return _banks[version]
+
+
+def _check_pointer():
+    # A stat at most every POINTER_INTERVAL seconds; the file is read only
+    # when its mtime changes
+    global _pointer_checked, _pointer_mtime
+    now = time.monotonic()
+    if now - _pointer_checked < POINTER_INTERVAL:
+        return
+    with _pointer_lock:
+        if now - _pointer_checked < POINTER_INTERVAL:
+            return
+        _pointer_checked = now
+        try:
+            mtime = os.stat(BANK_POINTER).st_mtime_ns
+            if mtime == _pointer_mtime:
+                return
+            with open(BANK_POINTER, encoding="utf-8") as f:
+                version = f.read().strip()
+        except OSError:
+            return
+        _pointer_mtime = mtime
+        if version and version != _default_version:
+            try:
+                set_default_version(version)
+            except BankError as e:
+                logger.error("Keeping question bank %r: %s names a bank that cannot be loaded: %s",
+                             _default_version, BANK_POINTER, e)
+            else:
+                logger.info("Default question bank is now %r", version)
+
+
+def default_bank():
+    _check_pointer()
+    return load_bank(_default_version)
+
+
+def set_default_version(version):
+    # New sessions and reports pick up the new bank; sessions already
+    # running keep the version they started with
+    global _default_version
+    load_bank(version)
+    _default_version = str(version)
+
+
+# The default bank's fields as module attributes, for callers that only use
+# one bank. They are looked up on every access, so they follow a swap; code
+# that keeps a bank for a while should hold default_bank() instead.
+_DEFAULT_BANK_FIELDS = {
+    "bank_version": "version",
+    "questions": "questions",
+    "dim_labels": "dim_labels",
+    "weights": "weights",
+    "subjects": "subjects",
+}
+
+
+# Careers and universities per domain live in the catalog
+_CATALOG_FIELDS = {"career_domains": "careers_by_domain", "university_domains": "universities_by_domain"}
+
+
+def __getattr__(name):
+    if name in _CATALOG_FIELDS:
+        from .catalog import default_catalog
+        return getattr(default_catalog(), _CATALOG_FIELDS[name])
+    field = _DEFAULT_BANK_FIELDS.get(name)
+    if field is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(default_bank(), field)
@@ -0,0 +1,163 @@
+"""Generate career reports offline from a CSV or JSONL file of students.
+
+    python -m career_guidance.bulk students.csv -o reports/
+
+CSV files have a ``name`` column, ``Q1``..``Q60`` answer columns holding the
+option text and one column per subject. JSONL lines hold ``name``,
+``responses`` (question id -> option text) and ``subject_scores``.
+Reports that already exist in the output directory are skipped, so an
+interrupted run can simply be restarted. Charts are drawn with the vector
+backend by default, so workers never import matplotlib.
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+from .bank import default_bank, load_bank
+from .charts import CHART_BACKENDS, chart_cache
+from .report import build_report
+
+DEFAULT_SUBJECT_SCORE = 75
+
+
+def check_answers(responses, bank):
+    # An answer the bank does not offer would otherwise be scored as unanswered
+    for q_id, answer in responses.items():
+        if q_id not in bank.q_pos:
+            raise ValueError(f"unknown question {q_id!r}")
+        if not isinstance(answer, str) or answer not in bank.option_index[bank.q_pos[q_id]]:
+            raise ValueError(f"{answer!r} is not an option of question {q_id}")
+    return responses
+
+
+def read_students(path, bank=None):
+    # Rows are read against one bank, even if the default is swapped meanwhile
+    bank = bank or default_bank()
+    if path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            for index, line in enumerate(f):
+                if not line.strip():
+                    continue
+                record = None
+                try:
+                    record = json.loads(line)
+                    responses = check_answers({int(q_id): answer for q_id, answer in record.get("responses", {}).items()}, bank)
+                    subject_scores = {subj: float(record.get("subject_scores", {}).get(subj, DEFAULT_SUBJECT_SCORE)) for subj in bank.subjects}
+                    yield index, record["name"], responses, subject_scores, None
+                except (ValueError, KeyError, AttributeError, TypeError) as exc:
+                    yield index, record.get("name") if isinstance(record, dict) else None, None, None, f"{type(exc).__name__}: {exc}"
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            for index, row in enumerate(csv.DictReader(f)):
+                try:
+                    responses = check_answers({q_id: row[f"Q{q_id}"] for q_id in bank.q_ids if row.get(f"Q{q_id}")}, bank)
+                    subject_scores = {subj: float(row.get(subj) or DEFAULT_SUBJECT_SCORE) for subj in bank.subjects}
+                    yield index, row["name"], responses, subject_scores, None
+                except (ValueError, KeyError) as exc:
+                    yield index, row.get("name"), None, None, f"{type(exc).__name__}: {exc}"
+
+
+def report_filename(index, name):
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", name or "").strip("_") or "student"
+    return f"{index:06d}_{slug}.pdf"
+
+
+def report_path(out_dir, index, name):
+    return os.path.join(out_dir, report_filename(index, name))
+
+
+def render_student(job):
+    index, name, responses, subject_scores, path, chart_backend, bank_version = job
+    try:
+        bank = load_bank(bank_version)
+        pdf_bytes = build_report(name, responses, subject_scores, chart_backend=chart_backend, bank=bank)
+        part_path = path + ".part"
+        with open(part_path, "wb") as f:
+            f.write(pdf_bytes.getvalue())
+        os.replace(part_path, path)
+        error = None
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"
+    # Each worker has its own chart cache; report its running totals
+    cache_stats = chart_cache.stats()
+    return index, name, error, (os.getpid(), cache_stats["hits"], cache_stats["misses"])
+
+
+def run(input_path, out_dir, workers=None, chart_backend="vector", window=4, progress_every=100, log=sys.stderr):
+    os.makedirs(out_dir, exist_ok=True)
+    bank = default_bank()
+    workers = workers or os.cpu_count() or 1
+    stats = {"generated": 0, "skipped": 0, "failed": 0}
+    worker_charts = {}
+    start = time.perf_counter()
+
+    with open(os.path.join(out_dir, "errors.jsonl"), "w", encoding="utf-8") as errors:
+        def record(index, name, error, cache_stats=None):
+            if cache_stats:
+                worker_charts[cache_stats[0]] = cache_stats[1:]
+            if error:
+                stats["failed"] += 1
+                errors.write(json.dumps({"index": index, "name": name, "error": error}) + "\n")
+            else:
+                stats["generated"] += 1
+            done = stats["generated"] + stats["failed"]
+            if progress_every and done % progress_every == 0:
+                elapsed = time.perf_counter() - start
+                print(f"{done} reports processed ({done / elapsed:.2f}/sec)", file=log)
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            for index, name, responses, subject_scores, error in read_students(input_path, bank):
+                if error:
+                    record(index, name, error)
+                    continue
+                path = report_path(out_dir, index, name)
+                if os.path.exists(path):
+                    stats["skipped"] += 1
+                    continue
+                # Keep a bounded number of students in flight so memory stays flat on large inputs
+                if len(pending) >= workers * window:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        record(*future.result())
+                pending.add(pool.submit(render_student, (index, name, responses, subject_scores, path, chart_backend, bank.version)))
+            for future in wait(pending)[0]:
+                record(*future.result())
+
+    stats["seconds"] = time.perf_counter() - start
+    chart_hits = sum(hits for hits, _ in worker_charts.values())
+    chart_lookups = sum(hits + misses for hits, misses in worker_charts.values())
+    stats["chart_hit_rate"] = chart_hits / chart_lookups if chart_lookups else 0.0
+    stats["reports_per_sec"] = stats["generated"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate career guidance PDF reports in bulk.")
+    parser.add_argument("input", help="CSV or JSONL file of students")
+    parser.add_argument("-o", "--output", default="reports", help="directory for the generated PDFs")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chart-backend", choices=sorted(CHART_BACKENDS), default="vector", help="radar chart renderer")
+    parser.add_argument("--progress-every", type=int, default=100, help="print progress every N reports")
+    args = parser.parse_args(argv)
+
+    stats = run(args.input, args.output, workers=args.workers, chart_backend=args.chart_backend, progress_every=args.progress_every)
+    print(
+        f"Generated {stats['generated']} reports ({stats['skipped']} skipped, {stats['failed']} failed) "
+        f"in {stats['seconds']:.1f}s - {stats['reports_per_sec']:.2f} reports/sec, "
+        f"chart cache hit rate {stats['chart_hit_rate']:.0%}"
+    )
+    if stats["failed"]:
+        print(f"Failures are listed in {os.path.join(args.output, 'errors.jsonl')}")
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+import hashlib
+import json
+import logging
+import os
+import struct
+import tempfile
+import threading
+
+from . import metrics
+from .bank import default_bank
+from .catalog import default_catalog
+from .charts import DEFAULT_CHART_BACKEND, VectorRadarChart, chart_size
+from .lru import SizedLRU
+from .report import render_report
+
+
+def report_fingerprint(student_name, responses, subject_scores, chart_backend=None, bank=None):
+    # Canonical form: answers in question order, subjects sorted, numbers as floats
+    bank = bank or default_bank()
+    canonical = {
+        "bank": bank.version,
+        "catalog": default_catalog().version,
+        "backend": chart_backend or DEFAULT_CHART_BACKEND,
+        "name": student_name,
+        "answers": [responses.get(q_id) or None for q_id in bank.q_ids],
+        "subjects": sorted((subj, float(score)) for subj, score in subject_scores.items()),
+    }
+    payload = json.dumps(canonical, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# The disk tier holds students' reports, so it is always bounded; the oldest
+# entries are removed once it grows past this many bytes
+DISK_MAX_BYTES = int(os.environ.get("CAREER_GUIDANCE_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+logger = logging.getLogger(__name__)
+
+# Disk entries are plain data, never pickles, so a file planted in a shared
+# cache directory cannot run code in the server. An entry is the magic, the
+# PDF and then per chart its dimension, kind and payload, each length-prefixed:
+# PNG charts are stored as is, vector charts as JSON of their labels and values.
+DISK_MAGIC = b"CGREPORT\x01"
+DISK_SUFFIX = ".report"
+_PNG, _VECTOR = 0, 1
+_LENGTH = struct.Struct(">I")
+_CHART = struct.Struct(">IBI")
+
+
+def encode_entry(pdf_bytes, charts):
+    parts = [DISK_MAGIC, _LENGTH.pack(len(pdf_bytes)), pdf_bytes, _LENGTH.pack(len(charts))]
+    for dimension, chart in charts.items():
+        if isinstance(chart, bytes):
+            kind, payload = _PNG, chart
+        else:
+            kind = _VECTOR
+            payload = json.dumps({"labels": chart.labels, "values": chart.values}, ensure_ascii=False).encode("utf-8")
+        name = dimension.encode("utf-8")
+        parts += [_CHART.pack(len(name), kind, len(payload)), name, payload]
+    return b"".join(parts)
+
+
+def decode_entry(data):
+    """The (pdf_bytes, charts) in ``data``; ValueError if it is not a whole entry."""
+    if not data.startswith(DISK_MAGIC):
+        raise ValueError("not a report cache entry")
+    view = memoryview(data)
+    pos = len(DISK_MAGIC)
+
+    def take(size):
+        nonlocal pos
+        if pos + size > len(view):
+            raise ValueError("truncated report cache entry")
+        pos += size
+        return view[pos - size:pos]
+
+    try:
+        pdf_bytes = bytes(take(_LENGTH.unpack(take(_LENGTH.size))[0]))
+        charts = {}
+        for _ in range(_LENGTH.unpack(take(_LENGTH.size))[0]):
+            name_size, kind, payload_size = _CHART.unpack(take(_CHART.size))
+            dimension = str(take(name_size), "utf-8")
+            payload = bytes(take(payload_size))
+            if kind == _PNG:
+                charts[dimension] = payload
+            elif kind == _VECTOR:
+                vector = json.loads(payload)
+                charts[dimension] = VectorRadarChart(dimension, vector["labels"], vector["values"])
+            else:
+                raise ValueError(f"unknown chart kind {kind}")
+    except (struct.error, UnicodeDecodeError, KeyError, TypeError) as e:
+        raise ValueError(f"malformed report cache entry: {e}") from None
+    if pos != len(view):
+        raise ValueError("trailing bytes after report cache entry")
+    return pdf_bytes, charts
+
+
+def entry_size(entry):
+    pdf_bytes, charts = entry
+    return len(pdf_bytes) + sum(chart_size(chart) for chart in charts.values())
+
+
+class ReportCache:
+    """Content-addressed cache of built reports (PDF bytes and chart images).
+
+    The memory tier is an LRU bounded by total size. An optional directory
+    tier can be shared by several server processes; unreadable or foreign
+    files in it count as misses.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, disk_dir=None, disk_max_bytes=DISK_MAX_BYTES, prune_every=64):
+        self.memory = SizedLRU(max_bytes, entry_size)
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.prune_every = prune_every
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "disk_hits": 0, "misses": 0}
+        self._disk_writes = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], key + DISK_SUFFIX)
+
+    def get(self, key):
+        entry = self.memory.get(key)
+        if entry is not None:
+            with self.lock:
+                self.counters["hits"] += 1
+            return entry
+        if self.disk_dir:
+            with metrics.stage("cache_read") as timer:
+                try:
+                    with open(self._disk_path(key), "rb") as f:
+                        data = f.read()
+                    timer.add(nbytes=len(data))
+                    entry = decode_entry(data)
+                except (OSError, ValueError):
+                    entry = None
+            if entry is not None:
+                with self.lock:
+                    self.counters["disk_hits"] += 1
+                self.memory.put(key, entry)
+                return entry
+        with self.lock:
+            self.counters["misses"] += 1
+        return None
+
+    def put(self, key, pdf_bytes, charts):
+        entry = (pdf_bytes, charts)
+        self.memory.put(key, entry)
+        if self.disk_dir:
+            try:
+                self._write_disk(key, pdf_bytes, charts)
+            except OSError as e:
+                # The report itself is fine; only later processes miss out on it
+                logger.warning("Could not write report %s to the disk cache: %s", key, e)
+                return
+            self._disk_writes += 1
+            if self.disk_max_bytes and self._disk_writes % self.prune_every == 0:
+                self.prune_disk()
+
+    def _write_disk(self, key, pdf_bytes, charts):
+        path = self._disk_path(key)
+        with metrics.stage("cache_write") as timer:
+            data = encode_entry(pdf_bytes, charts)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file and rename, so other processes never read a partial entry
+            fd, part_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                timer.add(nbytes=len(data))
+                os.replace(part_path, path)
+            finally:
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+
+    def prune_disk(self):
+        files = []
+        for root, _, names in os.walk(self.disk_dir):
+            for name in names:
+                if name.endswith(DISK_SUFFIX):
+                    try:
+                        stat = os.stat(os.path.join(root, name))
+                    except OSError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, os.path.join(root, name)))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def get_or_build(self, student_name, responses, subject_scores, chart_backend=None, bank=None, progress=None):
+        key = report_fingerprint(student_name, responses, subject_scores, chart_backend, bank)
+        entry = self.get(key)
+        if entry is None:
+            entry = render_report(
+                student_name, responses, subject_scores, chart_backend=chart_backend, bank=bank, progress=progress
+            )
+            self.put(key, *entry)
+        return entry
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+        stats.update(evictions=self.memory.evictions, entries=len(self.memory), bytes=self.memory.size)
+        lookups = stats["hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,212 @@
+"""Careers, majors and universities loaded from a catalog file.
+
+Catalogs are JSON files (``catalogs/default.json`` unless
+CAREER_GUIDANCE_CATALOG names another file). Every career lists its
+domain, related school subjects and trait weights per dimension; every
+major the subjects it builds on; every university its domain, region,
+majors offered and trait weights.
+
+Entries are numbered in file order, and inverted indexes map each trait,
+subject, domain, region and major to the frozenset of matching entries, so
+filtered queries are a few set intersections:
+
+    catalog = default_catalog()
+    catalog.careers_where(traits=[("Interest", "STEM")], subjects=["Biology"])
+    catalog.universities_where(regions=["Europe"], majors=["Law", "Public Policy"])
+
+Within one filter any listed value matches; different filters must all
+match.
+"""
+import json
+import os
+import threading
+from types import MappingProxyType
+
+CATALOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalogs")
+DEFAULT_CATALOG = os.environ.get("CAREER_GUIDANCE_CATALOG", os.path.join(CATALOG_DIR, "default.json"))
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+_empty = frozenset()
+
+
+class CatalogError(ValueError):
+    """A catalog file is missing or malformed."""
+
+
+def _index(entries, key):
+    # value -> frozenset of entry numbers, for a field holding one value or a list
+    index = {}
+    for i, entry in enumerate(entries):
+        values = entry.get(key, ())
+        for value in [values] if isinstance(values, str) else values:
+            index.setdefault(value, set()).add(i)
+    return MappingProxyType({value: frozenset(ids) for value, ids in index.items()})
+
+
+def _trait_index(entries):
+    # (dimension, trait) -> entries weighting it above zero
+    index = {}
+    for i, entry in enumerate(entries):
+        for dim, traits in entry.get("traits", {}).items():
+            for trait, weight in traits.items():
+                if weight > 0:
+                    index.setdefault((dim, trait), set()).add(i)
+    return MappingProxyType({key: frozenset(ids) for key, ids in index.items()})
+
+
+def _traits(entry):
+    return MappingProxyType({
+        dim: MappingProxyType({trait: float(weight) for trait, weight in traits.items()})
+        for dim, traits in entry.get("traits", {}).items()
+    })
+
+
+def _where(everything, *filters):
+    """Entries matching every (index, values) filter given; all of them if none is."""
+    matches = []
+    for index, values in filters:
+        if values is None:
+            continue
+        # One value, or one (dimension, trait) pair, instead of a list
+        if isinstance(values, str) or (isinstance(values, tuple) and values and isinstance(values[0], str)):
+            values = [values]
+        sets = [index.get(value, _empty) for value in values]
+        matches.append(sets[0] if len(sets) == 1 else frozenset().union(*sets))
+    if not matches:
+        return everything
+    matches.sort(key=len)
+    result = matches[0]
+    for match in matches[1:]:
+        if not result:
+            break
+        result = result & match
+    return result
+
+
+class Catalog:
+    """A validated catalog with per-field inverted indexes.
+
+    ``careers``, ``majors`` and ``universities`` are name tuples in file
+    order; queries return frozensets of positions in them, and ``names``
+    turns such a set back into names in catalog order.
+    """
+
+    def __init__(self, data):
+        validate_catalog(data)
+        self.version = data["version"]
+        careers, majors, universities = data["careers"], data["majors"], data["universities"]
+
+        self.careers = tuple(entry["name"] for entry in careers)
+        self.career_domains = tuple(entry["domain"] for entry in careers)
+        self.career_subjects = tuple(tuple(entry.get("subjects", ())) for entry in careers)
+        self.career_traits = tuple(_traits(entry) for entry in careers)
+        self.majors = tuple(entry["name"] for entry in majors)
+        self.major_subjects = tuple(tuple(entry["subjects"]) for entry in majors)
+        self.universities = tuple(entry["name"] for entry in universities)
+        self.university_domains = tuple(entry["domain"] for entry in universities)
+        self.university_regions = tuple(entry.get("region") for entry in universities)
+        self.university_majors = tuple(tuple(entry.get("majors", ())) for entry in universities)
+        self.university_traits = tuple(_traits(entry) for entry in universities)
+        # Subjects in order of first appearance among the majors
+        self.subjects = tuple(dict.fromkeys(subj for subjects in self.major_subjects for subj in subjects))
+
+        self.all_careers = frozenset(range(len(careers)))
+        self.all_majors = frozenset(range(len(majors)))
+        self.all_universities = frozenset(range(len(universities)))
+        self.trait_careers = _trait_index(careers)
+        self.subject_careers = _index(careers, "subjects")
+        self.domain_careers = _index(careers, "domain")
+        self.subject_majors = _index(majors, "subjects")
+        self.trait_universities = _trait_index(universities)
+        self.region_universities = _index(universities, "region")
+        self.domain_universities = _index(universities, "domain")
+        self.major_universities = _index(universities, "majors")
+        # Domain -> names in catalog order, for recommend_domain
+        self.careers_by_domain = MappingProxyType({
+            domain: tuple(self.names(self.careers, ids)) for domain, ids in self.domain_careers.items()
+        })
+        self.universities_by_domain = MappingProxyType({
+            domain: tuple(self.names(self.universities, ids)) for domain, ids in self.domain_universities.items()
+        })
+
+    def careers_where(self, traits=None, subjects=None, domains=None):
+        """Careers weighting any of ``traits`` ((dimension, trait) pairs), related to
+        any of ``subjects`` and in any of ``domains``."""
+        return _where(
+            self.all_careers, (self.trait_careers, traits), (self.subject_careers, subjects), (self.domain_careers, domains)
+        )
+
+    def majors_where(self, subjects=None):
+        return _where(self.all_majors, (self.subject_majors, subjects))
+
+    def universities_where(self, regions=None, domains=None, majors=None, traits=None):
+        return _where(
+            self.all_universities, (self.region_universities, regions), (self.domain_universities, domains),
+            (self.major_universities, majors), (self.trait_universities, traits),
+        )
+
+    @staticmethod
+    def names(names, ids):
+        return [names[i] for i in sorted(ids)]
+
+    def __repr__(self):
+        return (
+            f"Catalog(version={self.version!r}, careers={len(self.careers)}, majors={len(self.majors)}, "
+            f"universities={len(self.universities)})"
+        )
+
+
+def validate_catalog(data):
+    def fail(message):
+        raise CatalogError(f"Catalog {data.get('version', '?')!r}: {message}")
+
+    for field in ("version", "careers", "majors", "universities"):
+        if field not in data:
+            fail(f"missing {field!r}")
+    if not isinstance(data["version"], str) or not data["version"]:
+        fail("version must be a non-empty string")
+
+    for kind, required in (("careers", ("name", "domain")), ("majors", ("name", "subjects")), ("universities", ("name", "domain"))):
+        names = set()
+        for entry in data[kind]:
+            for field in required:
+                if not entry.get(field):
+                    fail(f"{kind} entry {entry.get('name', entry)!r} has no {field!r}")
+            if entry["name"] in names:
+                fail(f"{kind} entry {entry['name']!r} is listed twice")
+            names.add(entry["name"])
+            for dim, traits in entry.get("traits", {}).items():
+                if not isinstance(traits, dict) or not all(
+                    isinstance(w, (int, float)) and not isinstance(w, bool) for w in traits.values()
+                ):
+                    fail(f"{kind} entry {entry['name']!r}: {dim} traits must map trait names to numbers")
+
+    majors = {entry["name"] for entry in data["majors"]}
+    for entry in data["universities"]:
+        unknown = set(entry.get("majors", ())) - majors
+        if unknown:
+            fail(f"university {entry['name']!r} offers unknown majors {sorted(unknown)}")
+
+
+def load_catalog(path=None):
+    """Return the compiled catalog in ``path``, loading it on first use."""
+    path = os.path.abspath(path or DEFAULT_CATALOG)
+    catalog = _catalogs.get(path)
+    if catalog is not None:
+        return catalog
+    with _catalogs_lock:
+        if path not in _catalogs:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                raise CatalogError(f"No catalog file {path}") from None
+            except json.JSONDecodeError as e:
+                raise CatalogError(f"Catalog {path} is not valid JSON: {e}") from None
+            _catalogs[path] = Catalog(data)
+        return _catalogs[path]
+
+
+def default_catalog():
+    return load_catalog(DEFAULT_CATALOG)
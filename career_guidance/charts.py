@@ -0,0 +1,197 @@
+import math
+import os
+import threading
+
+import numpy as np
+
+from . import metrics
+from .bank import default_bank
+from .lru import SizedLRU
+
+DEFAULT_CHART_BACKEND = os.environ.get("CAREER_GUIDANCE_CHART_BACKEND", "matplotlib")
+
+
+def order_scores(scores_by_dim, bank=None):
+    # Traits follow bank order so students with the same trait set share a layout
+    dim_trait_index = (bank or default_bank()).dim_trait_index
+    ordered = {}
+    for dimension, scores in scores_by_dim.items():
+        if not scores:
+            continue
+        ranks = dim_trait_index.get(dimension, {})
+        labels = sorted(scores, key=lambda trait: ranks.get(trait, len(ranks)))
+        ordered[dimension] = {trait: scores[trait] for trait in labels}
+    return ordered
+
+
+def radial_scale(peak):
+    # Outer ring rounded up to a 1/2/2.5/5 step, close to matplotlib's polar autoscaling
+    if peak <= 0:
+        return 1.0, [0.2, 0.4, 0.6, 0.8, 1.0]
+    raw = peak / 5
+    magnitude = 10 ** math.floor(math.log10(raw))
+    step = next(m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= raw)
+    rings = math.ceil(peak / step - 1e-9)
+    return rings * step, [step * i for i in range(1, rings + 1)]
+
+
+class VectorRadarChart:
+    """Radar chart drawn as PDF paths instead of an embedded image.
+
+    Geometry mirrors the 7.5in matplotlib figure placed at width ``w``.
+    """
+
+    def __init__(self, dimension, labels, values):
+        self.dimension = dimension
+        self.labels = list(labels)
+        self.values = [float(v) for v in values]
+
+    def draw(self, pdf, x, y, w):
+        s = w / 150.0
+        cx, cy, radius = x + 76.875 * s, y + 78.75 * s, 56.25 * s
+        rmax, rings = radial_scale(max(self.values))
+        angles = np.linspace(0, 2 * np.pi, len(self.labels), endpoint=False)
+        # PDF y grows downwards, so the polar angle runs clockwise on the page
+        unit = np.column_stack([np.cos(angles), -np.sin(angles)])
+        points = np.array([cx, cy]) + unit * (radius * np.array(self.values) / rmax)[:, None]
+        layout = (self.dimension, tuple(self.labels), rmax, x, y, w)
+
+        pdf.set_fill_color(199, 221, 236)
+        pdf.polygon(points, 'F')
+
+        def draw_frame():
+            pdf.set_draw_color(176, 176, 176)
+            pdf.set_line_width(0.22 * s)
+            for ring in rings[:-1]:
+                r = radius * ring / rmax
+                pdf.ellipse(cx - r, cy - r, 2 * r, 2 * r)
+            for ux, uy in unit:
+                pdf.line(cx, cy, cx + ux * radius, cy + uy * radius)
+            pdf.set_draw_color(0)
+            pdf.ellipse(cx - radius, cy - radius, 2 * radius, 2 * radius)
+
+        pdf.static_block(("radar frame",) + layout, draw_frame)
+
+        pdf.set_draw_color(31, 119, 180)
+        pdf.set_fill_color(31, 119, 180)
+        pdf.set_line_width(0.55 * s)
+        pdf.polygon(points, 'D')
+        marker = 0.85 * s
+        for px, py in points:
+            pdf.ellipse(px - marker, py - marker, 2 * marker, 2 * marker, 'F')
+
+        def draw_labels():
+            pdf.set_font("Arial", size=7 * s)
+            for label, (ux, uy) in zip(self.labels, unit):
+                lx, ly = cx + ux * (radius + 3 * s), cy + uy * (radius + 3 * s)
+                width = pdf.get_string_width(label)
+                if ux > 0.1:
+                    tx = lx
+                elif ux < -0.1:
+                    tx = lx - width
+                else:
+                    tx = lx - width / 2
+                ty = ly + (2.5 * s if uy > 0.1 else 0 if uy < -0.1 else 1.2 * s)
+                pdf.text(tx, ty, label)
+
+            pdf.set_font("Arial", size=11 * s)
+            pdf.text(cx - pdf.get_string_width(self.dimension) / 2, cy - radius - 8 * s, self.dimension)
+
+        pdf.static_block(("radar labels",) + layout, draw_labels)
+
+        pdf.set_draw_color(0)
+        pdf.set_fill_color(0)
+        pdf.set_line_width(0.2)
+
+
+def vector_radar_charts(ordered_scores):
+    return {
+        dimension: VectorRadarChart(dimension, scores.keys(), scores.values())
+        for dimension, scores in ordered_scores.items()
+    }
+
+
+def matplotlib_radar_charts(ordered_scores):
+    # Imported on first use so the vector backend never loads matplotlib
+    from .mpl_charts import matplotlib_radar_charts
+    return matplotlib_radar_charts(ordered_scores)
+
+
+CHART_BACKENDS = {
+    "matplotlib": matplotlib_radar_charts,
+    "vector": vector_radar_charts,
+}
+
+
+def chart_size(chart):
+    # Vector charts are a few hundred bytes of labels and values
+    return len(chart) if isinstance(chart, bytes) else 512
+
+
+class ChartCache:
+    """Rendered charts keyed by (backend, dimension, trait -> score).
+
+    Students with the same profile in a dimension get the same chart, so it
+    is rendered once per process and shared across students and sessions.
+    """
+
+    def __init__(self, max_bytes=128 * 1024 * 1024):
+        self.charts = SizedLRU(max_bytes, chart_size)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        chart = self.charts.get(key)
+        with self.lock:
+            if chart is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return chart
+
+    def put(self, key, chart):
+        self.charts.put(key, chart)
+
+    def clear(self):
+        self.charts.clear()
+
+    def stats(self):
+        with self.lock:
+            hits, misses = self.hits, self.misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "entries": len(self.charts),
+            "bytes": self.charts.size,
+            "evictions": self.charts.evictions,
+        }
+
+
+chart_cache = ChartCache()
+
+
+def generate_split_radar_charts(scores_by_dim, backend=None, cache=chart_cache, bank=None):
+    backend = backend or DEFAULT_CHART_BACKEND
+    if backend not in CHART_BACKENDS:
+        raise ValueError(f"Unknown chart backend {backend!r}; expected one of {sorted(CHART_BACKENDS)}")
+    ordered = order_scores(scores_by_dim, bank)
+    if cache is None:
+        return _render_charts(backend, ordered)
+
+    keys = {dimension: (backend, dimension, tuple(scores.items())) for dimension, scores in ordered.items()}
+    charts = {dimension: cache.get(key) for dimension, key in keys.items()}
+    missing = {dimension: ordered[dimension] for dimension, chart in charts.items() if chart is None}
+    if missing:
+        for dimension, chart in _render_charts(backend, missing).items():
+            cache.put(keys[dimension], chart)
+            charts[dimension] = chart
+    return charts
+
+
+def _render_charts(backend, ordered_scores):
+    with metrics.stage("charts") as timer:
+        charts = CHART_BACKENDS[backend](ordered_scores)
+        timer.add(charts=len(charts))
+    return charts
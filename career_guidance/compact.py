@@ -0,0 +1,138 @@
+from collections.abc import MutableMapping
+
+import numpy as np
+
+from .bank import default_bank, load_bank
+from .scoring import scoring_engine
+
+# Option codes are signed bytes, one per question in bank order
+UNANSWERED = -1
+
+
+class PackedResponses(MutableMapping):
+    """A student's answers as one option-index byte per question.
+
+    Behaves like the ``q_id -> option text`` dict the rest of the package
+    takes, but a full assessment is a single 60-byte buffer instead of a dict
+    of 60 entries.
+    """
+
+    __slots__ = ("bank", "codes")
+
+    def __init__(self, responses=None, bank=None, codes=None):
+        self.bank = bank or default_bank()
+        if codes is not None:
+            if len(codes) != len(self.bank.q_ids):
+                raise ValueError(f"Expected {len(self.bank.q_ids)} option codes, got {len(codes)}")
+            self.codes = bytearray(codes)
+        else:
+            self.codes = bytearray([UNANSWERED & 0xFF]) * len(self.bank.q_ids)
+        if responses:
+            self.update(responses)
+
+    def _code(self, pos):
+        code = self.codes[pos]
+        return code - 256 if code > 127 else code
+
+    def __getitem__(self, q_id):
+        pos = self.bank.q_pos[q_id]
+        code = self._code(pos)
+        if code == UNANSWERED:
+            raise KeyError(q_id)
+        return self.bank.options[pos][code]
+
+    def __setitem__(self, q_id, option):
+        pos = self.bank.q_pos[q_id]
+        code = self.bank.option_index[pos].get(option)
+        if code is None:
+            raise ValueError(f"{option!r} is not an option of question {q_id}")
+        self.codes[pos] = code
+
+    def __delitem__(self, q_id):
+        pos = self.bank.q_pos[q_id]
+        if self._code(pos) == UNANSWERED:
+            raise KeyError(q_id)
+        self.codes[pos] = UNANSWERED & 0xFF
+
+    def __contains__(self, q_id):
+        pos = self.bank.q_pos.get(q_id)
+        return pos is not None and self._code(pos) != UNANSWERED
+
+    def __iter__(self):
+        # Answered questions, in bank order
+        return (q_id for pos, q_id in enumerate(self.bank.q_ids) if self._code(pos) != UNANSWERED)
+
+    def __len__(self):
+        return sum(1 for pos in range(len(self.codes)) if self._code(pos) != UNANSWERED)
+
+    def __eq__(self, other):
+        if isinstance(other, PackedResponses):
+            return self.bank.version == other.bank.version and self.codes == other.codes
+        return super().__eq__(other)
+
+    def __repr__(self):
+        return f"PackedResponses({dict(self)!r}, bank={self.bank.version!r})"
+
+    def __reduce__(self):
+        # Pickled by bank version, so stored answers stay 60 bytes
+        return _unpickle_responses, (self.bank.version, bytes(self.codes))
+
+    def to_bytes(self):
+        return bytes(self.codes)
+
+    def option_codes(self):
+        return np.frombuffer(bytes(self.codes), dtype=np.int8)
+
+    @classmethod
+    def from_bytes(cls, data, bank=None):
+        return cls(bank=bank, codes=data)
+
+
+def _unpickle_responses(version, codes):
+    return PackedResponses(bank=load_bank(version), codes=codes)
+
+
+def pack_responses(responses, bank=None):
+    """``q_id -> option`` dict to option-code bytes. Unknown options count as unanswered."""
+    bank = bank or default_bank()
+    if isinstance(responses, PackedResponses) and responses.bank is bank:
+        return responses.to_bytes()
+    return scoring_engine(bank).encode(responses).tobytes()
+
+
+def unpack_responses(data, bank=None):
+    return dict(PackedResponses.from_bytes(data, bank))
+
+
+def pack_scores(scores_by_dim, bank=None):
+    """calculate_scores output to a float64 array in the bank's column layout.
+
+    Columns follow ``bank.dim_columns``; unscored traits are 0. A dimension
+    or trait the bank does not assess raises KeyError.
+    """
+    bank = bank or default_bank()
+    packed = np.zeros(len(bank.column_trait_ids), dtype=np.float64)
+    for dim, scores in scores_by_dim.items():
+        col0 = bank.dim_columns[dim].start
+        index = bank.dim_trait_index[dim]
+        for trait, score in scores.items():
+            packed[col0 + index[trait]] = score
+    return packed
+
+
+def unpack_scores(packed, bank=None, codes=None):
+    """A packed score row back to calculate_scores' nested dicts.
+
+    Pass the student's option codes to also restore calculate_scores' trait
+    order; otherwise traits follow bank order.
+    """
+    if codes is not None and not isinstance(codes, np.ndarray):
+        codes = np.frombuffer(bytes(codes), dtype=np.int8)
+    return scoring_engine(bank).to_dict(packed, None if codes is None else codes.tolist())
+
+
+def score_packed(packed_responses, bank=None):
+    """Score many option-code buffers at once, N x T in the bank's layout."""
+    bank = bank or default_bank()
+    matrix = np.frombuffer(b"".join(packed_responses), dtype=np.int8).reshape(-1, len(bank.q_ids))
+    return scoring_engine(bank).score_matrix(matrix)
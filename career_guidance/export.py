@@ -0,0 +1,311 @@
+"""Whole-cohort export: one ZIP of every student's PDF plus a summary sheet.
+
+    python -m career_guidance.export --db results.sqlite3 --school "Greenfield High" -o greenfield.zip
+    python -m career_guidance.export --input students.csv -o - > cohort.zip
+
+``stream_cohort`` yields the archive in chunks while reports are still
+rendering. PDFs are rendered in a process pool, at most ``workers *
+window`` at a time, and each is stored in the archive as soon as it is
+done, so entries follow completion order. The archive is written as for an
+unseekable stream (sizes go in data descriptors after each entry), so no
+byte has to be held back and patched later. The summary (``summary.csv``
+or ``summary.xlsx``: per student the dominant traits, every trait score
+and the recommendations) is spooled to a temporary file meanwhile and
+added as the last entry. Memory stays at one window of PDFs however large
+the cohort, and a download can start with the first finished report.
+"""
+import argparse
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+from . import metrics
+from .bank import default_bank, load_bank
+from .bulk import read_students, report_filename
+from .charts import CHART_BACKENDS
+from .compact import PackedResponses, pack_responses
+from .report import render_report
+from .store import ResultsStore, StoredResult, dominant_traits
+
+SUMMARY_FORMATS = ("csv", "xlsx")
+# Summary rows beyond this many bytes spill from memory to disk
+SPOOL_BYTES = 1024 * 1024
+COPY_CHUNK = 64 * 1024
+RECOMMENDATION_COLUMNS = ("Careers", "Universities", "Suggested Majors")
+
+
+class _Chunks:
+    """Write-only file object holding what ZipFile wrote until it is taken.
+
+    It has no tell or seek, so ZipFile writes in its streaming mode.
+    """
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b"".join(self.parts)
+        self.parts = []
+        return data
+
+
+class CsvSummary:
+    filename = "summary.csv"
+
+    def __init__(self, header):
+        self.file = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES, mode="w+", encoding="utf-8", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(header)
+
+    def add(self, row):
+        self.writer.writerow(row)
+
+    def copy_to(self, dest):
+        self.file.seek(0)
+        while True:
+            text = self.file.read(COPY_CHUNK)
+            if not text:
+                break
+            dest.write(text.encode("utf-8"))
+
+    def close(self):
+        self.file.close()
+
+
+class XlsxSummary:
+    filename = "summary.xlsx"
+
+    def __init__(self, header):
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise ImportError("Writing Excel summaries needs openpyxl: pip install openpyxl") from None
+        # Write-only sheets stream their rows to disk as they are appended
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet("Summary")
+        self.sheet.append(header)
+
+    def add(self, row):
+        self.sheet.append(row)
+
+    def copy_to(self, dest):
+        with tempfile.TemporaryFile() as f:
+            self.workbook.save(f)
+            f.seek(0)
+            shutil.copyfileobj(f, dest, COPY_CHUNK)
+
+    def close(self):
+        pass
+
+
+SUMMARIES = {"csv": CsvSummary, "xlsx": XlsxSummary}
+
+
+def summary_header(bank):
+    header = ["file", "name", "school", "cohort", "bank"]
+    header += [f"{dim} (dominant)" for dim in bank.dim_traits]
+    header += [f"{dim}: {trait}" for dim, traits in bank.dim_traits.items() for trait in traits]
+    return header + list(RECOMMENDATION_COLUMNS) + ["error"]
+
+
+def summary_row(bank, filename, job, scores, recommendations, error):
+    # Columns follow the export's bank; students of another bank version
+    # fill the traits the two share
+    _, name, bank_version, _, _, school, cohort = job
+    dominant = dominant_traits(scores)
+    row = [filename, name, school, cohort, bank_version]
+    row += [dominant.get(dim) for dim in bank.dim_traits]
+    row += [
+        round(scores[dim][trait], 4) if trait in scores.get(dim, {}) else None
+        for dim, traits in bank.dim_traits.items() for trait in traits
+    ]
+    row += ["; ".join(recommendations.get(section, ())) for section in RECOMMENDATION_COLUMNS]
+    return row + [error]
+
+
+def _jobs(students, bank):
+    """(index, name, bank version, option codes, subject scores, school, cohort) per student.
+
+    Students are StoredResult rows, numbered by result ID, or (name,
+    responses, subject_scores) tuples numbered in order. Answers travel to
+    the workers as option-code bytes.
+    """
+    for index, student in enumerate(students):
+        if isinstance(student, StoredResult):
+            yield (student.id, student.student_name, student.bank_version, student.answers,
+                   student.subject_scores, student.school, student.cohort)
+        else:
+            name, responses, subject_scores = student
+            student_bank = getattr(responses, "bank", None) or bank
+            yield (index, name, student_bank.version, pack_responses(responses, student_bank),
+                   dict(subject_scores), None, None)
+
+
+def render_entry(job, chart_backend):
+    _, name, bank_version, codes, subject_scores, _, _ = job
+    try:
+        bank = load_bank(bank_version)
+        responses = PackedResponses.from_bytes(codes, bank)
+        results = {}
+        pdf_bytes, _ = render_report(name, responses, subject_scores, chart_backend=chart_backend, bank=bank, results=results)
+        scores, recommendations = results["scores"], results["recommendations"]
+        error = None
+    except Exception as exc:
+        pdf_bytes, scores, recommendations = None, {}, {}
+        error = f"{type(exc).__name__}: {exc}"
+    # The worker's metric totals travel back with the report
+    return pdf_bytes, scores, recommendations, error, metrics.registry.take() if metrics.enabled else None
+
+
+def stream_cohort(students, bank=None, workers=None, chart_backend="vector", window=4, summary="csv",
+                  executor=None, stats=None):
+    """Yield a ZIP of every student's report and a summary sheet, chunk by chunk.
+
+    Pass ``executor`` to render in an existing pool (it is left running);
+    otherwise a pool of ``workers`` processes is started and shut down with
+    the export. ``stats``, if given, is a dict updated with the counts of
+    reports written and failed and the archive bytes yielded.
+    """
+    if chart_backend not in CHART_BACKENDS:
+        raise ValueError(f"Unknown chart backend {chart_backend!r}; expected one of {sorted(CHART_BACKENDS)}")
+    if summary not in SUMMARIES:
+        raise ValueError(f"Unknown summary format {summary!r}; expected one of {list(SUMMARY_FORMATS)}")
+    bank = bank or default_bank()
+    workers = workers or os.cpu_count() or 1
+    stats = stats if stats is not None else {}
+    stats.update(reports=0, failed=0, bytes=0)
+
+    sheet = SUMMARIES[summary](summary_header(bank))
+    sink = _Chunks()
+    archive = zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED)
+    pool = executor or ProcessPoolExecutor(max_workers=workers)
+    pending = {}
+
+    def finish(futures):
+        # Adds finished reports to the archive and returns the bytes written
+        for future in futures:
+            job = pending.pop(future)
+            pdf_bytes, scores, recommendations, error, worker_metrics = future.result()
+            if worker_metrics is not None:
+                metrics.registry.merge(worker_metrics)
+            filename = None
+            if pdf_bytes is not None:
+                filename = report_filename(job[0], job[1])
+                # Reports are compressed PDFs already, so they are stored as is
+                archive.writestr(filename, pdf_bytes)
+                stats["reports"] += 1
+            else:
+                stats["failed"] += 1
+            sheet.add(summary_row(bank, filename, job, scores, recommendations, error))
+        chunk = sink.take()
+        stats["bytes"] += len(chunk)
+        return chunk
+
+    try:
+        for job in _jobs(students, bank):
+            # A bounded number of reports in flight keeps memory flat
+            if len(pending) >= workers * window:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                yield finish(done)
+            pending[pool.submit(render_entry, job, chart_backend)] = job
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            yield finish(done)
+
+        entry = zipfile.ZipInfo(sheet.filename, date_time=time.localtime()[:6])
+        entry.compress_type = zipfile.ZIP_DEFLATED
+        with archive.open(entry, "w") as dest:
+            sheet.copy_to(dest)
+        archive.close()
+        chunk = sink.take()
+        stats["bytes"] += len(chunk)
+        yield chunk
+    finally:
+        # Reached early when the consumer stops reading, e.g. a dropped download
+        for future in pending:
+            future.cancel()
+        sheet.close()
+        if executor is None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+def write_cohort(students, output, **kwargs):
+    """Write the archive to a path (via a .part file) or a binary file object; returns the stats."""
+    stats = {}
+    if hasattr(output, "write"):
+        for chunk in stream_cohort(students, stats=stats, **kwargs):
+            output.write(chunk)
+        return stats
+    part_path = output + ".part"
+    try:
+        with open(part_path, "wb") as f:
+            for chunk in stream_cohort(students, stats=stats, **kwargs):
+                f.write(chunk)
+    except BaseException:
+        os.remove(part_path)
+        raise
+    os.replace(part_path, output)
+    return stats
+
+
+def _file_students(path, log, bank):
+    for index, name, responses, subject_scores, error in read_students(path, bank):
+        if error:
+            print(f"Row {index} ({name}) skipped: {error}", file=log)
+            continue
+        yield name, responses, subject_scores
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a cohort's reports as one ZIP with a summary sheet.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--db", help="results store to export from")
+    source.add_argument("--input", help="CSV or JSONL file of students (see career_guidance.bulk)")
+    parser.add_argument("--school", default=None, help="only results from this school (with --db)")
+    parser.add_argument("--cohort", default=None, help="only results from this class or cohort (with --db)")
+    parser.add_argument("-o", "--output", default="cohort.zip", help="archive path, or - for stdout")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chart-backend", choices=sorted(CHART_BACKENDS), default="vector", help="radar chart renderer")
+    parser.add_argument("--summary", choices=SUMMARY_FORMATS, default="csv", help="summary sheet format")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    bank = default_bank()
+    store = None
+    if args.db:
+        store = ResultsStore(args.db, flush_interval=0)
+        students = store.query(school=args.school, cohort=args.cohort)
+    else:
+        students = _file_students(args.input, sys.stderr, bank)
+    try:
+        output = sys.stdout.buffer if args.output == "-" else args.output
+        stats = write_cohort(
+            students, output, bank=bank, workers=args.workers, chart_backend=args.chart_backend, summary=args.summary
+        )
+    finally:
+        if store is not None:
+            store.close()
+    elapsed = time.perf_counter() - start
+    print(
+        f"Exported {stats['reports']} reports ({stats['failed']} failed), {stats['bytes'] / 1e6:.1f} MB "
+        f"in {elapsed:.1f}s", file=sys.stderr,
+    )
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,311 @@
+"""Import raw assessment answers from CSV or Excel exports.
+
+    python -m career_guidance.importer responses.csv --store results.sqlite3 --school "Greenfield High"
+
+Columns are matched to questions by their header: ``Q12``, ``12``, the
+question text as shown in the app (``Q12. How do you ...``) or the
+question text alone, as Google Forms exports it. Answers are matched to
+option text after normalizing case, punctuation and spacing, with a close
+fuzzy match as fallback. ``name``, ``school``, ``class``/``cohort`` and
+subject columns (``Math`` or ``Math Marks (%)``) are picked up too; other
+columns are ignored.
+
+Rows are read one at a time and scored in fixed-size chunks, so memory
+does not grow with the file. Rows with unanswered questions or answers
+that match no option are reported per row and skipped. Reading ``.xlsx``
+files needs openpyxl.
+"""
+import argparse
+import csv
+import difflib
+import json
+import re
+import sys
+import time
+
+import numpy as np
+
+from .bank import default_bank
+from .scoring import scoring_engine
+
+NAME_COLUMNS = {"name", "student name", "full name", "your name", "enter your name for the report"}
+SCHOOL_COLUMNS = {"school", "school name"}
+COHORT_COLUMNS = {"class", "cohort", "grade", "section", "class or cohort"}
+FUZZY_CUTOFF = 0.85
+# Distinct spellings remembered per question
+MAX_SEEN = 4096
+
+_punctuation = re.compile(r"[^\w\s]+")
+_spaces = re.compile(r"\s+")
+_question_prefix = re.compile(r"^q\s*(\d+)\s*(.*)$")
+
+
+def normalize(text):
+    # Case, punctuation, markdown and spacing differ between exports
+    text = _punctuation.sub(" ", str(text).casefold())
+    return _spaces.sub(" ", text).strip()
+
+
+class ImportFormatError(ValueError):
+    """The file's columns cannot be matched to the question bank."""
+
+
+class OptionMatcher:
+    """Option text -> option code, per question position.
+
+    Exports repeat the same few spellings of each option, so every text
+    seen is remembered as written and only new spellings are normalized
+    or fuzzy-matched.
+    """
+
+    def __init__(self, bank):
+        self.exact = [{normalize(option): code for code, option in enumerate(options)} for options in bank.options]
+        self.choices = [list(index) for index in self.exact]
+        self.options = bank.options
+        self.seen = [{option: code for code, option in enumerate(options)} for options in bank.options]
+
+    def match(self, pos, text):
+        seen = self.seen[pos]
+        try:
+            return seen[text]
+        except KeyError:
+            pass
+        key = normalize(text)
+        code = self.exact[pos].get(key)
+        if code is None:
+            close = difflib.get_close_matches(key, self.choices[pos], n=1, cutoff=FUZZY_CUTOFF)
+            code = self.exact[pos][close[0]] if close else None
+        if len(seen) >= MAX_SEEN:
+            seen.clear()
+            seen.update((option, i) for i, option in enumerate(self.options[pos]))
+        seen[text] = code
+        return code
+
+
+class ColumnMap:
+    """Which column holds each question, the name, school, cohort and subjects."""
+
+    def __init__(self, header, bank):
+        self.questions = {}
+        self.subjects = {}
+        self.name = self.school = self.cohort = None
+        by_text = {normalize(bank.questions[q_id]["question"]): q_id for q_id in bank.q_ids}
+        by_subject = {normalize(subj): subj for subj in bank.subjects}
+
+        for col, title in enumerate(header):
+            key = normalize(title or "")
+            if not key:
+                continue
+            q_id = None
+            prefixed = _question_prefix.match(key)
+            if prefixed and int(prefixed.group(1)) in bank.q_pos:
+                q_id = int(prefixed.group(1))
+            elif key.isdigit() and int(key) in bank.q_pos:
+                q_id = int(key)
+            elif key in by_text:
+                q_id = by_text[key]
+            elif key in NAME_COLUMNS:
+                self.name = col
+            elif key in SCHOOL_COLUMNS:
+                self.school = col
+            elif key in COHORT_COLUMNS:
+                self.cohort = col
+            elif key.split(" marks")[0] in by_subject:
+                self.subjects[by_subject[key.split(" marks")[0]]] = col
+            else:
+                close = difflib.get_close_matches(key, list(by_text), n=1, cutoff=FUZZY_CUTOFF)
+                if close:
+                    q_id = by_text[close[0]]
+            if q_id is not None:
+                if q_id in self.questions:
+                    raise ImportFormatError(f"Columns {self.questions[q_id] + 1} and {col + 1} both match question {q_id}")
+                self.questions[q_id] = col
+
+        missing = {dim: [q_id for q_id in q_ids if q_id not in self.questions] for dim, q_ids in bank.dim_labels.items()}
+        missing = {dim: q_ids for dim, q_ids in missing.items() if q_ids}
+        if missing:
+            raise ImportFormatError(f"No column for questions {missing}")
+        # Question positions and their columns, in bank order
+        self.positions = [(bank.q_pos[q_id], self.questions[q_id]) for q_id in bank.q_ids]
+
+
+def read_rows(path, sheet=None):
+    """Header and data rows of a CSV or .xlsx file, one row at a time."""
+    if path.lower().endswith((".xlsx", ".xlsm")):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ImportError("Reading Excel files needs openpyxl: pip install openpyxl") from None
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = (workbook[sheet] if sheet else workbook.active).iter_rows(values_only=True)
+            yield from ([("" if value is None else value) for value in row] for row in rows)
+        finally:
+            workbook.close()
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            yield from csv.reader(f)
+
+
+class ImportChunk:
+    """Scored rows of one chunk: option codes, score matrix and row details."""
+
+    def __init__(self, rows, answers, scores, names, schools, cohorts, subject_scores):
+        self.rows = rows
+        self.answers = answers
+        self.scores = scores
+        self.names = names
+        self.schools = schools
+        self.cohorts = cohorts
+        self.subject_scores = subject_scores
+
+    def __len__(self):
+        return len(self.rows)
+
+
+def iter_import(path, bank=None, chunk_size=5000, errors=None, sheet=None):
+    """Yield ImportChunks of valid, scored rows.
+
+    ``errors`` is called with ``(row_number, name, messages)`` for every
+    skipped row; row numbers count the header as row 1, as spreadsheets do.
+    """
+    bank = bank or default_bank()
+    engine = scoring_engine(bank)
+    matcher = OptionMatcher(bank)
+    rows = read_rows(path, sheet)
+    try:
+        header = next(rows)
+    except StopIteration:
+        raise ImportFormatError(f"{path} is empty") from None
+    columns = ColumnMap(header, bank)
+    errors = errors or (lambda row_number, name, messages: None)
+
+    # Valid rows fill every column of their slot; a rejected row's slot is reused
+    answers = np.empty((chunk_size, len(bank.q_ids)), dtype=np.int8)
+    details = []
+
+    for row_number, row in enumerate(rows, start=2):
+        if not any(str(value).strip() for value in row):
+            continue
+
+        def cell(col):
+            return str(row[col]).strip() if col is not None and col < len(row) else ""
+
+        name = cell(columns.name) or None
+        codes = answers[len(details)]
+        messages = []
+        unanswered = []
+        for pos, col in columns.positions:
+            text = cell(col)
+            if not text:
+                unanswered.append(bank.q_ids[pos])
+                continue
+            code = matcher.match(pos, text)
+            if code is None:
+                messages.append(f"Q{bank.q_ids[pos]}: {text!r} matches no option")
+            else:
+                codes[pos] = code
+        if unanswered:
+            messages.insert(0, f"unanswered questions {unanswered}")
+        subject_scores = {}
+        for subj, col in columns.subjects.items():
+            value = cell(col)
+            if value:
+                try:
+                    subject_scores[subj] = float(value.rstrip("%"))
+                except ValueError:
+                    messages.append(f"{subj}: {value!r} is not a number")
+        if messages:
+            errors(row_number, name, messages)
+            continue
+        details.append((row_number, name, cell(columns.school) or None, cell(columns.cohort) or None, subject_scores))
+        if len(details) == chunk_size:
+            yield _chunk(details, answers, engine)
+            details = []
+    if details:
+        yield _chunk(details, answers, engine)
+
+
+def _chunk(details, answers, engine):
+    row_numbers, names, schools, cohorts, subject_scores = (list(column) for column in zip(*details))
+    filled = answers[:len(details)].copy()
+    return ImportChunk(row_numbers, filled, engine.score_matrix(filled), names, schools, cohorts, subject_scores)
+
+
+def import_file(path, store=None, bank=None, chunk_size=5000, errors_path=None, school=None, cohort=None,
+                sheet=None, progress_every=100000, log=sys.stderr):
+    """Score every valid row of ``path`` and add it to ``store``; returns counts."""
+    bank = bank or default_bank()
+    stats = {"imported": 0, "failed": 0}
+    start = time.perf_counter()
+    error_file = open(errors_path, "w", encoding="utf-8") if errors_path else None
+
+    def record_error(row_number, name, messages):
+        stats["failed"] += 1
+        if error_file:
+            error_file.write(json.dumps({"row": row_number, "name": name, "errors": messages}) + "\n")
+
+    try:
+        for chunk in iter_import(path, bank, chunk_size, record_error, sheet):
+            if store is not None:
+                # Rows without their own school or class get the defaults
+                groups = {}
+                for i, (row_school, row_cohort) in enumerate(zip(chunk.schools, chunk.cohorts)):
+                    groups.setdefault((row_school or school, row_cohort or cohort), []).append(i)
+                for (group_school, group_cohort), index in groups.items():
+                    store.add_many(
+                        chunk.answers[index], [chunk.subject_scores[i] for i in index], [chunk.names[i] for i in index],
+                        cohort=group_cohort, school=group_school, scores=chunk.scores[index], bank=bank,
+                    )
+            before = stats["imported"]
+            stats["imported"] += len(chunk)
+            if progress_every and stats["imported"] // progress_every > before // progress_every:
+                elapsed = time.perf_counter() - start
+                print(f"{stats['imported']} rows imported ({stats['imported'] / elapsed:.0f}/sec)", file=log)
+        if store is not None:
+            store.flush()
+    finally:
+        if error_file:
+            error_file.close()
+    stats["seconds"] = time.perf_counter() - start
+    stats["rows_per_sec"] = (stats["imported"] + stats["failed"]) / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import assessment answers from a CSV or Excel export.")
+    parser.add_argument("input", help="CSV or .xlsx file with one row per student")
+    parser.add_argument("--store", help="results database to add the scored rows to")
+    parser.add_argument("--errors", default="import_errors.jsonl", help="where to list rejected rows")
+    parser.add_argument("--school", help="school for rows without a school column")
+    parser.add_argument("--cohort", help="class or cohort for rows without one")
+    parser.add_argument("--sheet", help="worksheet to read from an Excel file (default: the active one)")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    store = None
+    if args.store:
+        from .store import ResultsStore
+        store = ResultsStore(args.store, batch_size=args.chunk_size, flush_interval=0)
+    try:
+        stats = import_file(
+            args.input, store, chunk_size=args.chunk_size, errors_path=args.errors,
+            school=args.school, cohort=args.cohort, sheet=args.sheet,
+        )
+    except ImportFormatError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if store is not None:
+            store.close()
+    print(
+        f"Imported {stats['imported']} rows ({stats['failed']} rejected) in {stats['seconds']:.1f}s"
+        f" - {stats['rows_per_sec']:.0f} rows/sec"
+    )
+    if stats["failed"]:
+        print(f"Rejected rows are listed in {args.errors}")
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import report_fingerprint
+from .report import render_report
+
+# Share of the work done when render_report enters each stage
+STAGES = {
+    "queued": (0.0, "Waiting for a free worker"),
+    "scores": (0.05, "Scoring answers"),
+    "charts": (0.15, "Drawing radar charts"),
+    "pdf": (0.5, "Laying out the PDF"),
+    "done": (1.0, "Report ready"),
+    "failed": (1.0, "Report failed"),
+}
+
+
+class QueueFull(RuntimeError):
+    """Too many reports are waiting; the caller should retry later."""
+
+
+class ReportJob:
+    def __init__(self, job_id, key, cache=None):
+        self.job_id = job_id
+        self.key = key
+        self.cache = cache
+        self.stage = "queued"
+        self.error = None
+        self.submitted = time.time()
+        self.finished = None
+        self._pdf_bytes = None
+
+    @property
+    def pdf_bytes(self):
+        # With a cache the PDF is only held there; None once it is evicted
+        if self._pdf_bytes is not None or self.cache is None or self.stage != "done":
+            return self._pdf_bytes
+        entry = self.cache.get(self.key)
+        return entry[0] if entry is not None else None
+
+    @property
+    def size(self):
+        return len(self._pdf_bytes) if self._pdf_bytes is not None else 0
+
+    @property
+    def progress(self):
+        return STAGES[self.stage][0]
+
+    @property
+    def message(self):
+        return STAGES[self.stage][1]
+
+    @property
+    def done(self):
+        return self.stage in ("done", "failed")
+
+
+class ReportJobs:
+    """Builds reports on a bounded worker pool instead of the script thread.
+
+    Jobs live in this process-wide registry, so a session only keeps the job
+    ID and can poll it across reruns. At most ``max_pending`` jobs queue or
+    run at once; beyond that ``submit`` raises QueueFull. Finished jobs are
+    kept for the ``keep_finished`` most recent reports. A finished report's
+    PDF stays in the cache's memory tier; without a cache the jobs hold it
+    themselves, at most ``keep_bytes`` of PDFs in all.
+    """
+
+    def __init__(self, cache=None, workers=2, max_pending=16, keep_finished=64, keep_bytes=32 * 1024 * 1024):
+        self.cache = cache
+        self.max_pending = max_pending
+        self.keep_finished = keep_finished
+        self.keep_bytes = keep_bytes
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="report")
+        self.lock = threading.Lock()
+        self.jobs = {}
+        self.pending = {}
+        self.finished = OrderedDict()
+        self.finished_bytes = 0
+
+    def submit(self, student_name, responses, subject_scores, chart_backend=None, bank=None):
+        # Snapshot the inputs; the session may keep editing its answers
+        responses, subject_scores = dict(responses), dict(subject_scores)
+        key = report_fingerprint(student_name, responses, subject_scores, chart_backend, bank)
+        with self.lock:
+            # The same report already in flight (a double click) is not queued twice
+            job = self.pending.get(key)
+            if job is not None:
+                return job.job_id
+            if len(self.pending) >= self.max_pending:
+                raise QueueFull(f"{len(self.pending)} reports are already being generated")
+            job = ReportJob(uuid.uuid4().hex, key, self.cache)
+            self.jobs[job.job_id] = job
+            self.pending[key] = job
+        self.executor.submit(self._run, job, student_name, responses, subject_scores, chart_backend, bank)
+        return job.job_id
+
+    def _run(self, job, student_name, responses, subject_scores, chart_backend, bank):
+        def progress(stage):
+            job.stage = stage
+
+        try:
+            if self.cache is not None:
+                self.cache.get_or_build(
+                    student_name, responses, subject_scores, chart_backend=chart_backend, bank=bank, progress=progress
+                )
+                pdf_bytes = None
+            else:
+                pdf_bytes, _ = render_report(
+                    student_name, responses, subject_scores, chart_backend=chart_backend, bank=bank, progress=progress
+                )
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.stage = "failed"
+        else:
+            job._pdf_bytes = pdf_bytes
+            job.stage = "done"
+        job.finished = time.time()
+        with self.lock:
+            self.pending.pop(job.key, None)
+            self.finished[job.job_id] = job
+            self.finished_bytes += job.size
+            while len(self.finished) > self.keep_finished or self.finished_bytes > self.keep_bytes:
+                expired_id, expired = self.finished.popitem(last=False)
+                self.finished_bytes -= expired.size
+                self.jobs.pop(expired_id, None)
+
+    def status(self, job_id):
+        # None once a finished job has been dropped from the registry
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def stats(self):
+        with self.lock:
+            jobs = list(self.jobs.values())
+        counts = {stage: 0 for stage in STAGES}
+        for job in jobs:
+            counts[job.stage] += 1
+        counts["pending"] = len(jobs) - counts["done"] - counts["failed"]
+        return counts
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,292 @@
+"""Per-stage timings and byte/chart counts for the report path.
+
+Off unless CAREER_GUIDANCE_METRICS or CAREER_GUIDANCE_METRICS_FILE is set
+(or ``enable()`` is called). While off, ``stage`` and ``report`` return a
+shared do-nothing context manager, so instrumented code pays one global
+lookup per stage.
+
+    with metrics.report(chart_backend="vector"):
+        with metrics.stage("pdf_output") as s:
+            data = pdf.output(dest="S")
+            s.add(nbytes=len(data))
+
+Every stage records wall time, CPU time of the calling thread, calls, bytes
+written and charts rendered into the process-wide ``registry``. Stages
+inside a ``report`` block are also summed per report, and the report is
+logged as one JSON line on the ``career_guidance.metrics`` logger; while
+metrics are on, lines go to stderr unless that logger has handlers of its
+own. Stages may nest (``charts`` contains ``matplotlib_draw`` and
+``png_encode``), so per-stage times of one report can add up to more than
+its total.
+
+``registry.prometheus()`` gives the totals in the Prometheus text format;
+with CAREER_GUIDANCE_METRICS_FILE set they are also written to that file
+(for node_exporter's textfile collector) at most every
+``FILE_INTERVAL`` seconds and at exit.
+"""
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger("career_guidance.metrics")
+
+METRICS_FILE = os.environ.get("CAREER_GUIDANCE_METRICS_FILE")
+FILE_INTERVAL = 10.0
+# Upper bounds, in seconds, of the report duration histogram
+REPORT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# calls, wall seconds, CPU seconds, bytes, charts
+_COLUMNS = 5
+
+enabled = bool(os.environ.get("CAREER_GUIDANCE_METRICS") or METRICS_FILE)
+_local = threading.local()
+
+
+def enable(on=True):
+    global enabled
+    enabled = on
+    if on:
+        log_reports()
+
+
+def log_reports():
+    # Report lines go to stderr as bare JSON; forked workers inherit the handler
+    if logger.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+class _Off:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add(self, nbytes=0, charts=0):
+        pass
+
+
+_OFF = _Off()
+
+
+class Registry:
+    """Process-wide totals per stage, plus report counts and durations."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.stages = {}
+        self.reports = {"ok": 0, "error": 0}
+        self.report_buckets = [0] * len(REPORT_BUCKETS)
+        self.report_seconds = 0.0
+
+    def add_stage(self, name, values):
+        with self.lock:
+            totals = self.stages.get(name)
+            if totals is None:
+                totals = self.stages[name] = [0] * _COLUMNS
+            for i, value in enumerate(values):
+                totals[i] += value
+
+    def add_report(self, seconds, ok):
+        with self.lock:
+            self.reports["ok" if ok else "error"] += 1
+            self.report_seconds += seconds
+            for i, bound in enumerate(REPORT_BUCKETS):
+                if seconds <= bound:
+                    self.report_buckets[i] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "stages": {name: list(totals) for name, totals in self.stages.items()},
+                "reports": dict(self.reports),
+                "report_buckets": list(self.report_buckets),
+                "report_seconds": self.report_seconds,
+            }
+
+    def take(self):
+        """Snapshot and reset, for worker processes handing their totals to ``merge``."""
+        with self.lock:
+            snapshot = {
+                "stages": self.stages, "reports": self.reports,
+                "report_buckets": self.report_buckets, "report_seconds": self.report_seconds,
+            }
+            self.reset()
+        return snapshot
+
+    def merge(self, snapshot):
+        for name, values in snapshot["stages"].items():
+            self.add_stage(name, values)
+        with self.lock:
+            for status, count in snapshot["reports"].items():
+                self.reports[status] += count
+            self.report_seconds += snapshot["report_seconds"]
+            for i, count in enumerate(snapshot["report_buckets"]):
+                self.report_buckets[i] += count
+
+    def prometheus(self):
+        snapshot = self.snapshot()
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP career_guidance_{name} {help_text}")
+            lines.append(f"# TYPE career_guidance_{name} {kind}")
+
+        stages = sorted(snapshot["stages"].items())
+        for column, name, help_text in (
+            (0, "stage_calls_total", "Times each report stage ran."),
+            (1, "stage_seconds_total", "Wall time spent in each report stage."),
+            (2, "stage_cpu_seconds_total", "CPU time of the calling thread in each report stage."),
+            (3, "stage_bytes_total", "Bytes produced by each report stage."),
+        ):
+            family(name, "counter", help_text)
+            lines.extend(f'career_guidance_{name}{{stage="{stage}"}} {totals[column]:.9g}' for stage, totals in stages)
+        family("charts_rendered_total", "counter", "Radar charts rendered (chart cache misses).")
+        lines.append(f"career_guidance_charts_rendered_total {sum(totals[4] for _, totals in stages)}")
+        family("reports_total", "counter", "Reports rendered, by outcome.")
+        lines.extend(f'career_guidance_reports_total{{status="{status}"}} {count}' for status, count in snapshot["reports"].items())
+
+        family("report_seconds", "histogram", "Wall time to render one report.")
+        for bound, count in zip(REPORT_BUCKETS, snapshot["report_buckets"]):
+            lines.append(f'career_guidance_report_seconds_bucket{{le="{bound:g}"}} {count}')
+        total = sum(snapshot["reports"].values())
+        lines.append(f'career_guidance_report_seconds_bucket{{le="+Inf"}} {total}')
+        lines.append(f"career_guidance_report_seconds_sum {snapshot['report_seconds']:.9g}")
+        lines.append(f"career_guidance_report_seconds_count {total}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        # Written to a temp file and renamed, so collectors never read a partial file
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, part_path = tempfile.mkstemp(dir=directory, suffix=".part")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(self.prometheus())
+        os.replace(part_path, path)
+
+
+registry = Registry()
+_file_lock = threading.Lock()
+_file_written = 0.0
+
+
+def _write_file(force=False):
+    global _file_written
+    if not METRICS_FILE:
+        return
+    now = time.monotonic()
+    if not force and now - _file_written < FILE_INTERVAL:
+        return
+    with _file_lock:
+        if not force and now - _file_written < FILE_INTERVAL:
+            return
+        _file_written = now
+        try:
+            registry.write(METRICS_FILE)
+        except OSError as e:
+            logger.warning("Could not write metrics to %s: %s", METRICS_FILE, e)
+
+
+if METRICS_FILE:
+    atexit.register(_write_file, True)
+if enabled:
+    log_reports()
+
+
+class _Stage:
+    __slots__ = ("name", "nbytes", "charts", "wall", "cpu")
+
+    def __init__(self, name):
+        self.name = name
+        self.nbytes = 0
+        self.charts = 0
+
+    def add(self, nbytes=0, charts=0):
+        self.nbytes += nbytes
+        self.charts += charts
+
+    def __enter__(self):
+        self.wall = time.perf_counter()
+        self.cpu = time.thread_time()
+        return self
+
+    def __exit__(self, *exc):
+        values = (1, time.perf_counter() - self.wall, time.thread_time() - self.cpu, self.nbytes, self.charts)
+        registry.add_stage(self.name, values)
+        trace = getattr(_local, "trace", None)
+        if trace is not None:
+            trace.add(self.name, values)
+        return False
+
+
+def stage(name):
+    """Time one stage; the returned object's ``add`` counts bytes written and charts rendered."""
+    if not enabled:
+        return _OFF
+    return _Stage(name)
+
+
+class _Report:
+    __slots__ = ("fields", "stages", "outer", "wall", "cpu")
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.stages = {}
+
+    def add(self, name, values):
+        totals = self.stages.get(name)
+        if totals is None:
+            totals = self.stages[name] = [0] * _COLUMNS
+        for i, value in enumerate(values):
+            totals[i] += value
+
+    def __enter__(self):
+        self.outer = getattr(_local, "trace", None)
+        _local.trace = self
+        self.wall = time.perf_counter()
+        self.cpu = time.thread_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.wall
+        cpu = time.thread_time() - self.cpu
+        _local.trace = self.outer
+        registry.add_report(wall, exc_type is None)
+        if logger.isEnabledFor(logging.INFO):
+            line = {
+                "event": "report",
+                **self.fields,
+                "ok": exc_type is None,
+                "wall_ms": round(wall * 1000, 3),
+                "cpu_ms": round(cpu * 1000, 3),
+                "bytes": sum(totals[3] for totals in self.stages.values()),
+                "charts": sum(totals[4] for totals in self.stages.values()),
+                "stages": {
+                    name: {"calls": calls, "wall_ms": round(w * 1000, 3), "cpu_ms": round(c * 1000, 3), "bytes": nbytes}
+                    for name, (calls, w, c, nbytes, _) in self.stages.items()
+                },
+            }
+            if exc_type is not None:
+                line["error"] = exc_type.__name__
+            logger.info(json.dumps(line))
+        _write_file()
+        return False
+
+
+def report(**fields):
+    """Collect the stages run inside the block into one report; ``fields`` go into its log line."""
+    if not enabled:
+        return _OFF
+    return _Report(fields)
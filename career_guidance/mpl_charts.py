@@ -0,0 +1,94 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from . import metrics
+from .png import rgb_to_png
+
+MAX_TEMPLATES = 32
+MAX_BACKGROUNDS = 4
+
+_templates = OrderedDict()
+_templates_lock = threading.Lock()
+
+
+class RadarTemplate:
+    """Radar chart for one dimension and trait set, laid out once.
+
+    Axes, ticks, labels and title are drawn once per radial limit and kept as
+    a background; rendering a student only blits that background and redraws
+    the line and fill.
+    """
+
+    def __init__(self, dimension, labels, dpi=150):
+        self.fig = Figure(figsize=(7.5, 7.5), dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot(polar=True)
+        angles = np.linspace(0, 2 * np.pi, len(labels), endpoint=False).tolist()
+        self.angles = angles + angles[:1]
+        zeros = [0.0] * len(self.angles)
+
+        # Grid below the fill, so the background can be drawn without the data
+        self.ax.set_axisbelow(True)
+        self.line, = self.ax.plot(self.angles, zeros, 'o-', linewidth=2)
+        self.fill, = self.ax.fill(self.angles, zeros, alpha=0.25)
+        self.line.set_animated(True)
+        self.fill.set_animated(True)
+        self.ax.set_yticklabels([])
+        self.ax.set_xticks(self.angles[:-1])
+        self.ax.set_xticklabels(labels, fontsize=9, wrap=True)
+        self.ax.set_title(dimension, fontsize=14)
+        self.fig.subplots_adjust(top=0.85, bottom=0.1)
+
+        self.backgrounds = OrderedDict()
+        self.lock = threading.Lock()
+
+    def render(self, values):
+        values = list(values)
+        values += values[:1]
+        with self.lock:
+            self.line.set_data(self.angles, values)
+            self.fill.set_xy(np.column_stack([self.angles, values]))
+            self.ax.relim()
+            self.ax.autoscale_view()
+            limits = self.ax.get_ylim()
+            with metrics.stage("matplotlib_draw"):
+                if limits in self.backgrounds:
+                    self.backgrounds.move_to_end(limits)
+                    self.canvas.restore_region(self.backgrounds[limits])
+                else:
+                    self.canvas.draw()
+                    self.backgrounds[limits] = self.canvas.copy_from_bbox(self.fig.bbox)
+                    if len(self.backgrounds) > MAX_BACKGROUNDS:
+                        self.backgrounds.popitem(last=False)
+                self.ax.draw_artist(self.fill)
+                self.ax.draw_artist(self.line)
+            with metrics.stage("png_encode") as timer:
+                png = rgb_to_png(np.asarray(self.canvas.buffer_rgba()))
+                timer.add(nbytes=len(png))
+            return png
+
+
+def radar_template(dimension, labels):
+    key = (dimension, tuple(labels))
+    with _templates_lock:
+        template = _templates.get(key)
+        if template is not None:
+            _templates.move_to_end(key)
+            return template
+    template = RadarTemplate(dimension, labels)
+    with _templates_lock:
+        template = _templates.setdefault(key, template)
+        if len(_templates) > MAX_TEMPLATES:
+            _templates.popitem(last=False)
+    return template
+
+
+def matplotlib_radar_charts(ordered_scores):
+    return {
+        dimension: radar_template(dimension, list(scores)).render(list(scores.values()))
+        for dimension, scores in ordered_scores.items()
+    }
@@ -0,0 +1,69 @@
+# Page transitions for the assessment UI. They are wired as Streamlit on_click
+# callbacks, which run before the rerun a click triggers: a transition costs a
+# single script run and never blocks the script thread. ``state`` is
+# st.session_state, or any mapping with the same keys.
+
+from .compact import PackedResponses
+
+INCOMPLETE_WARNING = "⚠️ Please answer all questions before proceeding."
+
+
+def init_state(state, bank=None):
+    # Answers are kept packed, one byte per question
+    if "responses" not in state:
+        state["responses"] = PackedResponses(bank=bank)
+    state.setdefault("page", 0)
+    state.setdefault("nav_warning", None)
+
+
+def section_answered(state, q_ids):
+    responses = state["responses"]
+    return all(responses.get(q_id) or state.get(f"q_{q_id}") for q_id in q_ids)
+
+
+def save_answers(state, q_ids):
+    # Copy the section's submitted radio values into the saved responses
+    responses = state["responses"]
+    for q_id in q_ids:
+        selected = state.get(f"q_{q_id}")
+        if selected:
+            responses[q_id] = selected
+
+
+def go_back(state, from_page, q_ids=()):
+    # Clicks rendered for a page the student already left are ignored, so a
+    # double click moves one page, not two
+    state["nav_warning"] = None
+    save_answers(state, q_ids)
+    if state["page"] == from_page and from_page > 0:
+        state["page"] = from_page - 1
+
+
+def go_next(state, from_page, q_ids):
+    state["nav_warning"] = None
+    if state["page"] != from_page:
+        return
+    save_answers(state, q_ids)
+    if not section_answered(state, q_ids):
+        state["nav_warning"] = INCOMPLETE_WARNING
+        return
+    state["page"] = from_page + 1
+
+
+def reset(state):
+    # init_state creates fresh responses for the bank the next run uses
+    state.pop("responses", None)
+    state["page"] = 0
+    state["nav_warning"] = None
+    state.pop("report_job", None)
+    # Starting over picks up the current question bank, in a new saved session.
+    # The old token is still in the page URL, so it is marked as abandoned
+    # rather than resumed on the next run
+    state.pop("bank_version", None)
+    token = state.pop("session_token", None)
+    if token is not None:
+        state["session_abandoned"] = token
+    state.pop("session_saved", None)
+    # Clear the radio widgets too, otherwise they would refill the answers
+    for key in [key for key in state.keys() if str(key).startswith("q_")]:
+        del state[key]
@@ -0,0 +1,72 @@
+import threading
+from collections import OrderedDict
+
+from fpdf import FPDF
+
+from .png import parse_png
+
+MAX_STATIC_BLOCKS = 1024
+
+# Layout state a block's output depends on, and is restored after a replay
+_LAYOUT_STATE = (
+    "x", "y", "w", "h", "k", "l_margin", "r_margin", "c_margin", "page_break_trigger", "lasth", "ws",
+    "font_family", "font_style", "font_size_pt", "underline", "color_flag", "text_color", "draw_color",
+    "fill_color", "line_width",
+)
+_static_blocks = OrderedDict()
+_static_blocks_lock = threading.Lock()
+
+
+class ReportPDF(FPDF):
+    reuse_static_blocks = True
+
+    def static_block(self, key, draw):
+        # Content that only depends on the layout state it starts from is laid
+        # out once per process; later reports append the recorded page content
+        state = (key, tuple(self.fonts)) + tuple(getattr(self, attr) for attr in _LAYOUT_STATE)
+        with _static_blocks_lock:
+            cached = _static_blocks.get(state)
+            if cached is not None:
+                _static_blocks.move_to_end(state)
+        if cached is not None and self.reuse_static_blocks:
+            content, end_state = cached
+            self.pages[self.page] += content
+            for attr, value in end_state.items():
+                setattr(self, attr, value)
+            if self.font_family:
+                self.current_font = self.fonts[self.font_family + self.font_style]
+            return
+        page, start, fonts, images = self.page, len(self.pages[self.page]), len(self.fonts), len(self.images)
+        draw()
+        # Blocks that broke the page or registered fonts or images cannot be replayed
+        if self.page == page and len(self.fonts) == fonts and len(self.images) == images:
+            end_state = {attr: getattr(self, attr) for attr in _LAYOUT_STATE + ("font_size", "unifontsubset")}
+            with _static_blocks_lock:
+                _static_blocks[state] = (self.pages[page][start:], end_state)
+                if len(_static_blocks) > MAX_STATIC_BLOCKS:
+                    _static_blocks.popitem(last=False)
+
+    # FPDF 1.7 only reads images from disk; register PNG bytes directly so
+    # reports are built without touching the filesystem
+    def image_bytes(self, name, data, x=None, y=None, w=0, h=0):
+        if name not in self.images:
+            info = parse_png(data)
+            info["i"] = len(self.images) + 1
+            self.images[name] = info
+        self.image(name, x, y, w, h)
+
+    def polygon(self, points, style=''):
+        # One vertex encloses nothing and has no outline (a radar chart with a
+        # single scored trait); its marker is drawn by the caller
+        if len(points) < 2:
+            return
+        op = {'F': 'f', 'FD': 'b', 'DF': 'b'}.get(style, 's')
+        path = [f"{px * self.k:.2f} {(self.h - py) * self.k:.2f}" for px, py in points]
+        self._out(f"{path[0]} m " + " l ".join(path[1:]) + f" l {op}")
+
+    def chart(self, name, chart, x, y, w):
+        # Raster backends hand over PNG bytes, vector backends draw themselves
+        if isinstance(chart, bytes):
+            self.image_bytes(name, chart, x=x, y=y, w=w)
+        else:
+            chart.draw(self, x, y, w)
@@ -0,0 +1,55 @@
+import struct
+import zlib
+
+import numpy as np
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _chunk(chunk_type, data):
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data))
+
+
+def rgb_to_png(pixels, level=3):
+    # Accepts RGB or RGBA pixels (alpha is dropped). Every row uses filter
+    # type 0 and a low zlib level: chart images are mostly flat colour, so
+    # adaptive filtering and heavy compression cost more time than they save
+    height, width = pixels.shape[:2]
+    rows = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    rows[:, 1:].reshape(height, width, 3)[...] = pixels[:, :, :3]
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    idat = zlib.compress(rows.data, level)
+    return PNG_SIGNATURE + _chunk(b"IHDR", header) + _chunk(b"IDAT", idat) + _chunk(b"IEND", b"")
+
+
+def parse_png(data):
+    if data[:8] != PNG_SIGNATURE:
+        raise ValueError("Not a PNG image")
+    header = None
+    palette = b""
+    idat = []
+    pos = 8
+    while pos < len(data):
+        length, chunk_type = struct.unpack(">I4s", data[pos:pos + 8])
+        chunk = data[pos + 8:pos + 8 + length]
+        pos += length + 12
+        if chunk_type == b"IHDR":
+            header = struct.unpack(">IIBBBBB", chunk)
+        elif chunk_type == b"PLTE":
+            palette = chunk
+        elif chunk_type == b"IDAT":
+            idat.append(chunk)
+        elif chunk_type == b"IEND":
+            break
+    if header is None:
+        raise ValueError("PNG image has no IHDR chunk")
+    width, height, bpc, color_type, _, _, interlace = header
+    if bpc > 8 or color_type not in (0, 2, 3) or interlace:
+        raise ValueError("Only 8-bit, non-interlaced PNG images without alpha can be embedded")
+    colorspace = {0: "DeviceGray", 2: "DeviceRGB", 3: "Indexed"}[color_type]
+    colors = 3 if color_type == 2 else 1
+    return {
+        "w": width, "h": height, "cs": colorspace, "bpc": bpc, "f": "FlateDecode",
+        "dp": f"/Predictor 15 /Colors {colors} /BitsPerComponent {bpc} /Columns {width}",
+        "pal": palette, "trns": "", "data": b"".join(idat),
+    }
@@ -0,0 +1,142 @@
+"""Weighted career and university ranking over every assessed trait.
+
+Each catalog career has a weight per (dimension, trait) column of the
+bank's score layout, so a trait that appears in two dimensions
+("Creative" in Interest and in Aptitude) is two separate columns. A
+student's scores are turned into each dimension's share of their answers,
+and careers are ranked by the dot product of those shares with their
+weights:
+
+    model = career_model(bank, catalog)
+    model.rank(scores_by_dim)                 # [(career, score), ...]
+    model.rank_batch(score_matrix, k=5)       # top-k indices and scores per row
+
+Ranking a batch is one (N x T) @ (T x C) product and a top-k selection, so
+it scales to catalogs of thousands of careers.
+"""
+import threading
+
+import numpy as np
+
+from .bank import default_bank
+from .catalog import default_catalog
+from .compact import pack_scores
+
+# Fit scores computed at once in rank_batch (rows x careers)
+RANK_BLOCK = 1 << 22
+
+
+def top_k(values, k):
+    """Columns of the k largest values per row, best first.
+
+    Ties go to the lower column, whichever side of the cut they fall on, so
+    the ranking only depends on the scores and the catalog order.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    count = values.shape[1]
+    k = min(k, count)
+    if k == 0:
+        return np.empty((len(values), 0), dtype=np.int64)
+    if k < count:
+        kth = -np.partition(-values, k - 1, axis=1)[:, k - 1:k]
+        above = values > kth
+        # Fill the rest of each row's k slots with the first columns tied at the cut
+        tied = values == kth
+        tied &= np.cumsum(tied, axis=1) <= k - above.sum(axis=1, keepdims=True)
+        chosen = np.nonzero(above | tied)[1].reshape(len(values), k)
+    else:
+        chosen = np.broadcast_to(np.arange(count), values.shape)
+    chosen_values = np.take_along_axis(values, chosen, axis=1)
+    order = np.lexsort((chosen, -chosen_values), axis=1)
+    return np.take_along_axis(chosen, order, axis=1)
+
+
+class CareerModel:
+    """Career and university weight matrices over a bank's score layout.
+
+    ``career_weights`` is C x T and ``university_weights`` U x T, one row
+    per entry of the catalog's ``careers`` and ``universities``. Traits
+    the bank does not assess are ignored.
+    """
+
+    def __init__(self, bank=None, catalog=None):
+        bank = bank or default_bank()
+        catalog = catalog or default_catalog()
+        self.bank = bank
+        self.catalog = catalog
+        self.columns = bank.dim_columns
+        width = len(bank.column_trait_ids)
+
+        def matrix(profiles):
+            weights = np.zeros((len(profiles), width), dtype=np.float64)
+            for row, profile in zip(weights, profiles):
+                for dim, traits in profile.items():
+                    if dim not in self.columns:
+                        continue
+                    index = bank.dim_trait_index[dim]
+                    for trait, weight in traits.items():
+                        if trait in index:
+                            row[self.columns[dim].start + index[trait]] = weight
+            return weights
+
+        self.careers = catalog.careers
+        self.universities = catalog.universities
+        self.career_weights = matrix(catalog.career_traits)
+        self.university_weights = matrix(catalog.university_traits)
+
+    def features(self, scores):
+        """Each trait's share of its dimension's total score, per row (0 if none)."""
+        scores = np.atleast_2d(np.asarray(scores, dtype=np.float64))
+        shares = np.zeros_like(scores)
+        for cols in self.columns.values():
+            totals = scores[:, cols].sum(axis=1, keepdims=True)
+            np.divide(scores[:, cols], totals, out=shares[:, cols], where=totals > 0)
+        return shares
+
+    def rank_batch(self, scores, k=5, universities=False, among=None):
+        """Top-k (indices, scores) per row of an N x T score matrix.
+
+        ``among`` limits the ranking to those catalog positions, e.g. the
+        result of a Catalog query.
+        """
+        weights = self.university_weights if universities else self.career_weights
+        if among is not None:
+            among = np.array(sorted(among), dtype=np.int64)
+            weights = weights[among]
+        features = self.features(scores)
+        k = min(k, len(weights))
+        best = np.empty((len(features), k), dtype=np.int64)
+        best_fit = np.empty((len(features), k), dtype=np.float64)
+        # Rows go through in blocks so the N x C fit matrix stays small
+        rows = max(1, RANK_BLOCK // max(len(weights), 1))
+        for start in range(0, len(features), rows):
+            block = slice(start, start + rows)
+            # BLAS sums in a different order for one row than for a batch;
+            # rounding keeps equal fits equal, so a student ranks the same either way
+            fit = np.round(features[block] @ weights.T, 9)
+            best[block] = top_k(fit, k)
+            best_fit[block] = np.take_along_axis(fit, best[block], axis=1)
+        if among is not None:
+            best = among[best]
+        return best, best_fit
+
+    def rank(self, scores_by_dim, k=5, universities=False, among=None):
+        """[(name, score), ...] for one student, best first."""
+        names = self.universities if universities else self.careers
+        best, fit = self.rank_batch(pack_scores(scores_by_dim, self.bank)[None, :], k, universities, among)
+        return [(names[i], score) for i, score in zip(best[0].tolist(), fit[0].tolist())]
+
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def career_model(bank=None, catalog=None):
+    # One model per bank version and catalog, per process
+    bank = bank or default_bank()
+    catalog = catalog or default_catalog()
+    with _models_lock:
+        model = _models.get((bank.version, catalog))
+        if model is None:
+            model = _models[bank.version, catalog] = CareerModel(bank, catalog)
+        return model
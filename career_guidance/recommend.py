@@ -0,0 +1,183 @@
+import threading
+
+import numpy as np
+
+from .bank import default_bank
+from .catalog import default_catalog
+from .compact import pack_scores
+from .ranking import career_model
+from .scoring import scoring_engine
+
+# Top Interest trait -> career and university domain
+INTEREST_DOMAINS = {
+    "STEM": "STEM",
+    "Creative": "Creative",
+    "Humanities": "Social",
+    "Business": "Business"
+}
+# Subject marks (%) counted as a strength or a weakness
+STRENGTH_MIN = 85
+WEAKNESS_MAX = 60
+DEFAULT_MAJORS = ("Liberal Arts", "General Studies")
+# Best-ranked careers and universities listed in a report; every major
+# related to a strong subject is listed
+CAREERS_SHOWN = 4
+UNIVERSITIES_SHOWN = 4
+
+
+class RecommendationIndex:
+    """Recommendation lookup tables compiled once per question bank and catalog.
+
+    Strong subjects are a bitmask over the catalog's subjects; each mask's
+    majors come from the catalog's subject index, in catalog order, and are
+    remembered for the next student with the same strengths. The top
+    Interest trait, as a column of the bank's Interest dimension (-1 for
+    none), indexes the catalog's careers and universities of its domain for
+    recommend_domain. Reports rank careers and universities with the
+    weighted CareerModel instead.
+    """
+
+    def __init__(self, bank=None, catalog=None):
+        bank = bank or default_bank()
+        self.bank = bank
+        self.catalog = catalog or default_catalog()
+        self.engine = scoring_engine(bank)
+        self.model = career_model(bank, self.catalog)
+        self.subjects = self.catalog.subjects
+        self.subject_cols = {subj: i for i, subj in enumerate(self.subjects)}
+        self.subject_bits = {subj: 1 << i for i, subj in enumerate(self.subjects)}
+        self._majors = {0: ()}
+
+        # One entry per Interest trait column plus a last one for -1, so the
+        # dominant_batch result indexes it directly
+        self.interest_traits = self.engine.traits.get("Interest", ())
+        self.domains = tuple(INTEREST_DOMAINS.get(trait, "General") for trait in self.interest_traits) + ("General",)
+        self.domain_index = {domain: i for i, domain in enumerate(self.domains)}
+        careers, universities = self.catalog.careers_by_domain, self.catalog.universities_by_domain
+        self.summaries = tuple(
+            (careers.get(domain, ()), universities.get(domain, ()))
+            if domain in careers or domain in universities else None
+            for domain in self.domains
+        )
+
+    def strength_mask(self, strengths):
+        mask = 0
+        for subj in strengths:
+            mask |= self.subject_bits.get(subj, 0)
+        return mask
+
+    def majors(self, mask):
+        majors = self._majors.get(mask)
+        if majors is None:
+            subjects = [subj for subj, bit in self.subject_bits.items() if mask & bit]
+            ids = sorted(self.catalog.majors_where(subjects=subjects))
+            majors = self._majors[mask] = tuple(self.catalog.majors[i] for i in ids)
+        return majors
+
+    def suggest_majors(self, strengths):
+        return list(self.majors(self.strength_mask(strengths)))
+
+    def _summary(self, interest_col):
+        summary = self.summaries[interest_col]
+        if summary is None:
+            return {}
+        return {"Careers": list(summary[0]), "Universities": list(summary[1])}
+
+    def recommend_domain(self, scores_by_dim):
+        interests = scores_by_dim.get("Interest", {})
+        top_interest = max(interests, key=interests.get) if interests else None
+        # Traits outside the bank fall back to General, as INTEREST_DOMAINS.get does
+        domain = INTEREST_DOMAINS.get(top_interest, "General")
+        return self._summary(self.domain_index.get(domain, -1))
+
+    def recommend_domain_batch(self, matrix, scores=None):
+        """recommend_domain for every row of an option-code matrix, from dominant_batch."""
+        dominant = self.engine.dominant_batch(matrix, scores).get("Interest")
+        if dominant is None:
+            return [self._summary(-1) for _ in range(len(matrix))]
+        return [self._summary(col) for col in dominant.tolist()]
+
+    def _ranked(self, careers, career_fit, universities, university_fit):
+        # Only entries the student's answers give some weight to are listed
+        recommendations = {}
+        names = [self.model.careers[i] for i, fit in zip(careers, career_fit) if fit > 0]
+        if names:
+            recommendations["Careers"] = names
+        names = [self.model.universities[i] for i, fit in zip(universities, university_fit) if fit > 0]
+        if names:
+            recommendations["Universities"] = names
+        return recommendations
+
+    def recommend(self, scores_by_dim, subject_scores):
+        strengths, _ = get_subject_analysis(subject_scores)
+        return self.recommend_rows(pack_scores(scores_by_dim, self.bank)[None, :], [self.strength_mask(strengths)])[0]
+
+    def recommend_rows(self, scores, masks):
+        careers, career_fit = self.model.rank_batch(scores, CAREERS_SHOWN)
+        universities, university_fit = self.model.rank_batch(scores, UNIVERSITIES_SHOWN, universities=True)
+        recommendations = []
+        for row in zip(careers.tolist(), career_fit.tolist(), universities.tolist(), university_fit.tolist(), masks):
+            recs = self._ranked(*row[:4])
+            recs["Suggested Majors"] = list(self.majors(row[4]) or DEFAULT_MAJORS)
+            recommendations.append(recs)
+        return recommendations
+
+    def strength_masks(self, subject_marks):
+        """Strong-subject bitmasks for an N x len(subjects) array of marks (NaN if missing)."""
+        marks = np.asarray(subject_marks, dtype=np.float64)
+        bits = np.left_shift(1, np.arange(len(self.subjects), dtype=np.int64))
+        return ((marks >= STRENGTH_MIN) * bits).sum(axis=1)
+
+    def subject_matrix(self, subject_scores_list):
+        marks = np.full((len(subject_scores_list), len(self.subjects)), np.nan)
+        for i, subject_scores in enumerate(subject_scores_list):
+            for subj, score in subject_scores.items():
+                col = self.subject_cols.get(subj)
+                if col is not None:
+                    marks[i, col] = score
+        return marks
+
+    def recommend_batch(self, matrix, subject_scores, scores=None):
+        """build_recommendations for every row of an option-code matrix.
+
+        ``subject_scores`` is a list of dicts or an N x len(subjects) array
+        of marks. Careers and universities are ranked for all rows in one
+        matrix product and strength masks come from one array comparison;
+        only the output dicts are built per row.
+        """
+        if not isinstance(subject_scores, np.ndarray):
+            subject_scores = self.subject_matrix(subject_scores)
+        if scores is None:
+            scores = self.engine.score_matrix(matrix)
+        return self.recommend_rows(scores, self.strength_masks(subject_scores).tolist())
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def recommendation_index(bank=None, catalog=None):
+    # One index per bank version and catalog, per process
+    bank = bank or default_bank()
+    catalog = catalog or default_catalog()
+    with _indexes_lock:
+        index = _indexes.get((bank.version, catalog))
+        if index is None:
+            index = _indexes[bank.version, catalog] = RecommendationIndex(bank, catalog)
+        return index
+
+
+def recommend_domain(scores_by_dim, bank=None):
+    return recommendation_index(bank).recommend_domain(scores_by_dim)
+
+def get_subject_analysis(subject_scores):
+    strengths = [subj for subj, score in subject_scores.items() if score >= STRENGTH_MIN]
+    weaknesses = [subj for subj, score in subject_scores.items() if score <= WEAKNESS_MAX]
+    return strengths, weaknesses
+
+def suggest_majors(strengths):
+    # Majors depend only on the subjects and the catalog, not on the bank
+    return recommendation_index().suggest_majors(strengths)
+
+def build_recommendations(scores_by_dim, subject_scores, bank=None):
+    return recommendation_index(bank).recommend(scores_by_dim, subject_scores)
@@ -0,0 +1,113 @@
+from io import BytesIO
+
+from . import metrics
+from .bank import default_bank
+from .charts import DEFAULT_CHART_BACKEND, generate_split_radar_charts
+from .recommend import build_recommendations
+from .scoring import calculate_scores
+
+INTRO_TEXT = (
+    "Thank you for completing the career guidance assessment. Based on your responses and academic scores, this report provides an overview of your key traits and suggestions for future career paths.\n\n"
+    "This report includes insights into your personality, learning preferences, behavior, emotional tendencies, and interests. It also offers tailored recommendations for suitable majors, careers, and university options."
+)
+ANALYSIS_TEXT = "Your psychometric analysis across 6 core dimensions shows the following dominant traits:"
+
+
+def generate_summary(scores_by_dim):
+    summary = ""
+    for dim, score_map in scores_by_dim.items():
+        if score_map:
+            top_area = max(score_map, key=score_map.get)
+            summary += f"\n- {dim}: Dominant trait = {top_area}"
+    return summary
+
+def generate_detailed_scores_text(scores_by_dim):
+    details = ""
+    for dim, score_map in scores_by_dim.items():
+        if score_map:
+            details += f"\n{dim} Scores:\n"
+            for trait, score in sorted(score_map.items(), key=lambda x: -x[1]):
+                details += f"- {trait}: {score:.1f}\n"
+    return details
+
+def layout_pdf(student_name, scores_by_dim, charts, recommendations):
+    # FPDF is only imported once a report is built, so scoring and
+    # recommendations load without it
+    from .pdf import ReportPDF
+
+    pdf = ReportPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+    pdf.cell(200, 10, txt=f"Career Report: {student_name}", ln=True, align='C')
+    pdf.ln(5)
+    # Only the greeting varies; a paragraph break resets line layout, so the
+    # intro can be laid out separately and replayed with identical output
+    pdf.multi_cell(0, 10, txt=f"Dear {student_name},\n\n")
+    pdf.static_block("intro", lambda: pdf.multi_cell(0, 10, txt=INTRO_TEXT))
+
+    pdf.ln(5)
+    pdf.set_font("Arial", size=12)
+    pdf.static_block("analysis", lambda: pdf.multi_cell(0, 10, txt=ANALYSIS_TEXT))
+    summary = generate_summary(scores_by_dim)
+    for line in summary.strip().split('\n'):
+        pdf.multi_cell(0, 8, txt=line)
+
+    pdf.add_page()
+    pdf.set_font("Arial", 'B', 14)
+    pdf.cell(0, 10, "Suggested Career Tracks & Universities", ln=True, align='C')
+    pdf.set_font("Arial", size=12)
+    for section, items in recommendations.items():
+        pdf.multi_cell(0, 8, f"\n{section} Suggestions:")
+        for item in items:
+            pdf.multi_cell(0, 8, f"- {item}")
+
+    pdf.add_page()
+    pdf.set_font("Arial", 'B', 14)
+    pdf.cell(0, 10, "Detailed Scores Breakdown", ln=True, align='C')
+    pdf.set_font("Arial", size=12)
+    detail_text = generate_detailed_scores_text(scores_by_dim)
+    pdf.multi_cell(0, 8, detail_text)
+
+    for dim in scores_by_dim:
+        if dim in charts:
+            pdf.add_page()
+            pdf.set_font("Arial", 'B', 14)
+            pdf.cell(0, 10, f"{dim} Profile", ln=True, align='C')
+            pdf.chart(f"{dim} chart", charts[dim], x=30, y=30, w=150)
+    return pdf
+
+def generate_pdf(student_name, scores_by_dim, charts, recommendations):
+    with metrics.stage("pdf_layout"):
+        pdf = layout_pdf(student_name, scores_by_dim, charts, recommendations)
+
+    output_buffer = BytesIO()
+    with metrics.stage("pdf_output") as timer:
+        pdf_output = pdf.output(dest='S').encode('latin1')
+        timer.add(nbytes=len(pdf_output))
+    output_buffer.write(pdf_output)
+    output_buffer.seek(0)
+
+    return output_buffer
+
+def render_report(student_name, responses, subject_scores, chart_backend=None, bank=None, progress=None, results=None):
+    # progress, if given, is called with each stage name as it starts;
+    # results, if given, is a dict given the report's scores and recommendations
+    progress = progress or (lambda stage: None)
+    bank = bank or default_bank()
+    chart_backend = chart_backend or DEFAULT_CHART_BACKEND
+    with metrics.report(bank=bank.version, chart_backend=chart_backend):
+        progress("scores")
+        with metrics.stage("scores"):
+            scores = calculate_scores(responses, bank)
+        progress("charts")
+        charts = generate_split_radar_charts(scores, backend=chart_backend, bank=bank)
+        with metrics.stage("recommendations"):
+            recommendations = build_recommendations(scores, subject_scores, bank)
+        if results is not None:
+            results.update(scores=scores, recommendations=recommendations)
+        progress("pdf")
+        return generate_pdf(student_name, scores, charts, recommendations).getvalue(), charts
+
+def build_report(student_name, responses, subject_scores, chart_backend=None, bank=None):
+    pdf_bytes, _ = render_report(student_name, responses, subject_scores, chart_backend=chart_backend, bank=bank)
+    return BytesIO(pdf_bytes)
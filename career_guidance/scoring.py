@@ -0,0 +1,195 @@
+import threading
+
+import numpy as np
+
+from .bank import default_bank
+
+
+def calculate_scores(responses, bank=None):
+    bank = bank or default_bank()
+    questions, weights = bank.questions, bank.weights
+    scores_by_dim = {}
+    for dim, q_ids in bank.dim_labels.items():
+        dim_scores = {}
+        for q_id in q_ids:
+            selected = responses.get(q_id)
+            if selected:
+                tags = questions[q_id]['options'].get(selected, [])
+                for tag in tags:
+                    dim_scores[tag] = dim_scores.get(tag, 0) + weights[dim]
+        scores_by_dim[dim] = dim_scores
+    return scores_by_dim
+
+
+class ScoringEngine:
+    """Batch scorer compiled once from a question bank.
+
+    Responses are an N x Q matrix of option indices (column order follows
+    ``dim_labels``, -1 for unanswered) and are scored with a single one-hot
+    product against a (question, option) -> trait incidence matrix.
+    """
+
+    def __init__(self, bank=None):
+        bank = bank or default_bank()
+        self.bank = bank
+        self.dim_labels = bank.dim_labels
+        self.q_ids = bank.q_ids
+        self.q_pos = bank.q_pos
+        self.options = bank.options
+        self.option_index = bank.option_index
+
+        # Trait columns per dimension, in order of first appearance in the bank
+        self.traits = bank.dim_traits
+        self.columns = bank.dim_columns
+        start = len(bank.column_trait_ids)
+
+        sizes = [len(opts) for opts in self.options]
+        self.offsets = np.cumsum([0] + sizes[:-1]).astype(np.int64)
+        self.unanswered = sum(sizes)
+        self.incidence = np.zeros((self.unanswered + 1, start), dtype=np.float32)
+        self.option_tags = []
+        max_hits = {dim: 0 for dim in self.dim_labels}
+        for dim, q_ids in self.dim_labels.items():
+            col0 = self.columns[dim].start
+            for q_id in q_ids:
+                pos = self.q_pos[q_id]
+                tag_cols = []
+                for i, local in enumerate(bank.option_traits[pos]):
+                    cols = [col0 + col for col in local]
+                    for col in cols:
+                        self.incidence[self.offsets[pos] + i, col] += 1
+                    tag_cols.append(cols)
+                self.option_tags.append(tag_cols)
+                max_hits[dim] += max((len(local) for local in bank.option_traits[pos]), default=0)
+
+        # Column of the n-th tag of every option, -1 past its last tag; the
+        # extra last entry serves unanswered (-1) codes
+        slots = max((len(cols) for tag_cols in self.option_tags for cols in tag_cols), default=0)
+        self.tag_slots = []
+        for tag_cols in self.option_tags:
+            table = np.full((slots, len(tag_cols) + 1), -1, dtype=np.int64)
+            for i, cols in enumerate(tag_cols):
+                table[:len(cols), i] = cols
+            self.tag_slots.append(table)
+
+        # calculate_scores accumulates weights[dim] one hit at a time, so the
+        # score for n hits is looked up from the same running sum to stay exact
+        self.score_tables = {}
+        for dim, hits in max_hits.items():
+            table = [0.0]
+            total = 0
+            for _ in range(hits):
+                total += bank.weights[dim]
+                table.append(total)
+            self.score_tables[dim] = np.array(table, dtype=np.float64)
+
+    def encode(self, responses):
+        row = np.full(len(self.q_ids), -1, dtype=np.int8)
+        for pos, q_id in enumerate(self.q_ids):
+            selected = responses.get(q_id)
+            if selected:
+                row[pos] = self.option_index[pos].get(selected, -1)
+        return row
+
+    def encode_batch(self, responses_list):
+        matrix = np.full((len(responses_list), len(self.q_ids)), -1, dtype=np.int8)
+        for i, responses in enumerate(responses_list):
+            matrix[i] = self.encode(responses)
+        return matrix
+
+    def count_batch(self, matrix):
+        matrix = np.asarray(matrix)
+        if matrix.ndim != 2 or matrix.shape[1] != len(self.q_ids):
+            raise ValueError(f"Expected an N x {len(self.q_ids)} response matrix, got shape {matrix.shape}")
+        flat = np.where(matrix >= 0, self.offsets + matrix, self.unanswered)
+        onehot = np.zeros((matrix.shape[0], self.unanswered + 1), dtype=np.float32)
+        onehot[np.arange(matrix.shape[0])[:, None], flat] = 1
+        return (onehot @ self.incidence).astype(np.int64)
+
+    def score_matrix(self, matrix):
+        # N x T scores in the bank's fixed column layout
+        counts = self.count_batch(matrix)
+        scores = np.empty(counts.shape, dtype=np.float64)
+        for dim, cols in self.columns.items():
+            scores[:, cols] = self.score_tables[dim][counts[:, cols]]
+        return scores
+
+    def dominant_batch(self, matrix, scores=None):
+        """Dominant trait per row and dimension, as a column within the dimension.
+
+        -1 where the dimension has no score. Ties go to the trait that comes
+        first in calculate_scores' dicts (the first one hit), as max() does.
+        """
+        matrix = np.asarray(matrix)
+        if scores is None:
+            scores = self.score_matrix(matrix)
+        never = np.iinfo(np.int64).max
+        rows = np.arange(matrix.shape[0])
+        first_hit = np.full(scores.shape, never, dtype=np.int64)
+        for pos in reversed(range(len(self.q_ids))):
+            table = self.tag_slots[pos]
+            for slot in reversed(range(len(table))):
+                cols = table[slot][matrix[:, pos]]
+                hit = cols >= 0
+                first_hit[rows[hit], cols[hit]] = pos * len(table) + slot
+        dominant = {}
+        for dim, cols in self.columns.items():
+            if cols.stop == cols.start:
+                dominant[dim] = np.full(len(rows), -1, dtype=np.int64)
+                continue
+            dim_scores = scores[:, cols]
+            top = dim_scores == dim_scores.max(axis=1, keepdims=True)
+            order = np.where(top, first_hit[:, cols], never)
+            best = order.argmin(axis=1)
+            best[order[rows, best] == never] = -1
+            dominant[dim] = best
+        return dominant
+
+    def score_batch(self, matrix):
+        scores = self.score_matrix(matrix)
+        return {dim: scores[:, cols] for dim, cols in self.columns.items()}
+
+    def to_dict(self, scores, codes=None):
+        # One score_matrix row in calculate_scores' form. Given the row's option
+        # codes, traits keep calculate_scores' first-hit order; without them
+        # they follow bank order and unscored traits are left out
+        values = np.asarray(scores, dtype=np.float64).tolist()
+        scores_by_dim = {}
+        for dim, q_ids in self.dim_labels.items():
+            col0 = self.columns[dim].start
+            traits = self.traits[dim]
+            dim_scores = {}
+            if codes is None:
+                for i, trait in enumerate(traits):
+                    if values[col0 + i]:
+                        dim_scores[trait] = values[col0 + i]
+            else:
+                for q_id in q_ids:
+                    pos = self.q_pos[q_id]
+                    if codes[pos] >= 0:
+                        for col in self.option_tags[pos][codes[pos]]:
+                            trait = traits[col - col0]
+                            if trait not in dim_scores:
+                                dim_scores[trait] = values[col]
+            scores_by_dim[dim] = dim_scores
+        return scores_by_dim
+
+    def score_dicts(self, matrix):
+        # Same shape and key order as calculate_scores, one dict per row
+        matrix = np.asarray(matrix)
+        scores = self.score_matrix(matrix)
+        return [self.to_dict(row, codes) for row, codes in zip(scores, matrix.tolist())]
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def scoring_engine(bank=None):
+    # One compiled engine per bank version and process
+    bank = bank or default_bank()
+    with _engines_lock:
+        engine = _engines.get(bank.version)
+        if engine is None:
+            engine = _engines[bank.version] = ScoringEngine(bank)
+        return engine
@@ -0,0 +1,421 @@
+"""HTTP API for scoring, recommendations and reports, without the Streamlit UI.
+
+    python -m career_guidance.service --port 8502 --workers 4
+
+Every call is a POST with a JSON body holding one student or a batch:
+
+    {"name": "Asha", "responses": {"1": "I observe quietly", ...}, "subject_scores": {"Math": 91}}
+    {"students": [{...}, {...}]}
+
+- ``/score``: calculate_scores output per student
+- ``/recommend``: recommend_domain, suggest_majors and the report's
+  ranked recommendations per student
+- ``/report``: the PDF; ``application/pdf`` for one student, base64 in JSON
+  for a batch
+- ``/export``: a ZIP of every student's PDF plus ``summary.csv``, sent
+  with chunked encoding as reports finish (see career_guidance.export).
+  Exports render in the same worker pool, one export at a time with at
+  most ``max_export_reports`` of its reports queued there, so ``/report``
+  calls are not stuck behind a whole cohort
+
+``GET /stats`` reports request counts and p50/p99 latency per endpoint.
+With metrics on (``--metrics``, or see ``career_guidance.metrics``),
+``GET /metrics`` gives per-stage report timings in the Prometheus text
+format, gathered from the worker processes, and each report is logged as
+a JSON line.
+Scoring runs on the event loop for small requests and in the worker pool
+for large batches; reports always render in worker processes, at most
+``max_reports`` at a time with ``max_pending`` more waiting, beyond which
+requests get 503 with Retry-After. Only the standard library is used for
+HTTP, so the service has no dependencies beyond the package's own.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import os
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import metrics
+from .bank import default_bank, load_bank
+from .charts import CHART_BACKENDS
+from .export import stream_cohort
+from .recommend import recommendation_index
+from .report import render_report
+from .scoring import scoring_engine
+
+logger = logging.getLogger(__name__)
+
+ENDPOINTS = ("score", "recommend", "report")
+MAX_BODY_BYTES = 16 * 1024 * 1024
+MAX_BATCH = 10000
+# Larger score/recommend batches leave the event loop for the worker pool
+INLINE_BATCH = 256
+# Latencies kept per endpoint for the percentiles
+LATENCY_WINDOW = 10000
+REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable",
+}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_students(body, bank):
+    """(students, batched) from a request body; students are (name, responses, subject_scores)."""
+    try:
+        payload = json.loads(body or b"{}")
+    except ValueError as e:
+        raise ApiError(400, f"Body is not valid JSON: {e}") from None
+    if not isinstance(payload, dict):
+        raise ApiError(400, "Body must be a JSON object")
+    batched = "students" in payload
+    records = payload["students"] if batched else [payload]
+    if not isinstance(records, list):
+        raise ApiError(400, "'students' must be a list")
+    if len(records) > MAX_BATCH:
+        raise ApiError(413, f"At most {MAX_BATCH} students per request")
+
+    students = []
+    for i, record in enumerate(records):
+        where = f"student {i}: " if batched else ""
+        if not isinstance(record, dict) or not isinstance(record.get("responses", {}), dict):
+            raise ApiError(400, f"{where}expected an object with a 'responses' object")
+        responses = {}
+        for key, answer in record.get("responses", {}).items():
+            # isdigit() also passes digits such as "²" that int() rejects
+            q_id = int(key) if key.isascii() and key.isdecimal() else None
+            if q_id not in bank.q_pos:
+                raise ApiError(400, f"{where}unknown question {key!r}")
+            if not isinstance(answer, str) or answer not in bank.option_index[bank.q_pos[q_id]]:
+                raise ApiError(400, f"{where}{answer!r} is not an option of question {q_id}")
+            responses[q_id] = answer
+        try:
+            subject_scores = {subj: float(score) for subj, score in record.get("subject_scores", {}).items()}
+        except (AttributeError, TypeError, ValueError):
+            raise ApiError(400, f"{where}'subject_scores' must map subjects to numbers") from None
+        students.append((str(record.get("name") or "Student"), responses, subject_scores))
+    return students, batched
+
+
+def score_students(bank_version, students):
+    # calculate_scores' output for every student, from one batch scoring pass
+    engine = scoring_engine(load_bank(bank_version))
+    return engine.score_dicts(engine.encode_batch([responses for _, responses, _ in students]))
+
+
+def recommend_students(bank_version, students):
+    # recommend_domain, suggest_majors and build_recommendations for every
+    # student, from one scoring pass and one ranking pass over the batch
+    index = recommendation_index(load_bank(bank_version))
+    matrix = index.engine.encode_batch([responses for _, responses, _ in students])
+    scores = index.engine.score_matrix(matrix)
+    masks = index.strength_masks(index.subject_matrix([subject_scores for _, _, subject_scores in students])).tolist()
+    return [
+        {"domain": domain, "suggested_majors": list(index.majors(mask)), "recommendations": recommendations}
+        for domain, mask, recommendations in zip(
+            index.recommend_domain_batch(matrix, scores), masks, index.recommend_rows(scores, masks)
+        )
+    ]
+
+
+def render_pdf(bank_version, chart_backend, student):
+    # The worker's metric totals since its last report travel back with the PDF
+    name, responses, subject_scores = student
+    pdf_bytes, _ = render_report(name, responses, subject_scores, chart_backend=chart_backend, bank=load_bank(bank_version))
+    return pdf_bytes, metrics.registry.take() if metrics.enabled else None
+
+
+def _init_worker(metrics_on=False):
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    if metrics_on:
+        metrics.enable()
+
+
+class LatencyStats:
+    def __init__(self, window=LATENCY_WINDOW):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.errors = 0
+
+    def add(self, seconds, ok):
+        self.samples.append(seconds)
+        self.count += 1
+        self.errors += not ok
+
+    def summary(self):
+        summary = {"requests": self.count, "errors": self.errors}
+        if self.samples:
+            p50, p99 = np.percentile(np.fromiter(self.samples, dtype=np.float64), [50, 99])
+            summary.update(p50_ms=round(p50 * 1000, 2), p99_ms=round(p99 * 1000, 2))
+        return summary
+
+
+class AssessmentService:
+    """Request handling, worker pool and limits; ``serve`` adds the HTTP front end."""
+
+    def __init__(self, workers=None, max_reports=None, max_pending=64, chart_backend="vector", bank_version=None,
+                 max_export_reports=None):
+        if chart_backend not in CHART_BACKENDS:
+            raise ValueError(f"Unknown chart backend {chart_backend!r}; expected one of {sorted(CHART_BACKENDS)}")
+        self.workers = workers or os.cpu_count() or 1
+        self.max_reports = max_reports or self.workers
+        self.max_pending = max_pending
+        self.max_export_reports = max_export_reports or max(1, self.workers // 2)
+        self.chart_backend = chart_backend
+        self.bank = load_bank(bank_version) if bank_version else default_bank()
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(metrics.enabled,))
+        self.report_slots = None
+        # Reports accepted and not finished, and those of them rendering
+        self.reports_queued = 0
+        self.reports_running = 0
+        self.latency = {endpoint: LatencyStats() for endpoint in ENDPOINTS}
+        self.exporting = False
+        self.started = time.time()
+
+    async def _in_pool(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+
+    async def score(self, students):
+        if len(students) <= INLINE_BATCH:
+            return score_students(self.bank.version, students)
+        return await self._in_pool(score_students, self.bank.version, students)
+
+    async def recommend(self, students):
+        if len(students) <= INLINE_BATCH:
+            return recommend_students(self.bank.version, students)
+        return await self._in_pool(recommend_students, self.bank.version, students)
+
+    async def report(self, students):
+        if self.report_slots is None:
+            self.report_slots = asyncio.Semaphore(self.max_reports)
+        if len(students) > self.max_reports + self.max_pending:
+            raise ApiError(413, f"At most {self.max_reports + self.max_pending} reports per request")
+        # Every report of a batch counts against the limit
+        if self.reports_queued + len(students) > self.max_reports + self.max_pending:
+            raise ApiError(503, f"{self.reports_queued} reports are already queued or rendering")
+        self.reports_queued += len(students)
+        try:
+            return await asyncio.gather(*(self._render(student) for student in students))
+        finally:
+            self.reports_queued -= len(students)
+
+    async def _render(self, student):
+        async with self.report_slots:
+            self.reports_running += 1
+            try:
+                pdf_bytes, worker_metrics = await self._in_pool(render_pdf, self.bank.version, self.chart_backend, student)
+                if worker_metrics is not None:
+                    metrics.registry.merge(worker_metrics)
+                return pdf_bytes
+            finally:
+                self.reports_running -= 1
+
+    def stats(self):
+        return {
+            "bank": self.bank.version,
+            "uptime_s": round(time.time() - self.started, 1),
+            "workers": self.workers,
+            "reports_running": self.reports_running,
+            "reports_waiting": self.reports_queued - self.reports_running,
+            "endpoints": {endpoint: stats.summary() for endpoint, stats in self.latency.items()},
+        }
+
+    async def handle(self, method, path, body):
+        """(status, content type, body bytes) for one request."""
+        endpoint = path.split("?", 1)[0].strip("/")
+        if endpoint == "metrics":
+            if method != "GET":
+                raise ApiError(405, "Use GET")
+            if not metrics.enabled:
+                raise ApiError(404, "Metrics are off; start the service with --metrics")
+            return 200, "text/plain; version=0.0.4", metrics.registry.prometheus().encode("utf-8")
+        if endpoint in ("stats", "healthz"):
+            if method != "GET":
+                raise ApiError(405, "Use GET")
+            return 200, "application/json", _json(self.stats() if endpoint == "stats" else {"ok": True})
+        if endpoint not in ENDPOINTS and endpoint != "export":
+            raise ApiError(404, f"No endpoint /{endpoint}; expected one of {['/' + e for e in ENDPOINTS + ('export',)]}")
+        if method != "POST":
+            raise ApiError(405, "Use POST with a JSON body")
+        if endpoint == "export":
+            students, _ = parse_students(body, self.bank)
+            if self.exporting:
+                raise ApiError(503, "Another export is running")
+            self.exporting = True
+            # Sent by _connection chunk by chunk; not counted in the latency stats
+            chunks = stream_cohort(
+                students, bank=self.bank, workers=self.max_export_reports, window=1, chart_backend=self.chart_backend,
+                executor=self.pool,
+            )
+            return 200, "application/zip", chunks
+
+        start = time.perf_counter()
+        ok = False
+        try:
+            students, batched = parse_students(body, self.bank)
+            results = await getattr(self, endpoint)(students)
+            ok = True
+        finally:
+            self.latency[endpoint].add(time.perf_counter() - start, ok)
+        if endpoint == "report":
+            if not batched:
+                return 200, "application/pdf", results[0]
+            results = [
+                {"name": name, "pdf": base64.b64encode(pdf).decode("ascii")} for (name, _, _), pdf in zip(students, results)
+            ]
+        return 200, "application/json", _json({"results": results} if batched else results[0])
+
+    async def _connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request_line = await reader.readline()
+                    if not request_line:
+                        break
+                    method, target, version = request_line.decode("latin-1").split()
+                    headers = {}
+                    while True:
+                        line = await reader.readline()
+                        if line in (b"\r\n", b"\n", b""):
+                            break
+                        key, _, value = line.decode("latin-1").partition(":")
+                        headers[key.strip().lower()] = value.strip()
+                    length = headers.get("content-length") or "0"
+                    # int() would also take "-1", "+1", " 1" and "1_0"
+                    if not (length.isascii() and length.isdecimal()):
+                        raise ValueError(f"bad Content-Length {length!r}")
+                    length = int(length)
+                except ValueError:
+                    await self._respond(writer, 400, "application/json", _json({"error": "Malformed request"}), False)
+                    break
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, "application/json", _json({"error": "Body too large"}), False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                try:
+                    status, content_type, payload = await self.handle(method, target, body)
+                except ApiError as e:
+                    status, content_type, payload = e.status, "application/json", _json({"error": str(e)})
+                except Exception:
+                    # Details stay in the server log; they can leak internals to clients
+                    logger.exception("%s %s failed", method, target)
+                    status, content_type, payload = 500, "application/json", _json({"error": "Internal server error"})
+                if isinstance(payload, bytes):
+                    await self._respond(writer, status, content_type, payload, keep_alive, retry=status == 503)
+                else:
+                    await self._stream(writer, content_type, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, content_type, payload, keep_alive, retry=False):
+        head = [
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(payload)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if retry:
+            head.append("Retry-After: 1")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload)
+        await writer.drain()
+
+    async def _stream(self, writer, content_type, chunks, keep_alive):
+        # The export generator blocks on the worker pool, so it advances in a
+        # thread; closing it early (a dropped connection) cancels the rest
+        loop = asyncio.get_running_loop()
+        try:
+            head = [
+                "HTTP/1.1 200 OK",
+                f"Content-Type: {content_type}",
+                "Content-Disposition: attachment; filename=cohort.zip",
+                "Transfer-Encoding: chunked",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}",
+            ]
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+            while True:
+                chunk = await loop.run_in_executor(None, next, chunks, None)
+                if chunk is None:
+                    break
+                if chunk:
+                    writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                    await writer.drain()
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        finally:
+            await loop.run_in_executor(None, chunks.close)
+            self.exporting = False
+
+    async def serve(self, host="127.0.0.1", port=8502, ready=None):
+        # Runs until SIGINT or SIGTERM
+        server = await asyncio.start_server(self._connection, host, port)
+        if ready is not None:
+            ready(server)
+        stopping = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stopping.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+        async with server:
+            await stopping.wait()
+
+    def close(self):
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _json(data):
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve scoring, recommendations and reports over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--max-reports", type=int, default=None, help="reports rendering at once (default: workers)")
+    parser.add_argument("--max-pending", type=int, default=64, help="reports allowed to wait for a worker")
+    parser.add_argument("--chart-backend", choices=sorted(CHART_BACKENDS), default="vector", help="radar chart renderer")
+    parser.add_argument("--max-export-reports", type=int, default=None,
+                        help="an export's reports in the worker pool at once (default: half the workers)")
+    parser.add_argument("--bank", default=None, help="question bank version (default: the default bank)")
+    parser.add_argument("--metrics", action="store_true", help="time report stages, log each report and serve GET /metrics")
+    args = parser.parse_args(argv)
+
+    if args.metrics:
+        metrics.enable()
+
+    service = AssessmentService(
+        args.workers, args.max_reports, args.max_pending, args.chart_backend, args.bank, args.max_export_reports
+    )
+    print(f"Serving on http://{args.host}:{args.port} with {service.workers} workers", file=sys.stderr)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(service.stats()["endpoints"]), file=sys.stderr)
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+"""Assessment progress kept outside the Streamlit process.
+
+A session is a random token, the question bank version it started with,
+the page the student is on and their answers as option codes by question
+position (see compact.PackedResponses). Progress is saved as it changes,
+one row per changed answer, so a student can reopen the app with the token
+on any server process and carry on where they left off:
+
+    sessions = open_sessions("sqlite:sessions.sqlite3")
+    token = sessions.create(bank.version)
+    sessions.write(token, answers=[(0, 2), (1, 0)], page=1)
+    sessions.get(token).answers     # {0: 2, 1: 0}
+
+``memory`` keeps sessions in this process only, enough for one server;
+``sqlite:<path>`` shares them between every process that can open the
+file. Sessions untouched for ``max_age`` seconds are dropped.
+
+``start_session``, ``resume_session`` and ``save_session`` connect a
+backend to st.session_state (or any mapping with the same keys).
+"""
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+from .bank import BankError, load_bank
+from .compact import UNANSWERED, PackedResponses
+
+DEFAULT_SESSIONS = os.environ.get("CAREER_GUIDANCE_SESSIONS", "memory")
+SESSION_MAX_AGE = 14 * 24 * 3600
+# Expired sessions are purged once every this many new sessions
+PURGE_EVERY = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    token TEXT PRIMARY KEY,
+    bank_version TEXT NOT NULL,
+    page INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at);
+-- One row per answered question, replaced when the answer changes
+CREATE TABLE IF NOT EXISTS session_answers (
+    token TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    code INTEGER NOT NULL,
+    PRIMARY KEY (token, position)
+) WITHOUT ROWID;
+"""
+
+
+class SessionRecord:
+    __slots__ = ("token", "bank_version", "page", "answers", "updated_at")
+
+    def __init__(self, token, bank_version, page, answers, updated_at):
+        self.token = token
+        self.bank_version = bank_version
+        self.page = page
+        self.answers = answers
+        self.updated_at = updated_at
+
+    def __repr__(self):
+        return f"SessionRecord(token={self.token!r}, bank_version={self.bank_version!r}, page={self.page}, answered={len(self.answers)})"
+
+
+def new_token():
+    return secrets.token_urlsafe(16)
+
+
+class MemorySessions:
+    """Sessions in a dict, for a single server process."""
+
+    def __init__(self, max_age=SESSION_MAX_AGE):
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.sessions = {}
+        self._created = 0
+
+    def create(self, bank_version):
+        token = new_token()
+        with self.lock:
+            self.sessions[token] = SessionRecord(token, bank_version, 0, {}, time.time())
+            self._created += 1
+            if self._created % PURGE_EVERY == 0:
+                self._purge()
+        return token
+
+    def _purge(self):
+        cutoff = time.time() - self.max_age
+        for token in [token for token, record in self.sessions.items() if record.updated_at < cutoff]:
+            del self.sessions[token]
+
+    def get(self, token):
+        with self.lock:
+            record = self.sessions.get(token)
+            if record is None or record.updated_at < time.time() - self.max_age:
+                return None
+            return SessionRecord(record.token, record.bank_version, record.page, dict(record.answers), record.updated_at)
+
+    def write(self, token, answers=(), page=None):
+        """Apply (position, code) changes and the page; False if the session is gone."""
+        with self.lock:
+            record = self.sessions.get(token)
+            if record is None:
+                return False
+            for pos, code in answers:
+                if code == UNANSWERED:
+                    record.answers.pop(pos, None)
+                else:
+                    record.answers[pos] = code
+            if page is not None:
+                record.page = page
+            record.updated_at = time.time()
+        return True
+
+    def delete(self, token):
+        with self.lock:
+            self.sessions.pop(token, None)
+
+    def close(self):
+        pass
+
+
+class SQLiteSessions:
+    """Sessions in an SQLite file shared by every server process on the host.
+
+    Every ``write`` commits straight away: it is one small transaction, and
+    a student's answers must survive the process that received them.
+    """
+
+    def __init__(self, path, max_age=SESSION_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        self._created = 0
+
+    def create(self, bank_version):
+        token = new_token()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO sessions (token, bank_version, page, updated_at) VALUES (?, ?, 0, ?)",
+                (token, bank_version, time.time()),
+            )
+            self._created += 1
+            if self._created % PURGE_EVERY == 0:
+                self._purge()
+        return token
+
+    def _purge(self):
+        cutoff = time.time() - self.max_age
+        self.conn.execute(
+            "DELETE FROM session_answers WHERE token IN (SELECT token FROM sessions WHERE updated_at < ?)", (cutoff,)
+        )
+        self.conn.execute("DELETE FROM sessions WHERE updated_at < ?", (cutoff,))
+
+    def get(self, token):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT bank_version, page, updated_at FROM sessions WHERE token = ? AND updated_at >= ?",
+                (token, time.time() - self.max_age),
+            ).fetchone()
+            if row is None:
+                return None
+            answers = dict(self.conn.execute("SELECT position, code FROM session_answers WHERE token = ?", (token,)))
+        bank_version, page, updated_at = row
+        return SessionRecord(token, bank_version, page, answers, updated_at)
+
+    def write(self, token, answers=(), page=None):
+        """Apply (position, code) changes and the page; False if the session is gone."""
+        answers = list(answers)
+        with self.lock, self.conn:
+            updated = self.conn.execute(
+                "UPDATE sessions SET page = coalesce(?, page), updated_at = ? WHERE token = ?", (page, time.time(), token)
+            ).rowcount
+            if not updated:
+                return False
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO session_answers (token, position, code) VALUES (?, ?, ?)",
+                [(token, pos, code) for pos, code in answers if code != UNANSWERED],
+            )
+            self.conn.executemany(
+                "DELETE FROM session_answers WHERE token = ? AND position = ?",
+                [(token, pos) for pos, code in answers if code == UNANSWERED],
+            )
+        return True
+
+    def delete(self, token):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM session_answers WHERE token = ?", (token,))
+            self.conn.execute("DELETE FROM sessions WHERE token = ?", (token,))
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def open_sessions(spec=None):
+    """A session backend from ``memory`` or ``sqlite:<path>`` (default: CAREER_GUIDANCE_SESSIONS)."""
+    spec = spec or DEFAULT_SESSIONS
+    if spec == "memory":
+        return MemorySessions()
+    if spec.startswith("sqlite:"):
+        path = spec[len("sqlite:"):]
+        if path.startswith("//"):
+            path = path[2:]
+        return SQLiteSessions(path)
+    raise ValueError(f"Unknown session backend {spec!r}; expected 'memory' or 'sqlite:<path>'")
+
+
+def _signed(code):
+    return code - 256 if code > 127 else code
+
+
+def start_session(state, sessions, bank):
+    """Open a new session for ``state``'s current answers and page."""
+    state["session_token"] = sessions.create(bank.version)
+    state["session_saved"] = (bytes([UNANSWERED & 0xFF]) * len(bank.q_ids), 0)
+    save_session(state, sessions)
+    return state["session_token"]
+
+
+def resume_session(state, sessions, token):
+    """Load the session ``token`` into ``state``; False if it is unknown, expired or its bank is gone.
+
+    A session navigation.reset abandoned is deleted and never resumed.
+    """
+    abandoned = state.pop("session_abandoned", None)
+    if abandoned is not None:
+        sessions.delete(abandoned)
+        if token == abandoned:
+            return False
+    record = sessions.get(token) if token else None
+    if record is None:
+        return False
+    try:
+        bank = load_bank(record.bank_version)
+    except BankError:
+        return False
+    codes = bytearray([UNANSWERED & 0xFF]) * len(bank.q_ids)
+    for pos, code in record.answers.items():
+        if 0 <= pos < len(codes) and 0 <= code < len(bank.options[pos]):
+            codes[pos] = code
+    state["bank_version"] = bank.version
+    state["responses"] = PackedResponses(bank=bank, codes=codes)
+    state["page"] = record.page
+    state["session_token"] = token
+    state["session_saved"] = (bytes(codes), record.page)
+    return True
+
+
+def save_session(state, sessions):
+    """Write the answers and page changed since the last save; returns the number of answers written."""
+    token = state.get("session_token")
+    responses = state.get("responses")
+    if token is None or responses is None:
+        return 0
+    codes, page = responses.to_bytes(), state["page"]
+    saved_codes, saved_page = state.get("session_saved", (b"", None))
+    if len(saved_codes) == len(codes):
+        changes = [(pos, _signed(code)) for pos, (old, code) in enumerate(zip(saved_codes, codes)) if old != code]
+    else:
+        changes = [(pos, _signed(code)) for pos, code in enumerate(codes)]
+    if changes or page != saved_page:
+        if not sessions.write(token, changes, page):
+            # Expired or deleted elsewhere: carry on in a new session
+            state["session_token"] = sessions.create(responses.bank.version)
+            changes = [(pos, _signed(code)) for pos, code in enumerate(codes) if _signed(code) != UNANSWERED]
+            sessions.write(state["session_token"], changes, page)
+    state["session_saved"] = (codes, page)
+    return len(changes)
@@ -0,0 +1,349 @@
+"""SQLite store of completed assessments.
+
+Each result keeps the packed answers (one byte per question), the packed
+score row and the subject marks, plus one row per dimension in
+``dominant`` holding the student's dominant trait. Lookups by cohort,
+school, date or dominant trait are all served from indexes, e.g.::
+
+    store = ResultsStore("results.sqlite3")
+    store.count(dominant={"Interest": "STEM"})
+    for result in store.query(school="Greenfield High", dominant={"Interest": "STEM"}):
+        ...
+
+Writes are buffered and committed in batches; ``flush()`` forces one.
+"""
+import atexit
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from .bank import default_bank, load_bank
+from .compact import PackedResponses, pack_responses, pack_scores, unpack_scores
+from .scoring import calculate_scores, scoring_engine
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    cohort TEXT,
+    school TEXT,
+    student_name TEXT,
+    bank_version TEXT NOT NULL,
+    answers BLOB NOT NULL,
+    scores BLOB NOT NULL,
+    subject_scores TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_school_cohort ON results (school, cohort, created_at);
+CREATE INDEX IF NOT EXISTS results_cohort ON results (cohort, created_at);
+CREATE INDEX IF NOT EXISTS results_created_at ON results (created_at);
+-- The cohort, school and date are repeated here, so filtered counts by
+-- dominant trait are answered from this table's indexes alone
+CREATE TABLE IF NOT EXISTS dominant (
+    dimension TEXT NOT NULL,
+    trait TEXT NOT NULL,
+    result_id INTEGER NOT NULL REFERENCES results (id),
+    created_at REAL NOT NULL,
+    cohort TEXT,
+    school TEXT,
+    PRIMARY KEY (dimension, trait, result_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS dominant_school_cohort ON dominant (dimension, trait, school, cohort, created_at);
+CREATE INDEX IF NOT EXISTS dominant_cohort ON dominant (dimension, trait, cohort, created_at);
+CREATE INDEX IF NOT EXISTS dominant_created_at ON dominant (dimension, trait, created_at);
+"""
+
+COLUMNS = "r.id, r.created_at, r.cohort, r.school, r.student_name, r.bank_version, r.answers, r.scores, r.subject_scores"
+
+
+def dominant_traits(scores_by_dim):
+    # Same choice as the report summary: the first trait with the top score
+    return {dim: max(scores, key=scores.get) for dim, scores in scores_by_dim.items() if scores}
+
+
+def _timestamp(value):
+    if value is None or isinstance(value, (int, float)):
+        return value
+    return value.timestamp()
+
+
+class StoredResult:
+    __slots__ = ("id", "created_at", "cohort", "school", "student_name", "bank_version", "answers", "scores", "subject_scores")
+
+    def __init__(self, row):
+        (self.id, self.created_at, self.cohort, self.school, self.student_name,
+         self.bank_version, self.answers, self.scores, subject_scores) = row
+        self.subject_scores = json.loads(subject_scores)
+
+    @property
+    def bank(self):
+        return load_bank(self.bank_version)
+
+    @property
+    def responses(self):
+        return PackedResponses.from_bytes(self.answers, self.bank)
+
+    @property
+    def score_row(self):
+        return np.frombuffer(self.scores, dtype=np.float64)
+
+    @property
+    def scores_by_dim(self):
+        return unpack_scores(self.score_row, self.bank, codes=self.answers)
+
+    @property
+    def created(self):
+        return datetime.fromtimestamp(self.created_at)
+
+    def __repr__(self):
+        return f"StoredResult(id={self.id}, student_name={self.student_name!r}, created={self.created:%Y-%m-%d %H:%M})"
+
+
+class ResultsStore:
+    """Batched writer and indexed reader for completed assessments.
+
+    ``add`` buffers a result; the buffer is committed in one transaction once
+    it holds ``batch_size`` results, or by a background thread every
+    ``flush_interval`` seconds, so a burst of submissions costs one commit.
+    """
+
+    def __init__(self, path, batch_size=500, flush_interval=2.0):
+        # query and iter_chunks read through connections of their own, which
+        # would each open a different, empty in-memory database
+        if path in ("", ":memory:") or "mode=memory" in str(path):
+            raise ValueError("ResultsStore needs a database file, not an in-memory database")
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.RLock()
+        self.buffer = []
+        self._closed = threading.Event()
+        self._flusher = None
+        if flush_interval:
+            self._flusher = threading.Thread(target=self._flush_periodically, name="results-flush", daemon=True)
+            self._flusher.start()
+        atexit.register(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error:
+                # The batch stays buffered and is retried on the next tick
+                pass
+
+    def add(self, responses, subject_scores=None, student_name=None, cohort=None, school=None,
+            created_at=None, scores_by_dim=None, bank=None):
+        bank = bank or getattr(responses, "bank", None) or default_bank()
+        if scores_by_dim is None:
+            scores_by_dim = calculate_scores(responses, bank)
+        record = (
+            _timestamp(created_at) or time.time(),
+            cohort,
+            school,
+            student_name,
+            bank.version,
+            pack_responses(responses, bank),
+            pack_scores(scores_by_dim, bank).tobytes(),
+            json.dumps(subject_scores or {}, sort_keys=True),
+            dominant_traits(scores_by_dim),
+        )
+        with self.lock:
+            self.buffer.append(record)
+            if len(self.buffer) >= self.batch_size:
+                self.flush()
+
+    def add_many(self, answers, subject_scores=None, student_names=None, cohort=None, school=None,
+                 created_at=None, scores=None, bank=None):
+        """Buffer a batch already in matrix form.
+
+        ``answers`` is an N x Q option-code matrix and ``scores`` its N x T
+        score matrix (scored here if omitted); dominant traits come from
+        ScoringEngine.dominant_batch. ``cohort``, ``school`` and
+        ``created_at`` apply to the whole batch.
+        """
+        bank = bank or default_bank()
+        engine = scoring_engine(bank)
+        answers = np.ascontiguousarray(answers, dtype=np.int8)
+        if scores is None:
+            scores = engine.score_matrix(answers)
+        scores = np.ascontiguousarray(scores, dtype=np.float64)
+        dominant = engine.dominant_batch(answers, scores)
+        traits = {dim: np.array(engine.traits[dim] + (None,), dtype=object)[best] for dim, best in dominant.items()}
+        created_at = _timestamp(created_at) or time.time()
+        count = len(answers)
+        subject_scores = subject_scores or [{}] * count
+        student_names = student_names or [None] * count
+        records = [
+            (
+                created_at, cohort, school, student_names[i], bank.version,
+                answers[i].tobytes(), scores[i].tobytes(), json.dumps(subject_scores[i], sort_keys=True),
+                {dim: names[i] for dim, names in traits.items() if names[i] is not None},
+            )
+            for i in range(count)
+        ]
+        with self.lock:
+            self.buffer.extend(records)
+            if len(self.buffer) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        with self.lock:
+            if not self.buffer:
+                return 0
+            batch, self.buffer = self.buffer, []
+            try:
+                self._insert(batch)
+            except sqlite3.Error:
+                # Keep the results for the next attempt
+                self.buffer[:0] = batch
+                raise
+            return len(batch)
+
+    def _insert(self, batch):
+        with self.conn:
+            cursor = self.conn.cursor()
+            # Take the write lock first, so the IDs stay free when other processes share the file
+            cursor.execute("BEGIN IMMEDIATE")
+            (first_id,) = cursor.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM results").fetchone()
+            ids = range(first_id, first_id + len(batch))
+            cursor.executemany(
+                "INSERT INTO results (id, created_at, cohort, school, student_name, bank_version, answers, scores, subject_scores)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(result_id,) + record[:-1] for result_id, record in zip(ids, batch)],
+            )
+            cursor.executemany(
+                "INSERT INTO dominant (dimension, trait, result_id, created_at, cohort, school) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (dim, trait, result_id) + record[:3]
+                    for result_id, record in zip(ids, batch)
+                    for dim, trait in record[-1].items()
+                ],
+            )
+
+    def close(self):
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self.flush()
+        with self.lock:
+            self.conn.close()
+        atexit.unregister(self.close)
+
+    def _from(self, cohort=None, school=None, since=None, until=None, dominant=None):
+        # With a dominant-trait filter the first dominant table drives the
+        # query and carries the other filters; results is only joined for rows
+        base = "d0" if dominant else "r"
+        tables = ["dominant d0" if dominant else "results r"]
+        clauses, params = [], []
+        for i, (dim, trait) in enumerate((dominant or {}).items()):
+            if i:
+                tables.append(f"JOIN dominant d{i} ON d{i}.result_id = d0.result_id")
+            clauses.append(f"d{i}.dimension = ? AND d{i}.trait = ?")
+            params += [dim, trait]
+        for column, value in (("cohort", cohort), ("school", school)):
+            if value is not None:
+                clauses.append(f"{base}.{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append(f"{base}.created_at >= ?")
+            params.append(_timestamp(since))
+        if until is not None:
+            clauses.append(f"{base}.created_at < ?")
+            params.append(_timestamp(until))
+        sql = " ".join(tables) + (" WHERE " + " AND ".join(clauses) if clauses else "")
+        return base, sql, params
+
+    def count(self, **filters):
+        # Filters: cohort, school, since, until, dominant={dimension: trait}
+        self.flush()
+        _, source, params = self._from(**filters)
+        with self.lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM {source}", params).fetchone()[0]
+
+    def query(self, limit=None, chunk_size=1000, **filters):
+        """Matching results in insertion order, fetched ``chunk_size`` rows at a time."""
+        self.flush()
+        base, source, params = self._from(**filters)
+        order = "r.id"
+        if base != "r":
+            source = source.replace("dominant d0", "dominant d0 JOIN results r ON r.id = d0.result_id", 1)
+            # Same order, but read straight off the dominant primary key
+            order = "d0.result_id"
+        sql = f"SELECT {COLUMNS} FROM {source} ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        # A separate connection, so a long read does not hold the writer's lock
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield StoredResult(row)
+        finally:
+            conn.close()
+
+    def iter_chunks(self, bank_version, after_id=0, chunk_size=10000, **filters):
+        """Matching results of one bank version with ID above ``after_id``, as column chunks.
+
+        Each chunk is a dict of arrays: ``id``, ``created_at``, ``cohort``,
+        ``school``, ``bank_version``, ``answers`` (N x Q option codes),
+        ``scores`` (N x T, packed layout) and ``subject_scores`` (dicts).
+        Chunks are read by key, so memory stays at one chunk however many
+        rows match.
+        """
+        self.flush()
+        base, source, params = self._from(**filters)
+        id_column = "r.id"
+        if base != "r":
+            source = source.replace("dominant d0", "dominant d0 JOIN results r ON r.id = d0.result_id", 1)
+            id_column = "d0.result_id"
+        where = " AND " if " WHERE " in source else " WHERE "
+        # Answers and scores of one bank share a layout, so they stack into matrices
+        sql = (
+            "SELECT r.id, r.created_at, r.cohort, r.school, r.bank_version, r.answers, r.scores, r.subject_scores"
+            f" FROM {source}{where}r.bank_version = ? AND {id_column} > ? ORDER BY {id_column} LIMIT ?"
+        )
+        conn = sqlite3.connect(self.path)
+        try:
+            while True:
+                rows = conn.execute(sql, params + [bank_version, after_id, chunk_size]).fetchall()
+                if not rows:
+                    break
+                ids, created_at, cohort, school, versions, answers, scores, subject_scores = zip(*rows)
+                yield {
+                    "id": np.array(ids, dtype=np.int64),
+                    "created_at": np.array(created_at, dtype=np.float64),
+                    "cohort": np.array(cohort, dtype=object),
+                    "school": np.array(school, dtype=object),
+                    "bank_version": np.array(versions, dtype=object),
+                    "answers": np.frombuffer(b"".join(answers), dtype=np.int8).reshape(len(rows), -1),
+                    "scores": np.frombuffer(b"".join(scores), dtype=np.float64).reshape(len(rows), -1),
+                    "subject_scores": [json.loads(marks) for marks in subject_scores],
+                }
+                after_id = ids[-1]
+        finally:
+            conn.close()
+
+    def get(self, result_id):
+        self.flush()
+        with self.lock:
+            row = self.conn.execute(f"SELECT {COLUMNS} FROM results r WHERE r.id = ?", (result_id,)).fetchone()
+        return StoredResult(row) if row else None
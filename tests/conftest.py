@@ -0,0 +1,32 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+import pytest
+
+from career_guidance import default_bank
+
+
+@pytest.fixture
+def bank():
+    return default_bank()
+
+
+@pytest.fixture
+def students(bank):
+    """(name, responses, subject_scores) for synthetic students, some with unanswered questions."""
+    def make(count, seed=0, answered=1.0):
+        rng = random.Random(seed)
+        result = []
+        for i in range(count):
+            responses = {
+                q_id: rng.choice(bank.options[pos])
+                for pos, q_id in enumerate(bank.q_ids) if rng.random() < answered
+            }
+            subject_scores = {subj: rng.randint(40, 100) for subj in bank.subjects}
+            result.append((f"Student {i}", responses, subject_scores))
+        return result
+    return make
@@ -0,0 +1,127 @@
+from collections import Counter, defaultdict
+
+import pandas as pd
+import pytest
+
+from career_guidance import ResultsStore, calculate_scores, get_subject_analysis, scoring_engine
+from career_guidance.analytics import ALL, UNKNOWN, CohortAnalytics
+from career_guidance.recommend import INTEREST_DOMAINS
+from career_guidance.store import dominant_traits
+
+SCHOOLS = ("North", "South", None)
+
+
+def test_dominant_batch_matches_max(bank, students):
+    engine = scoring_engine(bank)
+    batch = students(500, seed=3) + students(200, seed=4, answered=0.3)
+    matrix = engine.encode_batch([responses for _, responses, _ in batch])
+    dominant = engine.dominant_batch(matrix)
+    for row, (_, responses, _) in enumerate(batch):
+        expected = dominant_traits(calculate_scores(responses, bank))
+        got = {
+            dim: engine.traits[dim][cols[row]] for dim, cols in dominant.items() if cols[row] >= 0
+        }
+        assert got == expected
+
+
+@pytest.fixture
+def cohort(students):
+    # Some students answer little or nothing, so some dimensions have no dominant trait
+    return students(40, seed=21) + students(30, seed=22, answered=0.2) + [("Nobody", {}, {"Math": 90})]
+
+
+@pytest.fixture
+def store(tmp_path, bank, cohort):
+    store = ResultsStore(str(tmp_path / "results.sqlite3"), flush_interval=0)
+    for i, (name, responses, subject_scores) in enumerate(cohort):
+        store.add(responses, subject_scores, name, school=SCHOOLS[i % 3], cohort=f"10{'AB'[i % 2]}", bank=bank)
+    store.flush()
+    yield store
+    store.close()
+
+
+def _expected(bank, cohort, group_of):
+    """The three aggregates computed student by student with the per-student helpers."""
+    students = Counter()
+    dominant = Counter()
+    domains = Counter()
+    subjects = defaultdict(Counter)
+    for i, (_, responses, subject_scores) in enumerate(cohort):
+        group = group_of(i)
+        scores = calculate_scores(responses, bank)
+        students[group] += 1
+        for dim, trait in dominant_traits(scores).items():
+            dominant[group, dim, trait] += 1
+        interests = scores.get("Interest", {})
+        top_interest = max(interests, key=interests.get) if interests else None
+        domains[group, INTEREST_DOMAINS.get(top_interest, "General")] += 1
+        strengths, _ = get_subject_analysis(subject_scores)
+        for subject in strengths:
+            subjects[group, subject]["students"] += 1
+            subjects[group, subject].update(interests)
+    return students, dominant, domains, subjects
+
+
+def _check(analytics, expected):
+    students, dominant, domains, subjects = expected
+    assert analytics.students.to_dict() == dict(students)
+
+    table = analytics.dominant_traits()
+    assert {(row.group, row.dimension, row.trait): row.students for row in table.itertuples()} == dict(dominant)
+    for row in table.itertuples():
+        assert row.share == pytest.approx(row.students / students[row.group])
+
+    mix = analytics.domain_mix()
+    assert {(group, domain): count for (group, domain), count in mix.stack().items() if count} == dict(domains)
+
+    table = analytics.subject_interest()
+    assert set(table.index) == set(subjects)
+    for key, sums in subjects.items():
+        row = table.loc[key]
+        assert row["students"] == sums["students"]
+        for trait in table.columns.drop("students"):
+            assert row[trait] == pytest.approx(sums[trait] / sums["students"])
+
+
+@pytest.mark.parametrize("group_by", ["school", "cohort", None])
+def test_aggregates_match_per_student(bank, cohort, store, group_by):
+    analytics = CohortAnalytics(bank, group_by=group_by, chunk_size=8)
+    assert analytics.update(store) == len(cohort)
+    group_of = {
+        "school": lambda i: SCHOOLS[i % 3] or UNKNOWN,
+        "cohort": lambda i: f"10{'AB'[i % 2]}",
+        None: lambda i: ALL,
+    }[group_by]
+    _check(analytics, _expected(bank, cohort, group_of))
+
+
+def test_update_reads_only_new_results(bank, cohort, store, students):
+    analytics = CohortAnalytics(bank, chunk_size=16)
+    analytics.update(store)
+    assert analytics.update(store) == 0
+    more = students(12, seed=23)
+    for i, (name, responses, subject_scores) in enumerate(more, len(cohort)):
+        store.add(responses, subject_scores, name, school=SCHOOLS[i % 3], bank=bank)
+    store.flush()
+    assert analytics.update(store) == len(more)
+    _check(analytics, _expected(bank, cohort + more, lambda i: SCHOOLS[i % 3] or UNKNOWN))
+
+
+def test_filters(bank, cohort, store):
+    analytics = CohortAnalytics(bank, group_by=None, school="South")
+    analytics.update(store)
+    south = [student for i, student in enumerate(cohort) if SCHOOLS[i % 3] == "South"]
+    _check(analytics, _expected(bank, south, lambda i: ALL))
+
+
+def test_empty(bank, store):
+    analytics = CohortAnalytics(bank, cohort="12C")
+    assert analytics.update(store) == 0
+    assert analytics.dominant_traits().empty
+    assert analytics.domain_mix().empty and analytics.subject_interest().empty
+    assert isinstance(analytics.domain_mix(), pd.DataFrame)
+
+
+def test_unknown_grouping(bank):
+    with pytest.raises(ValueError):
+        CohortAnalytics(bank, group_by="class")
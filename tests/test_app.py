@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+pytest.importorskip("streamlit")
+from streamlit.testing.v1 import AppTest
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Career Guidance.py")
+
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    monkeypatch.delenv("CAREER_GUIDANCE_RESULTS_DB", raising=False)
+    monkeypatch.chdir(tmp_path)
+    return AppTest.from_file(APP, default_timeout=60).run()
+
+
+def _button(at, label):
+    return next(button for button in at.button if button.label == label)
+
+
+def _answer_page(at, bank):
+    q_ids = list(bank.dim_labels.values())[at.session_state["page"]]
+    for q_id in q_ids:
+        at.radio(key=f"q_{q_id}").set_value(bank.options[bank.q_pos[q_id]][0])
+    _button(at, "Next ➡️").click().run()
+
+
+def test_reset_starts_over(app, bank):
+    token = app.session_state["session_token"]
+    assert app.query_params["session"] in (token, [token])
+    _answer_page(app, bank)
+    assert app.session_state["page"] == 1 and len(app.session_state["responses"]) > 0
+
+    _button(app, "🔄 Reset").click().run()
+    assert app.session_state["page"] == 0
+    assert len(app.session_state["responses"]) == 0
+    assert app.session_state["session_token"] != token
+
+
+def test_start_over_after_the_assessment(app, bank):
+    for _ in bank.dim_labels:
+        _answer_page(app, bank)
+    assert app.session_state["page"] == len(bank.dim_labels)
+    assert len(app.session_state["responses"]) == len(bank.q_ids)
+
+    # Results are only stored when a database is configured
+    app.text_input[0].input("Ada").run()
+    _button(app, "📝 Generate Report").click().run()
+    assert app.session_state["report_job"]
+    assert not any(name.endswith(".sqlite3") for name in os.listdir("."))
+
+    _button(app, "🔁 Start Over").click().run()
+    assert app.session_state["page"] == 0
+    assert len(app.session_state["responses"]) == 0
+
+
+def test_resume_from_the_link(app, bank):
+    _answer_page(app, bank)
+    token = app.session_state["session_token"]
+    other = AppTest.from_file(APP, default_timeout=60)
+    other.query_params["session"] = token
+    other.run()
+    assert other.session_state["session_token"] == token
+    assert other.session_state["page"] == 1
+    assert len(other.session_state["responses"]) == len(list(bank.dim_labels.values())[0])
@@ -0,0 +1,74 @@
+import json
+import os
+import shutil
+
+import pytest
+
+import career_guidance
+from career_guidance import bank as bank_module
+from career_guidance.bulk import read_students
+
+
+@pytest.fixture
+def banks(tmp_path, monkeypatch):
+    """A bank directory holding version 1 and a copy published as version 2, with a pointer file."""
+    shutil.copy(os.path.join(bank_module.BANK_DIR, "1.json"), tmp_path / "1.json")
+    with open(tmp_path / "1.json", encoding="utf-8") as f:
+        data = json.load(f)
+    data["version"] = "2"
+    data["subjects"] = data["subjects"] + ["Art"]
+    with open(tmp_path / "2.json", "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    monkeypatch.setattr(bank_module, "BANK_DIR", str(tmp_path))
+    monkeypatch.setattr(bank_module, "BANK_POINTER", str(tmp_path / "CURRENT"))
+    monkeypatch.setattr(bank_module, "POINTER_INTERVAL", 0)
+    monkeypatch.setattr(bank_module, "_banks", {})
+    monkeypatch.setattr(bank_module, "_default_version", "1")
+    monkeypatch.setattr(bank_module, "_pointer_checked", float("-inf"))
+    monkeypatch.setattr(bank_module, "_pointer_mtime", None)
+    return tmp_path
+
+
+def point_to(banks, version):
+    pointer = banks / "CURRENT"
+    pointer.write_text(version + "\n", encoding="utf-8")
+    # Coarse filesystem clocks could give two quick writes the same mtime
+    stat = pointer.stat()
+    os.utime(pointer, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_pointer_swaps_default_bank(banks):
+    assert bank_module.default_bank().version == "1"
+    point_to(banks, "2")
+    assert bank_module.default_bank().version == "2"
+    point_to(banks, "1")
+    assert bank_module.default_bank().version == "1"
+
+
+def test_bad_pointer_keeps_current_bank(banks, caplog):
+    point_to(banks, "2")
+    assert bank_module.default_bank().version == "2"
+    point_to(banks, "9")
+    assert bank_module.default_bank().version == "2"
+    assert "Keeping question bank '2'" in caplog.text
+    (banks / "CURRENT").unlink()
+    assert bank_module.default_bank().version == "2"
+
+
+def test_module_aliases_follow_swap(banks):
+    assert "Art" not in bank_module.subjects
+    point_to(banks, "2")
+    assert bank_module.bank_version == "2" and "Art" in bank_module.subjects
+    assert career_guidance.subjects == bank_module.subjects
+    with pytest.raises(AttributeError):
+        career_guidance.no_such_field
+
+
+def test_read_students_uses_current_bank(banks, tmp_path):
+    path = tmp_path / "students.jsonl"
+    path.write_text(json.dumps({"name": "Ada", "responses": {}, "subject_scores": {"Art": 90}}) + "\n", encoding="utf-8")
+    [(_, _, _, subject_scores, _)] = read_students(str(path))
+    assert "Art" not in subject_scores
+    point_to(banks, "2")
+    [(_, _, _, subject_scores, _)] = read_students(str(path))
+    assert subject_scores["Art"] == 90
@@ -0,0 +1,55 @@
+import csv
+import io
+import json
+
+from career_guidance.bulk import read_students, run
+
+
+def write_jsonl(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records), encoding="utf-8")
+
+
+def test_unknown_answers_are_errors(tmp_path, bank):
+    q_id = bank.q_ids[0]
+    good = bank.options[0][0]
+    path = tmp_path / "students.jsonl"
+    write_jsonl(path, [
+        {"name": "Good", "responses": {str(q_id): good}},
+        {"name": "Typo", "responses": {str(q_id): good + "!"}},
+        {"name": "Number", "responses": {str(q_id): 1}},
+        {"name": "Unknown question", "responses": {"9999": good}},
+    ])
+    rows = list(read_students(str(path), bank))
+    assert rows[0][2] == {q_id: good} and rows[0][4] is None
+    assert [(name, error is not None) for _, name, _, _, error in rows[1:]] == [
+        ("Typo", True), ("Number", True), ("Unknown question", True),
+    ]
+
+
+def test_csv_answers_are_checked(tmp_path, bank):
+    q_id = bank.q_ids[0]
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["name", f"Q{q_id}"])
+    writer.writerow(["Good", bank.options[0][0]])
+    writer.writerow(["Typo", "maybe"])
+    path = tmp_path / "students.csv"
+    path.write_text(out.getvalue(), encoding="utf-8")
+    errors = [error for _, _, _, _, error in read_students(str(path), bank)]
+    assert errors[0] is None and "'maybe' is not an option" in errors[1]
+
+
+def test_run_lists_bad_rows(tmp_path, bank):
+    q_id = bank.q_ids[0]
+    path = tmp_path / "students.jsonl"
+    write_jsonl(path, [
+        {"name": "Good", "responses": {str(q_id): bank.options[0][0]}},
+        {"name": "Typo", "responses": {str(q_id): "maybe"}},
+    ])
+    path.write_text(path.read_text(encoding="utf-8") + "not json\n", encoding="utf-8")
+    out_dir = tmp_path / "reports"
+    stats = run(str(path), str(out_dir), workers=1, progress_every=0)
+    assert stats["generated"] == 1 and stats["failed"] == 2
+    with open(out_dir / "errors.jsonl", encoding="utf-8") as f:
+        errors = [json.loads(line) for line in f]
+    assert [(e["index"], e["name"]) for e in errors] == [(1, "Typo"), (2, None)]
@@ -0,0 +1,78 @@
+import os
+import pickle
+
+import pytest
+
+from career_guidance import ReportCache, report_fingerprint
+from career_guidance.charts import VectorRadarChart
+
+
+@pytest.mark.parametrize("backend", ["vector", "matplotlib"])
+def test_disk_entry_round_trip(tmp_path, students, backend):
+    name, responses, subject_scores = students(1)[0]
+    pdf_bytes, charts = ReportCache(disk_dir=str(tmp_path)).get_or_build(name, responses, subject_scores, chart_backend=backend)
+
+    # A second process with an empty memory tier reads the entry from disk
+    other = ReportCache(disk_dir=str(tmp_path))
+    key = report_fingerprint(name, responses, subject_scores, backend)
+    cached_pdf, cached_charts = other.get(key)
+    assert other.stats()["disk_hits"] == 1
+    assert cached_pdf == pdf_bytes
+    assert cached_charts.keys() == charts.keys()
+    for dimension, chart in charts.items():
+        cached = cached_charts[dimension]
+        if isinstance(chart, VectorRadarChart):
+            assert (cached.dimension, cached.labels, cached.values) == (chart.dimension, chart.labels, chart.values)
+        else:
+            assert cached == chart
+
+
+class Planted:
+    def __reduce__(self):
+        return (os.system, ("touch planted",))
+
+
+def test_disk_tier_never_unpickles(tmp_path, students):
+    name, responses, subject_scores = students(1)[0]
+    cache = ReportCache(disk_dir=str(tmp_path))
+    key = report_fingerprint(name, responses, subject_scores)
+    path = cache._disk_path(key)
+    os.makedirs(os.path.dirname(path))
+    with open(path, "wb") as f:
+        pickle.dump(Planted(), f)
+    assert cache.get(key) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_truncated_entry_is_a_miss(tmp_path, students):
+    name, responses, subject_scores = students(1)[0]
+    ReportCache(disk_dir=str(tmp_path)).get_or_build(name, responses, subject_scores)
+    key = report_fingerprint(name, responses, subject_scores)
+    cache = ReportCache(disk_dir=str(tmp_path))
+    path = cache._disk_path(key)
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path, "wb") as f:
+        f.write(data[:-10])
+    assert cache.get(key) is None
+
+
+def test_disk_tier_is_bounded(tmp_path, students):
+    cache = ReportCache(disk_dir=str(tmp_path), disk_max_bytes=1, prune_every=1)
+    for name, responses, subject_scores in students(3):
+        cache.get_or_build(name, responses, subject_scores)
+    assert not [name for _, _, names in os.walk(tmp_path) for name in names]
+
+
+def test_failed_disk_write_keeps_the_report(tmp_path, students, monkeypatch, caplog):
+    name, responses, subject_scores = students(1)[0]
+    cache = ReportCache(disk_dir=str(tmp_path))
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail)
+    pdf_bytes, _ = cache.get_or_build(name, responses, subject_scores)
+    assert pdf_bytes.startswith(b"%PDF")
+    assert "disk full" in caplog.text
+    assert not [name for _, _, names in os.walk(tmp_path) for name in names]
@@ -0,0 +1,34 @@
+import re
+
+from career_guidance import build_recommendations, calculate_scores, generate_split_radar_charts
+from career_guidance.pdf import ReportPDF
+from career_guidance.report import layout_pdf
+
+# A path start followed straight by a line or paint operator has lost its operands
+EMPTY_SEGMENT = re.compile(r"\bm\s+l\b|\bm\s+[fsbS]\b")
+
+
+def _content(pdf):
+    return "".join(pdf.pages.values())
+
+
+def test_polygon_needs_two_vertices():
+    pdf = ReportPDF()
+    pdf.add_page()
+    pdf.polygon([(10, 10)], 'F')
+    pdf.polygon([(10, 10)], 'D')
+    pdf.polygon([(10, 10), (20, 20)], 'D')
+    content = _content(pdf)
+    assert not EMPTY_SEGMENT.search(content)
+    assert content.count(" m ") == 1
+
+
+def test_single_trait_dimension_charts(bank):
+    # The first option everywhere scores one trait in several dimensions
+    responses = {q_id: bank.options[pos][0] for pos, q_id in enumerate(bank.q_ids)}
+    scores = calculate_scores(responses, bank)
+    assert any(len(traits) == 1 for traits in scores.values())
+    charts = generate_split_radar_charts(scores, backend="vector", cache=None, bank=bank)
+    pdf = layout_pdf("Solo", scores, charts, build_recommendations(scores, {}, bank))
+    assert not EMPTY_SEGMENT.search(_content(pdf))
+    assert pdf.output(dest="S").startswith("%PDF")
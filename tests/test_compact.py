@@ -0,0 +1,44 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from career_guidance import calculate_scores, scoring_engine
+from career_guidance.compact import (
+    PackedResponses, pack_responses, pack_scores, score_packed, unpack_responses, unpack_scores,
+)
+
+
+def test_packed_round_trip(bank, students):
+    for _, responses, _ in students(50, seed=5, answered=0.8):
+        packed = PackedResponses(responses, bank=bank)
+        assert dict(packed) == responses
+        assert PackedResponses.from_bytes(packed.to_bytes(), bank) == packed
+        scores = calculate_scores(responses, bank)
+        row = pack_scores(scores, bank)
+        assert unpack_scores(row, bank, codes=packed.to_bytes()) == scores
+        np.testing.assert_array_equal(row, scoring_engine(bank).score_matrix(packed.option_codes()[None, :])[0])
+
+
+def test_packed_behaves_like_a_dict(bank):
+    q_id, other = bank.q_ids[:2]
+    packed = PackedResponses({q_id: bank.options[0][1]}, bank=bank)
+    assert len(packed) == 1 and q_id in packed and other not in packed
+    with pytest.raises(KeyError):
+        packed[other]
+    with pytest.raises(ValueError):
+        packed[other] = "not an option"
+    del packed[q_id]
+    assert len(packed) == 0 and packed.to_bytes() == bytes([0xFF]) * len(bank.q_ids)
+    with pytest.raises(ValueError):
+        PackedResponses(bank=bank, codes=b"\x00")
+
+
+def test_bytes_helpers_and_pickle(bank, students):
+    batch = [responses for _, responses, _ in students(20, seed=6, answered=0.7)]
+    packed = [pack_responses(responses, bank) for responses in batch]
+    assert all(len(data) == len(bank.q_ids) for data in packed)
+    assert [unpack_responses(data, bank) for data in packed] == batch
+    np.testing.assert_array_equal(score_packed(packed, bank), np.array([pack_scores(calculate_scores(r, bank), bank) for r in batch]))
+    responses = PackedResponses(batch[0], bank=bank)
+    assert len(pickle.dumps(responses)) < 200 and pickle.loads(pickle.dumps(responses)) == responses
@@ -0,0 +1,130 @@
+import asyncio
+import csv
+import io
+import json
+import os
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from career_guidance import build_recommendations, calculate_scores, export
+from career_guidance.bulk import report_filename
+from career_guidance.service import AssessmentService
+from career_guidance.store import dominant_traits
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """Thread pool recording the most tasks submitted and not yet finished."""
+
+    def __init__(self, workers=2):
+        super().__init__(max_workers=workers)
+        self.lock = threading.Lock()
+        self.outstanding = 0
+        self.most = 0
+
+    def submit(self, fn, *args):
+        with self.lock:
+            self.outstanding += 1
+            self.most = max(self.most, self.outstanding)
+        future = super().submit(fn, *args)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        with self.lock:
+            self.outstanding -= 1
+
+
+@pytest.fixture
+def executor():
+    executor = CountingExecutor()
+    yield executor
+    executor.shutdown()
+
+
+def test_archive_holds_every_report_and_the_summary(bank, students, executor):
+    batch = students(9, seed=31, answered=0.8)
+    stats = {}
+    chunks = list(export.stream_cohort(batch, bank=bank, workers=1, window=2, executor=executor, stats=stats))
+    data = b"".join(chunks)
+    assert stats == {"reports": 9, "failed": 0, "bytes": len(data)}
+    # Reports are sent as they finish, not all at the end
+    assert len(chunks) > 2 and chunks[0].startswith(b"PK")
+    assert executor.most <= 2
+
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.testzip() is None
+        names = archive.namelist()
+        assert sorted(names[:-1]) == sorted(report_filename(i, name) for i, (name, _, _) in enumerate(batch))
+        assert names[-1] == "summary.csv"
+        assert all(archive.read(name).startswith(b"%PDF") for name in names[:-1])
+        rows = list(csv.DictReader(io.TextIOWrapper(archive.open("summary.csv"), encoding="utf-8")))
+
+    by_name = {row["name"]: row for row in rows}
+    for name, responses, subject_scores in batch:
+        row = by_name[name]
+        scores = calculate_scores(responses, bank)
+        recommendations = build_recommendations(scores, subject_scores, bank)
+        assert row["bank"] == bank.version and row["error"] == ""
+        for dim, trait in dominant_traits(scores).items():
+            assert row[f"{dim} (dominant)"] == trait
+        for section in export.RECOMMENDATION_COLUMNS:
+            assert row[section] == "; ".join(recommendations.get(section, ()))
+
+
+def test_failed_reports_are_listed(bank, students, executor, monkeypatch):
+    render = export.render_report
+
+    def render_or_fail(name, *args, **kwargs):
+        if name == "Student 1":
+            raise RuntimeError("no fonts")
+        return render(name, *args, **kwargs)
+
+    monkeypatch.setattr(export, "render_report", render_or_fail)
+    stats = {}
+    data = b"".join(export.stream_cohort(students(3), bank=bank, executor=executor, stats=stats))
+    assert (stats["reports"], stats["failed"]) == (2, 1)
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        rows = list(csv.DictReader(io.TextIOWrapper(archive.open("summary.csv"), encoding="utf-8")))
+    failed = [row for row in rows if row["error"]]
+    assert [(row["name"], row["file"], row["error"]) for row in failed] == [("Student 1", "", "RuntimeError: no fonts")]
+
+
+def test_xlsx_summary(bank, students, executor):
+    openpyxl = pytest.importorskip("openpyxl")
+    data = b"".join(export.stream_cohort(students(2), bank=bank, executor=executor, summary="xlsx"))
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        sheet = openpyxl.load_workbook(io.BytesIO(archive.read("summary.xlsx"))).active
+        rows = list(sheet.values)
+    assert list(rows[0]) == export.summary_header(bank) and len(rows) == 3
+
+
+def test_write_cohort_leaves_no_part_file(bank, students, executor, tmp_path, monkeypatch):
+    output = str(tmp_path / "cohort.zip")
+    assert export.write_cohort(students(2), output, bank=bank, executor=executor)["reports"] == 2
+    assert zipfile.is_zipfile(output)
+
+    def broken(*args, **kwargs):
+        raise OSError("disk full")
+        yield
+
+    monkeypatch.setattr(export, "stream_cohort", broken)
+    with pytest.raises(OSError):
+        export.write_cohort(students(2), str(tmp_path / "other.zip"), bank=bank)
+    assert sorted(os.listdir(tmp_path)) == ["cohort.zip"]
+
+
+def test_service_exports_keep_to_their_budget(bank, monkeypatch):
+    calls = []
+    monkeypatch.setattr("career_guidance.service.stream_cohort", lambda students, **kwargs: calls.append(kwargs) or iter(()))
+    service = AssessmentService(workers=4, max_reports=4)
+    try:
+        body = json.dumps({"students": [{"responses": {}}]}).encode()
+        asyncio.run(service.handle("POST", "/export", body))
+    finally:
+        service.close()
+    [kwargs] = calls
+    assert kwargs["workers"] * kwargs["window"] == service.max_export_reports == 2
+    assert kwargs["executor"] is service.pool
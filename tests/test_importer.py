@@ -0,0 +1,120 @@
+import csv
+import json
+
+import numpy as np
+import pytest
+
+from career_guidance import scoring_engine
+from career_guidance.importer import ColumnMap, ImportFormatError, OptionMatcher, import_file, iter_import
+
+
+def _header(bank, style):
+    # The same questions, titled the ways different exports title them
+    titles = {
+        "id": lambda q_id: f"Q{q_id}",
+        "number": lambda q_id: str(q_id),
+        "app": lambda q_id: f"Q{q_id}. {bank.questions[q_id]['question']}",
+        "text": lambda q_id: bank.questions[q_id]["question"].upper(),
+    }[style]
+    return ["Student Name", "Class"] + [titles(q_id) for q_id in bank.q_ids] + ["Math Marks (%)", "Notes"]
+
+
+def _rows(bank, students):
+    return [
+        [name, "10A"] + [responses[q_id] for q_id in bank.q_ids] + [str(subject_scores["Math"]), "ignored"]
+        for name, responses, subject_scores in students
+    ]
+
+
+def _write_csv(path, header, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return str(path)
+
+
+def _import(path, bank, **kwargs):
+    errors = []
+    chunks = list(iter_import(path, bank, errors=lambda *error: errors.append(error), **kwargs))
+    return chunks, errors
+
+
+@pytest.mark.parametrize("style", ["id", "number", "app", "text"])
+def test_columns_are_matched_by_any_title(bank, style):
+    columns = ColumnMap(_header(bank, style), bank)
+    assert columns.name == 0 and columns.cohort == 1 and columns.school is None
+    assert columns.questions == {q_id: i + 2 for i, q_id in enumerate(bank.q_ids)}
+    assert columns.subjects == {"Math": len(bank.q_ids) + 2}
+
+
+def test_missing_and_duplicate_question_columns(bank):
+    header = _header(bank, "id")
+    with pytest.raises(ImportFormatError, match="No column"):
+        ColumnMap(header[:-3], bank)
+    with pytest.raises(ImportFormatError, match="both match"):
+        ColumnMap(header + [str(bank.q_ids[0])], bank)
+
+
+def test_near_miss_answers(bank):
+    matcher = OptionMatcher(bank)
+    option = bank.options[0][1]
+    assert matcher.match(0, option) == 1
+    assert matcher.match(0, f"  {option.upper()}!! ") == 1
+    # One dropped letter is a close enough match; unrelated text is not
+    assert matcher.match(0, option[:-2] + option[-1]) == 1
+    assert matcher.match(0, "something else entirely") is None
+
+
+def test_rows_are_scored_in_chunks(bank, students, tmp_path):
+    batch = students(23, seed=11)
+    path = _write_csv(tmp_path / "answers.csv", _header(bank, "app"), _rows(bank, batch))
+    chunks, errors = _import(path, bank, chunk_size=10)
+    assert errors == [] and [len(chunk) for chunk in chunks] == [10, 10, 3]
+    engine = scoring_engine(bank)
+    expected = engine.encode_batch([responses for _, responses, _ in batch])
+    assert np.array_equal(np.concatenate([chunk.answers for chunk in chunks]), expected)
+    assert np.array_equal(np.concatenate([chunk.scores for chunk in chunks]), engine.score_matrix(expected))
+    assert sum((chunk.names for chunk in chunks), []) == [name for name, _, _ in batch]
+    assert chunks[0].rows[:2] == [2, 3] and chunks[0].cohorts[0] == "10A"
+    assert chunks[0].subject_scores[0] == {"Math": float(batch[0][2]["Math"])}
+
+
+def test_malformed_rows_are_reported_and_skipped(bank, students, tmp_path):
+    rows = _rows(bank, students(5, seed=12))
+    rows[1][2] = ""                            # unanswered question
+    rows[2][3] = "definitely not an option"    # no matching option
+    rows[3][-2] = "ninety"                     # mark that is not a number
+    rows.insert(4, [""] * len(rows[0]))        # blank line, ignored
+    path = _write_csv(tmp_path / "answers.csv", _header(bank, "id"), rows)
+    errors_path = tmp_path / "errors.jsonl"
+    stats = import_file(path, bank=bank, errors_path=str(errors_path), progress_every=0)
+    assert stats["imported"] == 2 and stats["failed"] == 3
+    with open(errors_path, encoding="utf-8") as f:
+        errors = [json.loads(line) for line in f]
+    assert [(e["row"], e["name"]) for e in errors] == [(3, "Student 1"), (4, "Student 2"), (5, "Student 3")]
+    assert "unanswered questions" in errors[0]["errors"][0]
+    assert "matches no option" in errors[1]["errors"][0]
+    assert "is not a number" in errors[2]["errors"][0]
+
+
+def test_xlsx_matches_csv(bank, students, tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    header, rows = _header(bank, "text"), _rows(bank, students(12, seed=13))
+    csv_path = _write_csv(tmp_path / "answers.csv", header, rows)
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "Responses"
+    sheet.append(header)
+    for row in rows:
+        # Spreadsheets hold marks as numbers
+        sheet.append(row[:-2] + [float(row[-2]), row[-1]])
+    xlsx_path = str(tmp_path / "answers.xlsx")
+    workbook.save(xlsx_path)
+
+    from_csv, _ = _import(csv_path, bank)
+    from_xlsx, errors = _import(xlsx_path, bank, sheet="Responses")
+    assert errors == []
+    for a, b in zip(from_csv, from_xlsx):
+        assert np.array_equal(a.answers, b.answers) and np.array_equal(a.scores, b.scores)
+        assert (a.rows, a.names, a.cohorts, a.subject_scores) == (b.rows, b.names, b.cohorts, b.subject_scores)
@@ -0,0 +1,109 @@
+import threading
+import time
+
+import pytest
+
+from career_guidance import ReportCache
+from career_guidance import jobs as jobs_module
+from career_guidance.jobs import STAGES, QueueFull, ReportJobs
+
+
+class FakeRender:
+    """Stands in for render_report; each call waits for its gate when it reaches a stage."""
+
+    def __init__(self, pdf_size=100):
+        self.pdf_size = pdf_size
+        self.gates = {}
+        self.reached = {}
+        self.fail = set()
+
+    def gate(self, name, stage):
+        self.gates[name, stage] = threading.Event()
+        self.reached[name, stage] = threading.Event()
+        return self.gates[name, stage], self.reached[name, stage]
+
+    def __call__(self, student_name, responses, subject_scores, chart_backend=None, bank=None, progress=None):
+        for stage in ("scores", "charts", "pdf"):
+            progress(stage)
+            if (student_name, stage) in self.gates:
+                self.reached[student_name, stage].set()
+                assert self.gates[student_name, stage].wait(10)
+        if student_name in self.fail:
+            raise ValueError(f"cannot render {student_name}")
+        return student_name.encode().ljust(self.pdf_size, b"."), {}
+
+
+@pytest.fixture
+def render(monkeypatch):
+    render = FakeRender()
+    monkeypatch.setattr(jobs_module, "render_report", render)
+    return render
+
+
+def wait_done(jobs, job_id):
+    deadline = time.monotonic() + 10
+    while not jobs.status(job_id).done:
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+    return jobs.status(job_id)
+
+
+def test_progress_and_result(render):
+    jobs = ReportJobs(workers=1)
+    release, reached = render.gate("Ada", "charts")
+    job_id = jobs.submit("Ada", {}, {})
+    assert reached.wait(10)
+    job = jobs.status(job_id)
+    assert (job.stage, job.progress, job.message) == ("charts", *STAGES["charts"])
+    assert not job.done and jobs.stats()["pending"] == 1
+    release.set()
+    job = wait_done(jobs, job_id)
+    assert job.stage == "done" and job.progress == 1.0 and job.pdf_bytes.startswith(b"Ada")
+    jobs.shutdown()
+
+
+def test_errors_are_reported(render):
+    render.fail.add("Bob")
+    jobs = ReportJobs(workers=1)
+    job = wait_done(jobs, jobs.submit("Bob", {}, {}))
+    assert job.stage == "failed" and job.error == "ValueError: cannot render Bob" and job.pdf_bytes is None
+    jobs.shutdown()
+
+
+def test_queue_full_and_duplicates(render):
+    jobs = ReportJobs(workers=1, max_pending=2)
+    release, reached = render.gate("A", "scores")
+    first = jobs.submit("A", {}, {})
+    assert reached.wait(10)
+    second = jobs.submit("B", {}, {})
+    # A double click on the same report gets the job already queued
+    assert jobs.submit("B", {}, {}) == second
+    with pytest.raises(QueueFull):
+        jobs.submit("C", {}, {})
+    release.set()
+    wait_done(jobs, first)
+    wait_done(jobs, second)
+    wait_done(jobs, jobs.submit("C", {}, {}))
+    jobs.shutdown()
+
+
+def test_finished_jobs_expire_by_count_and_bytes(render):
+    jobs = ReportJobs(workers=1, keep_finished=3, keep_bytes=250)
+    ids = [jobs.submit(name, {}, {}) for name in "ABCD"]
+    jobs.shutdown()
+    # 100-byte PDFs: the byte budget keeps two, though the count allows three
+    assert [jobs.status(job_id) is not None for job_id in ids] == [False, False, True, True]
+    assert jobs.finished_bytes == 200
+
+
+def test_cached_reports_are_not_held_by_jobs(students):
+    name, responses, subject_scores = students(1)[0]
+    cache = ReportCache()
+    jobs = ReportJobs(cache=cache, workers=1)
+    job = wait_done(jobs, jobs.submit(name, responses, subject_scores))
+    assert job.size == 0 and jobs.finished_bytes == 0
+    assert job.pdf_bytes.startswith(b"%PDF")
+    # Evicted from the cache: the app asks for the report again
+    cache.memory.clear()
+    assert job.pdf_bytes is None
+    jobs.shutdown()
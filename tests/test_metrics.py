@@ -0,0 +1,117 @@
+import json
+import logging
+import os
+import subprocess
+import sys
+
+import pytest
+
+from career_guidance import metrics, render_report
+from career_guidance.charts import chart_cache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Lines(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(json.loads(record.getMessage()))
+
+
+@pytest.fixture
+def lines():
+    # Metrics on with a capturing handler; everything is put back afterwards
+    saved = (metrics.enabled, list(metrics.logger.handlers), metrics.logger.level, metrics.logger.propagate)
+    metrics.logger.handlers = [Lines()]
+    metrics.logger.setLevel(logging.INFO)
+    metrics.registry.reset()
+    metrics.enable()
+    yield metrics.logger.handlers[0].lines
+    metrics.enabled, metrics.logger.handlers, _, metrics.logger.propagate = saved
+    metrics.logger.setLevel(saved[2])
+    metrics.registry.reset()
+
+
+def test_off_records_nothing():
+    assert not metrics.enabled
+    with metrics.report(student="x"), metrics.stage("pdf_output") as timer:
+        timer.add(nbytes=10)
+    assert metrics.registry.snapshot()["stages"] == {}
+
+
+def test_report_line_and_totals(lines, students):
+    name, responses, subject_scores = students(1)[0]
+    # Charts cached by earlier tests would skip the charts stage
+    chart_cache.clear()
+    pdf_bytes, _ = render_report(name, responses, subject_scores, chart_backend="vector", bank=None)
+    [line] = lines
+    assert line["event"] == "report" and line["ok"] and line["chart_backend"] == "vector"
+    assert {"scores", "charts", "recommendations", "pdf_layout", "pdf_output"} <= set(line["stages"])
+    assert line["stages"]["pdf_output"]["bytes"] == len(pdf_bytes) == line["bytes"]
+    assert line["charts"] > 0 and line["wall_ms"] > 0
+
+    snapshot = metrics.registry.snapshot()
+    assert snapshot["reports"] == {"ok": 1, "error": 0}
+    assert snapshot["stages"]["pdf_output"][:1] == [1] and snapshot["stages"]["pdf_output"][3] == len(pdf_bytes)
+
+
+def test_failed_report_is_counted(lines):
+    with pytest.raises(ValueError):
+        with metrics.report(student="x"):
+            raise ValueError("bad")
+    assert lines[0]["ok"] is False and lines[0]["error"] == "ValueError"
+    assert metrics.registry.snapshot()["reports"] == {"ok": 0, "error": 1}
+
+
+def test_prometheus_text(lines):
+    with metrics.report():
+        with metrics.stage("pdf_output") as timer:
+            timer.add(nbytes=1234)
+    text = metrics.registry.prometheus()
+    assert 'career_guidance_stage_calls_total{stage="pdf_output"} 1' in text
+    assert 'career_guidance_stage_bytes_total{stage="pdf_output"} 1234' in text
+    assert 'career_guidance_reports_total{status="ok"} 1' in text
+    assert 'career_guidance_report_seconds_bucket{le="+Inf"} 1' in text
+    assert "career_guidance_report_seconds_count 1" in text
+    # Every sample belongs to a declared family
+    families = {line.split()[2] for line in text.splitlines() if line.startswith("# TYPE")}
+    samples = [line for line in text.splitlines() if not line.startswith("#")]
+    assert all(any(sample.startswith(family) for family in families) for sample in samples)
+
+
+def test_take_and_merge(lines):
+    with metrics.report(), metrics.stage("charts") as timer:
+        timer.add(charts=3)
+    worker = metrics.registry.take()
+    assert metrics.registry.snapshot()["stages"] == {}
+    metrics.registry.merge(worker)
+    metrics.registry.merge(worker)
+    snapshot = metrics.registry.snapshot()
+    assert snapshot["stages"]["charts"][4] == 6 and snapshot["reports"]["ok"] == 2
+
+
+def test_write_file(lines, tmp_path):
+    path = tmp_path / "career_guidance.prom"
+    with metrics.report():
+        pass
+    metrics.registry.write(str(path))
+    assert path.read_text(encoding="utf-8") == metrics.registry.prometheus()
+    assert os.listdir(tmp_path) == [path.name]
+
+
+def test_enabled_by_environment_logs_to_stderr():
+    # A process that only sets the variable, as the Streamlit app does
+    script = (
+        "from career_guidance import default_bank, render_report\n"
+        "bank = default_bank()\n"
+        "render_report('Ada', {}, {}, chart_backend='vector')\n"
+    )
+    env = dict(os.environ, CAREER_GUIDANCE_METRICS="1", MPLBACKEND="Agg")
+    env.pop("CAREER_GUIDANCE_METRICS_FILE", None)
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    [line] = [json.loads(line) for line in result.stderr.splitlines() if line.startswith("{")]
+    assert line["event"] == "report" and line["ok"]
@@ -0,0 +1,46 @@
+from career_guidance.navigation import INCOMPLETE_WARNING, go_back, go_next, init_state, reset, section_answered
+
+
+def _answer(state, bank, q_ids):
+    for q_id in q_ids:
+        state[f"q_{q_id}"] = bank.options[bank.q_pos[q_id]][0]
+
+
+def test_next_needs_a_complete_section(bank):
+    state = {}
+    init_state(state, bank)
+    q_ids = list(bank.dim_labels.values())[0]
+    go_next(state, 0, q_ids)
+    assert state["page"] == 0 and state["nav_warning"] == INCOMPLETE_WARNING
+    _answer(state, bank, q_ids)
+    assert section_answered(state, q_ids)
+    go_next(state, 0, q_ids)
+    assert state["page"] == 1 and state["nav_warning"] is None
+    assert len(state["responses"]) == len(q_ids)
+
+
+def test_stale_clicks_are_ignored(bank):
+    state = {}
+    init_state(state, bank)
+    q_ids = list(bank.dim_labels.values())[0]
+    _answer(state, bank, q_ids)
+    go_next(state, 0, q_ids)
+    go_next(state, 0, q_ids)
+    assert state["page"] == 1
+    go_back(state, 1)
+    go_back(state, 1)
+    assert state["page"] == 0
+
+
+def test_reset_clears_answers_and_abandons_session(bank):
+    state = {}
+    init_state(state, bank)
+    q_ids = list(bank.dim_labels.values())[0]
+    _answer(state, bank, q_ids)
+    go_next(state, 0, q_ids)
+    state["session_token"] = "old"
+    reset(state)
+    init_state(state, bank)
+    assert state["page"] == 0 and len(state["responses"]) == 0
+    assert not any(str(key).startswith("q_") for key in state)
+    assert "session_token" not in state and state["session_abandoned"] == "old"
@@ -0,0 +1,78 @@
+import re
+from collections import OrderedDict
+
+import pytest
+
+from career_guidance import build_recommendations, calculate_scores, generate_pdf, generate_split_radar_charts
+from career_guidance import pdf as pdf_module
+from career_guidance.pdf import ReportPDF
+
+
+def _stable(pdf_bytes):
+    return re.sub(rb"/CreationDate \([^)]*\)", b"", pdf_bytes)
+
+
+def test_static_blocks_replay_byte_identical(bank, students, monkeypatch):
+    for name, responses, subject_scores in students(3, seed=11):
+        scores = calculate_scores(responses, bank)
+        charts = generate_split_radar_charts(scores, backend="vector", cache=None, bank=bank)
+        recommendations = build_recommendations(scores, subject_scores, bank)
+        # Twice with reuse, so the second report replays the recorded blocks
+        generate_pdf(name, scores, charts, recommendations)
+        replayed = generate_pdf(name, scores, charts, recommendations).getvalue()
+        monkeypatch.setattr(ReportPDF, "reuse_static_blocks", False)
+        laid_out = generate_pdf(name, scores, charts, recommendations).getvalue()
+        monkeypatch.undo()
+        assert _stable(replayed) == _stable(laid_out)
+
+
+@pytest.fixture
+def blocks(monkeypatch):
+    blocks = OrderedDict()
+    monkeypatch.setattr(pdf_module, "_static_blocks", blocks)
+    return blocks
+
+
+def _page(block, draw, y=None):
+    pdf = ReportPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+    if y is not None:
+        pdf.set_y(y)
+    pdf.static_block(block, lambda: draw(pdf))
+    return pdf
+
+
+def test_blocks_are_drawn_once_per_state(blocks):
+    calls = []
+
+    def draw(pdf):
+        calls.append(pdf)
+        pdf.multi_cell(0, 10, txt="Recorded once")
+
+    first = _page("text", draw)
+    second = _page("text", draw)
+    assert calls == [first] and len(blocks) == 1
+    assert second.pages[1] == first.pages[1] and second.y == first.y
+    # A different starting position is a different block
+    third = _page("text", draw, y=100)
+    assert calls == [first, third] and len(blocks) == 2
+
+
+def test_page_breaks_are_not_recorded(blocks):
+    calls = []
+
+    def draw(pdf):
+        calls.append(pdf)
+        pdf.multi_cell(0, 10, txt="\n".join(["Line"] * 40))
+
+    first = _page("long text", draw)
+    second = _page("long text", draw)
+    assert calls == [first, second] and first.page == 2 and not blocks
+
+
+def test_recorded_blocks_are_bounded(blocks, monkeypatch):
+    monkeypatch.setattr(pdf_module, "MAX_STATIC_BLOCKS", 2)
+    for i in range(4):
+        _page(("text", i), lambda pdf: pdf.cell(0, 10, txt=str(i)))
+    assert [key[0] for key in blocks] == [("text", 2), ("text", 3)]
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from career_guidance import build_recommendations, calculate_scores, recommendation_index, scoring_engine
+from career_guidance.compact import pack_scores
+from career_guidance.ranking import career_model, top_k
+
+
+def test_single_row_and_batch_rank_alike(bank, students):
+    # One row and a block of rows are summed in a different order by BLAS
+    index = recommendation_index(bank)
+    batch = students(64, seed=9)
+    matrix = scoring_engine(bank).encode_batch([responses for _, responses, _ in batch])
+    subject_scores = [scores for _, _, scores in batch]
+    together = index.recommend_batch(matrix, subject_scores)
+    for row in range(len(batch)):
+        assert index.recommend_batch(matrix[row:row + 1], subject_scores[row:row + 1])[0] == together[row]
+
+
+def test_top_k_breaks_ties_by_column():
+    values = np.array([[1.0, 3.0, 3.0, 2.0, 3.0], [0.0, 0.0, 0.0, 0.0, 0.0]])
+    assert top_k(values, 2).tolist() == [[1, 2], [0, 1]]
+    assert top_k(values, 4).tolist() == [[1, 2, 4, 3], [0, 1, 2, 3]]
+    assert top_k(values, 9).tolist() == [[1, 2, 4, 3, 0], [0, 1, 2, 3, 4]]
+    assert top_k(values, 0).shape == (2, 0)
+
+
+def test_rank_matches_a_full_sort(bank, students):
+    model = career_model(bank)
+    engine = scoring_engine(bank)
+    batch = students(30, seed=10, answered=0.7)
+    scores = engine.score_matrix(engine.encode_batch([responses for _, responses, _ in batch]))
+    fit = np.round(model.features(scores) @ model.career_weights.T, 9)
+    best, best_fit = model.rank_batch(scores, k=5)
+    for row, (_, responses, _) in enumerate(batch):
+        expected = sorted(range(len(model.careers)), key=lambda col: (-fit[row, col], col))[:5]
+        assert best[row].tolist() == expected
+        assert best_fit[row].tolist() == fit[row, expected].tolist()
+        assert model.rank(calculate_scores(responses, bank), k=5) == \
+            [(model.careers[col], fit[row, col]) for col in expected]
+
+
+def test_rank_among(bank, students):
+    model = career_model(bank)
+    _, responses, _ = students(1, seed=12)[0]
+    scores = calculate_scores(responses, bank)
+    among = {0, 2, 5}
+    names = {model.careers[i] for i in among}
+    ranked = model.rank(scores, k=10, among=among)
+    assert {name for name, _ in ranked} == names
+    assert ranked == [entry for entry in model.rank(scores, k=len(model.careers)) if entry[0] in names]
+
+
+def test_score_dicts_are_packed_like_stored_scores(bank, students):
+    model = career_model(bank)
+    _, responses, _ = students(1, seed=13)[0]
+    scores = calculate_scores(responses, bank)
+    best, fit = model.rank_batch(pack_scores(scores, bank)[None, :])
+    assert model.rank(scores) == [(model.careers[i], f) for i, f in zip(best[0].tolist(), fit[0].tolist())]
+    # Scores from another bank are refused, not ranked on the traits that happen to match
+    for unknown in ({"Interest": {"Astrology": 1.0}}, {"Mood": {"Calm": 1.0}}):
+        with pytest.raises(KeyError):
+            pack_scores(unknown, bank)
+        with pytest.raises(KeyError):
+            model.rank(unknown)
+        with pytest.raises(KeyError):
+            build_recommendations(unknown, {}, bank)
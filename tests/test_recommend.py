@@ -0,0 +1,72 @@
+import json
+
+from career_guidance import (
+    Catalog, RecommendationIndex, build_recommendations, calculate_scores, default_catalog, get_subject_analysis,
+    recommend_domain, recommendation_index, scoring_engine, suggest_majors,
+)
+from career_guidance.catalog import DEFAULT_CATALOG
+
+
+def test_recommend_batch_matches_per_student(bank, students):
+    index = recommendation_index(bank)
+    batch = students(400, seed=7) + students(100, seed=8, answered=0.5)
+    matrix = scoring_engine(bank).encode_batch([responses for _, responses, _ in batch])
+    subject_scores_list = [subject_scores for _, _, subject_scores in batch]
+    results = index.recommend_batch(matrix, subject_scores_list)
+    # Marks given as an array take the same path as dicts after subject_matrix
+    assert index.recommend_batch(matrix, index.subject_matrix(subject_scores_list)) == results
+    domains = index.recommend_domain_batch(matrix)
+    masks = index.strength_masks(index.subject_matrix(subject_scores_list)).tolist()
+    for (_, responses, subject_scores), recommendations, domain, mask in zip(batch, results, domains, masks):
+        scores = calculate_scores(responses, bank)
+        assert recommendations == build_recommendations(scores, subject_scores, bank)
+        assert domain == recommend_domain(scores, bank)
+        assert mask == index.strength_mask(get_subject_analysis(subject_scores)[0])
+
+
+# suggest_majors' subject -> majors table before majors moved into the catalog
+ORIGINAL_MAJORS = {
+    "Math": ["Engineering", "Computer Science", "Economics"],
+    "Physics": ["Engineering", "Astrophysics"],
+    "Chemistry": ["Pharmacy", "Chemical Engineering"],
+    "Biology": ["Medicine", "Biotech"],
+    "English": ["Journalism", "Literature"],
+    "History": ["Public Policy", "Law"],
+    "Geography": ["Environmental Studies", "Urban Planning"],
+    "Economics": ["Finance", "Data Science"],
+}
+
+
+def test_suggest_majors_keeps_every_major():
+    subjects = list(ORIGINAL_MAJORS)
+    for mask in range(1 << len(subjects)):
+        strengths = [subj for i, subj in enumerate(subjects) if mask >> i & 1]
+        expected = {major for subj in strengths for major in ORIGINAL_MAJORS[subj]}
+        got = suggest_majors(strengths)
+        assert len(got) == len(set(got))
+        assert set(got) == expected, strengths
+
+
+# recommend_domain's lists when they were kept in the question bank
+ORIGINAL_DOMAINS = {
+    "STEM": (["Engineer", "Data Analyst", "AI Researcher", "Biotech Scientist"], ["MIT", "Stanford", "ETH Zurich", "IIT Bombay"]),
+    "Creative": (["UX Designer", "Animator", "Content Creator", "Filmmaker"], ["Parsons School of Design", "NID India", "SCAD", "RMIT"]),
+    "Humanities": (["Psychologist", "Policy Researcher", "Teacher", "NGO Worker"], ["Sciences Po", "TISS", "LSE", "UCLA"]),
+    "Business": (["Entrepreneur", "Marketing Analyst", "Financial Consultant"], ["Wharton", "INSEAD", "London Business School", "IIM Ahmedabad"]),
+}
+
+
+def test_recommend_domain_lists_the_catalog_domain(bank):
+    for interest, (careers, universities) in ORIGINAL_DOMAINS.items():
+        scores = {"Interest": {interest: 1.0}}
+        assert recommend_domain(scores, bank) == {"Careers": careers, "Universities": universities}
+    assert recommend_domain({"Interest": {}}, bank) == {}
+
+
+def test_recommend_domain_follows_catalog_edits(bank):
+    with open(DEFAULT_CATALOG, encoding="utf-8") as f:
+        data = json.load(f)
+    data["careers"].append({"name": "Roboticist", "domain": "STEM", "subjects": ["Physics"]})
+    index = RecommendationIndex(bank, Catalog(data))
+    assert index.recommend_domain({"Interest": {"STEM": 1.0}})["Careers"][-1] == "Roboticist"
+    assert "Roboticist" not in default_catalog().careers
@@ -0,0 +1,26 @@
+from career_guidance import calculate_scores, scoring_engine
+
+
+def test_score_dicts_match_calculate_scores(bank, students):
+    engine = scoring_engine(bank)
+    batch = students(300, seed=1) + students(300, seed=2, answered=0.6) + [("Nobody", {}, {})]
+    matrix = engine.encode_batch([responses for _, responses, _ in batch])
+    for (_, responses, _), scores in zip(batch, engine.score_dicts(matrix)):
+        expected = calculate_scores(responses, bank)
+        # Same values and the same key order, which decides ties in max()
+        assert [(dim, list(traits.items())) for dim, traits in scores.items()] == \
+               [(dim, list(traits.items())) for dim, traits in expected.items()]
+
+
+def test_first_option_everywhere(bank):
+    responses = {q_id: bank.options[pos][0] for pos, q_id in enumerate(bank.q_ids)}
+    engine = scoring_engine(bank)
+    assert engine.score_dicts(engine.encode_batch([responses]))[0] == calculate_scores(responses, bank)
+
+
+def test_unknown_answers_count_as_unanswered(bank):
+    engine = scoring_engine(bank)
+    q_id, other = bank.q_ids[:2]
+    responses = {q_id: bank.options[0][0], other: "not an option", "no such question": "Yes"}
+    assert engine.encode(responses).tolist() == [0] + [-1] * (len(bank.q_ids) - 1)
+    assert engine.score_dicts(engine.encode_batch([responses]))[0] == calculate_scores({q_id: bank.options[0][0]}, bank)
@@ -0,0 +1,75 @@
+import asyncio
+import json
+
+import pytest
+
+from career_guidance import build_recommendations, calculate_scores, get_subject_analysis, recommend_domain, suggest_majors
+from career_guidance.service import ApiError, AssessmentService, parse_students, recommend_students
+
+
+def _body(bank, answer):
+    return json.dumps({"responses": {str(bank.q_ids[0]): answer}}).encode()
+
+
+@pytest.mark.parametrize("answer", [["x"], {"a": 1}, 3, None])
+def test_non_string_answers_are_bad_requests(bank, answer):
+    with pytest.raises(ApiError) as error:
+        parse_students(_body(bank, answer), bank)
+    assert error.value.status == 400
+
+
+@pytest.mark.parametrize("q_id", ["²", "-1", "1.0", "q1"])
+def test_unusual_question_ids_are_bad_requests(bank, q_id):
+    with pytest.raises(ApiError) as error:
+        parse_students(json.dumps({"responses": {q_id: bank.options[0][0]}}).encode(), bank)
+    assert error.value.status == 400
+
+
+def _exchange(service, raw):
+    # One raw HTTP request against the connection handler; returns the response
+    async def run():
+        server = await asyncio.start_server(service._connection, "127.0.0.1", 0)
+        async with server:
+            reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+            writer.write(raw)
+            await writer.drain()
+            response = await asyncio.wait_for(reader.read(), 10)
+            writer.close()
+            return response
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def service():
+    service = AssessmentService(workers=1)
+    yield service
+    service.close()
+
+
+@pytest.mark.parametrize("length", ["abc", "-5", "+5", "1_0"])
+def test_bad_content_length_is_a_bad_request(service, length):
+    response = _exchange(service, f"POST /score HTTP/1.1\r\nContent-Length: {length}\r\n\r\n{{}}".encode())
+    assert response.startswith(b"HTTP/1.1 400 ") and b"Malformed request" in response
+
+
+def test_internal_errors_are_not_echoed(service, monkeypatch, caplog):
+    def fail(*args):
+        raise RuntimeError("secret path /srv/data")
+
+    monkeypatch.setattr("career_guidance.service.score_students", fail)
+    body = b"{}"
+    response = _exchange(service, b"POST /score HTTP/1.1\r\nConnection: close\r\nContent-Length: 2\r\n\r\n" + body)
+    assert response.startswith(b"HTTP/1.1 500 ")
+    assert b"secret" not in response
+    assert "secret path" in caplog.text
+
+
+def test_recommend_students_matches_per_student(bank, students):
+    batch = students(200, seed=21) + students(50, seed=22, answered=0.4) + [("Nobody", {}, {})]
+    for (_, responses, subject_scores), result in zip(batch, recommend_students(bank.version, batch)):
+        scores = calculate_scores(responses, bank)
+        assert result == {
+            "domain": recommend_domain(scores, bank),
+            "suggested_majors": suggest_majors(get_subject_analysis(subject_scores)[0]),
+            "recommendations": build_recommendations(scores, subject_scores, bank),
+        }
@@ -0,0 +1,64 @@
+import pytest
+
+from career_guidance import open_sessions
+from career_guidance.compact import UNANSWERED
+from career_guidance.navigation import init_state, reset
+from career_guidance.sessions import resume_session, save_session, start_session
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def sessions(request, tmp_path):
+    backend = open_sessions("memory" if request.param == "memory" else f"sqlite:{tmp_path / 'sessions.sqlite3'}")
+    yield backend
+    backend.close()
+
+
+def test_backend_deltas(sessions):
+    token = sessions.create("1")
+    assert sessions.write(token, [(0, 2), (5, 1)], page=1)
+    assert sessions.write(token, [(0, UNANSWERED), (7, 0)])
+    record = sessions.get(token)
+    assert record.answers == {5: 1, 7: 0} and record.page == 1 and record.bank_version == "1"
+    sessions.delete(token)
+    assert sessions.get(token) is None
+    assert not sessions.write(token, [(0, 1)])
+
+
+def test_open_sessions_rejects_unknown_backends():
+    with pytest.raises(ValueError):
+        open_sessions("redis://localhost")
+
+
+def test_save_writes_only_changes(sessions, bank):
+    state = {}
+    init_state(state, bank)
+    token = start_session(state, sessions, bank)
+    state["responses"][bank.q_ids[0]] = bank.options[0][1]
+    state["responses"][bank.q_ids[3]] = bank.options[3][0]
+    assert save_session(state, sessions) == 2
+    assert save_session(state, sessions) == 0
+    del state["responses"][bank.q_ids[0]]
+    state["page"] = 2
+    assert save_session(state, sessions) == 1
+    assert sessions.get(token).answers == {3: 0}
+
+    resumed = {}
+    assert resume_session(resumed, sessions, token)
+    assert resumed["page"] == 2 and dict(resumed["responses"]) == {bank.q_ids[3]: bank.options[3][0]}
+
+
+def test_reset_is_not_undone_by_the_url_token(sessions, bank):
+    state = {}
+    init_state(state, bank)
+    token = start_session(state, sessions, bank)
+    state["responses"][bank.q_ids[0]] = bank.options[0][0]
+    state["page"] = 3
+    save_session(state, sessions)
+
+    reset(state)
+    # The next run still sees the old token in the page URL
+    assert not resume_session(state, sessions, token)
+    assert sessions.get(token) is None
+    init_state(state, bank)
+    assert start_session(state, sessions, bank) != token
+    assert state["page"] == 0 and len(state["responses"]) == 0
@@ -0,0 +1,144 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from career_guidance import ResultsStore, calculate_scores, scoring_engine
+from career_guidance.store import dominant_traits
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "results.sqlite3")
+
+
+def _stored(path):
+    # Rows committed to the file, as another process would see them
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_in_memory_databases_are_rejected():
+    with pytest.raises(ValueError):
+        ResultsStore(":memory:")
+
+
+def test_writes_are_batched(path, students):
+    store = ResultsStore(path, batch_size=3, flush_interval=0)
+    for name, responses, subject_scores in students(2):
+        store.add(responses, subject_scores, name)
+    assert _stored(path) == 0
+    name, responses, subject_scores = students(3)[2]
+    store.add(responses, subject_scores, name)
+    assert _stored(path) == 3
+    store.close()
+
+
+def test_close_flushes(path, students):
+    with ResultsStore(path, batch_size=100, flush_interval=0) as store:
+        for name, responses, subject_scores in students(5):
+            store.add(responses, subject_scores, name)
+        assert _stored(path) == 0
+    assert _stored(path) == 5
+
+
+def test_failed_flush_keeps_the_batch(path, students, monkeypatch):
+    store = ResultsStore(path, batch_size=100, flush_interval=0)
+    for name, responses, subject_scores in students(4):
+        store.add(responses, subject_scores, name)
+    insert = store._insert
+
+    def locked(batch):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(store, "_insert", locked)
+    with pytest.raises(sqlite3.OperationalError):
+        store.flush()
+    assert len(store.buffer) == 4
+    monkeypatch.setattr(store, "_insert", insert)
+    assert store.flush() == 4
+    assert [result.student_name for result in store.query()] == [f"Student {i}" for i in range(4)]
+    store.close()
+
+
+def test_round_trip_and_dominant_table(path, bank, students):
+    batch = students(20, seed=3, answered=0.7)
+    with ResultsStore(path, flush_interval=0) as store:
+        for name, responses, subject_scores in batch:
+            store.add(responses, subject_scores, name, bank=bank)
+        results = list(store.query())
+        dominant = {}
+        for result_id, dim, trait in store.conn.execute("SELECT result_id, dimension, trait FROM dominant"):
+            dominant.setdefault(result_id, {})[dim] = trait
+    for (name, responses, subject_scores), result in zip(batch, results):
+        scores = calculate_scores(responses, bank)
+        assert result.student_name == name and result.subject_scores == subject_scores
+        assert dict(result.responses.items()) == responses
+        assert result.scores_by_dim == scores
+        assert dominant.get(result.id, {}) == dominant_traits(scores)
+
+
+def test_add_many_matches_add(tmp_path, bank, students):
+    batch = students(30, seed=4, answered=0.8)
+    with ResultsStore(str(tmp_path / "one.sqlite3"), flush_interval=0) as one, \
+            ResultsStore(str(tmp_path / "many.sqlite3"), flush_interval=0) as many:
+        for name, responses, subject_scores in batch:
+            one.add(responses, subject_scores, name, created_at=1000.0, bank=bank)
+        matrix = scoring_engine(bank).encode_batch([responses for _, responses, _ in batch])
+        many.add_many(matrix, [s for _, _, s in batch], [n for n, _, _ in batch], created_at=1000.0, bank=bank)
+        for a, b in zip(one.query(), many.query()):
+            assert (a.answers, a.scores, a.subject_scores) == (b.answers, b.scores, b.subject_scores)
+        assert one.conn.execute("SELECT * FROM dominant ORDER BY 1, 2, 3").fetchall() == \
+            many.conn.execute("SELECT * FROM dominant ORDER BY 1, 2, 3").fetchall()
+
+
+@pytest.fixture
+def cohort_store(path, bank, students):
+    store = ResultsStore(path, flush_interval=0)
+    for i, (name, responses, subject_scores) in enumerate(students(60, seed=5)):
+        store.add(responses, subject_scores, name, cohort=f"10{'AB'[i % 2]}", school=("North", "South", "East")[i % 3],
+                  created_at=1000.0 + i, bank=bank)
+    yield store
+    store.close()
+
+
+FILTERS = [
+    {"cohort": "10A"},
+    {"school": "North", "cohort": "10B"},
+    {"since": 1010, "until": 1020},
+    {"dominant": {"Interest": "STEM"}},
+    {"dominant": {"Interest": "STEM"}, "school": "South"},
+    {"dominant": {"Interest": "Humanities", "Personality": "Structured"}, "cohort": "10A", "since": 1005},
+]
+
+
+def _matches(result, cohort=None, school=None, since=None, until=None, dominant=None):
+    traits = dominant_traits(result.scores_by_dim)
+    return (
+        (cohort is None or result.cohort == cohort)
+        and (school is None or result.school == school)
+        and (since is None or result.created_at >= since)
+        and (until is None or result.created_at < until)
+        and all(traits.get(dim) == trait for dim, trait in (dominant or {}).items())
+    )
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_filters_match_a_scan(cohort_store, filters):
+    expected = [result.id for result in cohort_store.query() if _matches(result, **filters)]
+    assert expected
+    assert [result.id for result in cohort_store.query(**filters)] == expected
+    assert cohort_store.count(**filters) == len(expected)
+    chunks = list(cohort_store.iter_chunks(cohort_store.get(1).bank_version, chunk_size=7, **filters))
+    assert (np.concatenate([chunk["id"] for chunk in chunks]).tolist() if chunks else []) == expected
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_filters_use_an_index(cohort_store, filters):
+    _, source, params = cohort_store._from(**filters)
+    plan = [row[-1] for row in cohort_store.conn.execute(f"EXPLAIN QUERY PLAN SELECT COUNT(*) FROM {source}", params)]
+    # SEARCH reads through an index or the primary key; SCAN reads a whole table
+    assert plan and all(step.startswith("SEARCH") for step in plan), plan